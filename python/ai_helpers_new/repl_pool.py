@@ -2,24 +2,56 @@
 REPL Session Pool - REPL 세션 풀링 시스템
 세션 재사용과 효율적 관리를 위한 풀링 구현
 생성일: 2025-08-23
+
+각 세션은 json_repl_session.py 워커 프로세스이며 JSON-RPC(줄 단위)로 통신합니다.
+- 사전 생성(pre-fork): 풀 생성 시 min_sessions개의 워커를 띄우고 ai_helpers_new를 미리 import
+- 상태 점검: 주기적으로 status 요청을 보내 응답 없는 워커 교체
+- 재활용: N회 실행 또는 RSS 상한 초과 시 워커 교체
+- 고정 라우팅: 같은 session_hint의 요청은 같은 워커로 전달되어 상태 유지
+- 실행 시간 제한: 워커가 timeout이 지난 셀을 직접 중단하고 상태를 유지, 응답이 없으면 워커 교체
 """
 
 import os
 import json
 import time
 import threading
+import itertools
+from collections import deque
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from queue import Queue, Empty
+import shutil
 import subprocess
 import sys
 
+# 워커 스크립트 (python/json_repl_session.py)
+WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'json_repl_session.py'
+)
+
+# 워커 시작 직후 실행되는 코드
+DEFAULT_WARMUP_CODE = 'import ai_helpers_new as h'
+
+# timeout 후 워커가 셀을 중단하고 응답할 때까지 추가로 기다리는 시간 (초)
+CANCEL_WAIT = 5.0
+
+# 워커가 취소된 요청에 보내는 JSON-RPC 에러 코드
+REQUEST_CANCELLED = -32800
+
+
 class REPLSession:
-    """개별 REPL 세션 관리"""
+    """개별 REPL 세션 관리 (json_repl_session 워커 프로세스)"""
 
-    def __init__(self, session_id: str, project_path: str = None):
+    def __init__(self, session_id: str, project_path: str = None,
+                 warmup_code: str = DEFAULT_WARMUP_CODE,
+                 max_executions: int = 500,
+                 max_rss_mb: float = 1024):
         self.session_id = session_id
         self.project_path = project_path or os.getcwd()
+        self.warmup_code = warmup_code
+        self.max_executions = max_executions
+        self.max_rss_mb = max_rss_mb
         self.process = None
         self.created_at = datetime.now()
         self.last_used = datetime.now()
@@ -27,26 +59,161 @@ class REPLSession:
         self.is_busy = False
         self.lock = threading.Lock()
 
-    def start(self):
-        """REPL 프로세스 시작"""
-        if self.process is None:
-            env = os.environ.copy()
-            env['PYTHONPATH'] = self.project_path
-
-            self.process = subprocess.Popen(
-                [sys.executable, '-u', '-i'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                env=env,
-                cwd=self.project_path
-            )
-
-            # 초기화 대기
-            time.sleep(0.5)
-
-    def execute(self, code: str, timeout: float = 30) -> Dict[str, Any]:
+        # 라우팅용 부하 (실행 중 + 대기 중 요청 수)
+        self.load = 0
+        # 타임아웃 등으로 더 이상 신뢰할 수 없는 워커
+        self.healthy = True
+        self.rss_mb = 0.0
+
+        self._ready = threading.Event()
+        self._write_lock = threading.Lock()
+        self._pending: Dict[str, Queue] = {}
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self._stderr_tail = deque(maxlen=50)
+        # 실행 중인 execute 요청 id (cancel 대상)
+        self._current_request_id = None
+        # 워커 전용 캐시 디렉토리 (인덱스/메타데이터/옮긴 변수를 다른 워커와 공유하지 않음)
+        self.cache_dir = os.path.join(self.project_path, '.repl_cache', f'worker-{session_id}')
+
+    def spawn(self):
+        """워커 프로세스 시작 (준비 완료는 기다리지 않음)"""
+        if self.process is not None:
+            return
+
+        env = os.environ.copy()
+        python_dir = os.path.dirname(WORKER_SCRIPT)
+        paths = [python_dir, self.project_path]
+        if env.get('PYTHONPATH'):
+            paths.append(env['PYTHONPATH'])
+        env['PYTHONPATH'] = os.pathsep.join(paths)
+        env['PYTHONIOENCODING'] = 'utf-8'
+        env['MCP_MODE'] = 'claude'
+        # 워커들이 같은 스냅샷 디렉토리를 덮어쓰지 않도록 비활성화
+        env['REPL_SNAPSHOT'] = 'false'
+        env['REPL_CACHE_DIR'] = self.cache_dir
+        env['REPL_SESSION_ID'] = self.session_id
+
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            env=env,
+            cwd=self.project_path
+        )
+
+        threading.Thread(target=self._read_stdout, args=(self.process,),
+                         name=f"{self.session_id}-stdout", daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.process,),
+                         name=f"{self.session_id}-stderr", daemon=True).start()
+
+    def wait_ready(self, timeout: float = 30) -> bool:
+        """__READY__ 신호를 기다린 뒤 워밍업 코드 실행"""
+        if not self._ready.wait(timeout):
+            self.healthy = False
+            return False
+
+        if self.warmup_code:
+            result = self.execute(self.warmup_code, timeout=timeout, count=False)
+            if not result['ok']:
+                print(f"[POOL] {self.session_id} 워밍업 실패: {result.get('error')}",
+                      file=sys.stderr)
+        return self.is_alive()
+
+    def start(self, timeout: float = 30) -> bool:
+        """REPL 프로세스 시작 및 준비 대기"""
+        self.spawn()
+        return self.wait_ready(timeout)
+
+    def _read_stdout(self, process: subprocess.Popen):
+        """워커 stdout 읽기 - 응답을 요청 id별로 전달"""
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            if line == '__READY__':
+                self._ready.set()
+                continue
+
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            # output 알림 등 id가 없는 메시지는 무시
+            request_id = message.get('id') if isinstance(message, dict) else None
+            with self._pending_lock:
+                waiter = self._pending.get(request_id)
+            if waiter is not None:
+                waiter.put(message)
+
+        # 프로세스 종료: 대기 중인 요청 모두 깨우기
+        self._ready.set()
+        with self._pending_lock:
+            waiters = list(self._pending.values())
+        for waiter in waiters:
+            waiter.put(None)
+
+    def _read_stderr(self, process: subprocess.Popen):
+        """워커 stderr 소비 (파이프가 가득 차지 않도록, 최근 줄만 보관)"""
+        for line in process.stderr:
+            self._stderr_tail.append(line.rstrip())
+
+    def request(self, method: str, params: Dict[str, Any] = None,
+                timeout: float = 30) -> Optional[Dict[str, Any]]:
+        """
+        JSON-RPC 요청을 보내고 응답 대기
+
+        Returns:
+            응답 메시지, 타임아웃이면 None
+
+        Raises:
+            RuntimeError: 워커가 종료된 경우
+        """
+        if not self.is_alive():
+            raise RuntimeError(f"워커 {self.session_id}가 실행 중이 아닙니다")
+
+        request_id = f"{self.session_id}-{next(self._request_ids)}"
+        waiter = Queue()
+        with self._pending_lock:
+            self._pending[request_id] = waiter
+            if method == 'execute':
+                self._current_request_id = request_id
+
+        try:
+            message = json.dumps({
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'method': method,
+                'params': params or {}
+            }, ensure_ascii=False)
+            with self._write_lock:
+                self.process.stdin.write(message + '\n')
+                self.process.stdin.flush()
+
+            try:
+                response = waiter.get(timeout=timeout)
+            except Empty:
+                return None
+
+            if response is None:
+                raise RuntimeError(f"워커 {self.session_id}가 종료되었습니다")
+            return response
+
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"워커 {self.session_id} 통신 실패: {e}")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+                if self._current_request_id == request_id:
+                    self._current_request_id = None
+
+    def execute(self, code: str, timeout: float = 30, count: bool = True) -> Dict[str, Any]:
         """코드 실행"""
         with self.lock:
             if not self.process:
@@ -54,26 +221,132 @@ class REPLSession:
 
             self.is_busy = True
             self.last_used = datetime.now()
-            self.use_count += 1
+            if count:
+                self.use_count += 1
 
+            start_time = time.time()
             try:
-                # 코드 실행 (간단한 구현)
-                # 실제로는 더 복잡한 처리 필요
+                try:
+                    # 워커가 timeout에 셀을 중단하므로 응답을 조금 더 기다린다
+                    response = self.request('execute', {'code': code, 'timeout': timeout},
+                                            timeout=timeout + CANCEL_WAIT)
+                except RuntimeError as e:
+                    self.healthy = False
+                    return {
+                        'ok': False,
+                        'error': str(e),
+                        'error_code': 'WORKER_DIED',
+                        'stderr': '\n'.join(self._stderr_tail)
+                    }
+
+                execution_time = round(time.time() - start_time, 3)
+
+                if response is None:
+                    # 중단 요청에도 워커가 셀을 계속 실행 중이므로 재사용할 수 없음
+                    self.healthy = False
+                    return {
+                        'ok': False,
+                        'error': f'실행 시간 초과 ({timeout}초)',
+                        'error_code': 'TIMEOUT',
+                        'execution_time': execution_time
+                    }
+
+                if 'error' in response:
+                    error = response['error']
+                    data = error.get('data') or {}
+                    self._update_rss(data.get('memory', {}).get('current_mb'))
+                    if error.get('code') == REQUEST_CANCELLED:
+                        # 셀만 중단되고 워커 상태(네임스페이스)는 유지됨
+                        if data.get('restarting'):
+                            self.healthy = False
+                        reason = data.get('cancelled', '')
+                        return {
+                            'ok': False,
+                            'error': error.get('message', ''),
+                            'error_code': 'TIMEOUT' if reason.startswith('timed out') else 'CANCELLED',
+                            'stdout': data.get('stdout', ''),
+                            'traceback': data.get('traceback'),
+                            'execution_time': execution_time
+                        }
+                    return {
+                        'ok': False,
+                        'error': error.get('message', ''),
+                        'error_code': 'EXECUTION_ERROR',
+                        'traceback': data.get('traceback'),
+                        'execution_time': execution_time
+                    }
+
+                payload = response.get('result', {})
+                memory = payload.get('memory', {})
+                self._update_rss(memory.get('after_mb'))
+
                 result = {
                     'ok': True,
-                    'stdout': f'Executed in session {self.session_id}',
-                    'stderr': '',
-                    'execution_time': 0.1
+                    'stdout': payload.get('stdout', ''),
+                    'stderr': payload.get('stderr', ''),
+                    'execution_time': execution_time,
+                    'memory': memory
                 }
+                for key in ('output', 'profile', 'memo'):
+                    if key in payload:
+                        result[key] = payload[key]
                 return result
             finally:
                 self.is_busy = False
 
+    def cancel(self, reason: str = 'cancelled') -> bool:
+        """실행 중인 셀 중단 요청 (다른 스레드에서 호출) - 워커가 중단했으면 True"""
+        request_id = self._current_request_id
+        if request_id is None or not self.is_alive():
+            return False
+        try:
+            response = self.request('cancel', {'id': request_id, 'reason': reason}, timeout=5)
+        except RuntimeError:
+            return False
+        return bool(response and response.get('result', {}).get('cancelled'))
+
+    def _update_rss(self, rss_mb: Optional[float]):
+        if rss_mb is not None:
+            self.rss_mb = rss_mb
+
+    def health_check(self, timeout: float = 5) -> bool:
+        """status 요청으로 워커 응답 확인 (실행 중에도 응답함)"""
+        if not self.healthy or not self.is_alive():
+            return False
+        try:
+            response = self.request('status', timeout=timeout)
+        except RuntimeError:
+            return False
+        return response is not None and 'result' in response
+
+    def needs_recycle(self) -> bool:
+        """교체가 필요한 워커인지 확인"""
+        if not self.healthy or not self.is_alive():
+            return True
+        if self.max_executions and self.use_count >= self.max_executions:
+            return True
+        if self.max_rss_mb and self.rss_mb >= self.max_rss_mb:
+            return True
+        return False
+
     def terminate(self):
         """세션 종료"""
         if self.process:
-            self.process.terminate()
+            process = self.process
             self.process = None
+            try:
+                # stdin을 닫으면 워커가 정상 종료됨
+                process.stdin.close()
+                process.wait(timeout=2)
+            except Exception:
+                process.terminate()
+                try:
+                    process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            # 종료된 워커의 네임스페이스는 사라졌으므로 캐시도 더 이상 쓰이지 않음
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
 
     def is_alive(self) -> bool:
         """세션 생존 확인"""
@@ -83,11 +356,15 @@ class REPLSession:
         """세션 통계"""
         return {
             'session_id': self.session_id,
+            'pid': self.process.pid if self.process else None,
             'created_at': self.created_at.isoformat(),
             'last_used': self.last_used.isoformat(),
             'use_count': self.use_count,
             'is_busy': self.is_busy,
             'is_alive': self.is_alive(),
+            'healthy': self.healthy,
+            'load': self.load,
+            'rss_mb': self.rss_mb,
             'uptime': (datetime.now() - self.created_at).total_seconds()
         }
 
@@ -95,33 +372,54 @@ class REPLSession:
 class REPLSessionPool:
     """REPL 세션 풀 관리자"""
 
-    def __init__(self, 
+    def __init__(self,
                  min_sessions: int = 1,
                  max_sessions: int = 3,
-                 idle_timeout: int = 300):
+                 idle_timeout: int = 300,
+                 max_executions: int = 500,
+                 max_rss_mb: float = 1024,
+                 health_interval: int = 60,
+                 project_path: str = None,
+                 warmup_code: str = DEFAULT_WARMUP_CODE):
         """
         Args:
-            min_sessions: 최소 세션 수
+            min_sessions: 최소 세션 수 (미리 생성)
             max_sessions: 최대 세션 수
             idle_timeout: 유휴 타임아웃 (초)
+            max_executions: 워커 교체 전 최대 실행 횟수
+            max_rss_mb: 워커 교체 기준 RSS (MB)
+            health_interval: 상태 점검 주기 (초)
+            project_path: 워커 작업 디렉토리
+            warmup_code: 워커 시작 직후 실행할 코드
         """
         self.min_sessions = min_sessions
         self.max_sessions = max_sessions
         self.idle_timeout = idle_timeout
+        self.max_executions = max_executions
+        self.max_rss_mb = max_rss_mb
+        self.health_interval = health_interval
+        self.project_path = project_path or os.getcwd()
+        self.warmup_code = warmup_code
 
         # 세션 풀
         self.sessions: Dict[str, REPLSession] = {}
-        self.available_queue = Queue()
+        # session_hint -> session_id (고정 라우팅)
+        self.affinity: Dict[str, str] = {}
         self.lock = threading.Lock()
+        self._session_counter = itertools.count()
+        self._shutdown = threading.Event()
 
         # 통계
         self.stats = {
             'total_created': 0,
             'total_terminated': 0,
+            'total_recycled': 0,
             'total_executions': 0,
             'total_errors': 0,
             'pool_hits': 0,
-            'pool_misses': 0
+            'pool_misses': 0,
+            'sticky_hits': 0,
+            'health_failures': 0
         }
 
         # 초기 세션 생성
@@ -135,93 +433,183 @@ class REPLSessionPool:
         self.cleanup_thread.start()
 
     def _initialize_pool(self):
-        """초기 세션 풀 생성"""
-        for i in range(self.min_sessions):
-            session_id = f"repl_{i}_{int(time.time())}"
-            session = REPLSession(session_id)
-            session.start()
-            self.sessions[session_id] = session
-            self.available_queue.put(session_id)
-            self.stats['total_created'] += 1
-
-    def acquire_session(self, timeout: float = 5) -> Optional[REPLSession]:
-        """사용 가능한 세션 획득"""
-        try:
-            # 사용 가능한 세션 찾기
-            session_id = self.available_queue.get(timeout=timeout)
-            session = self.sessions.get(session_id)
-
-            if session and session.is_alive():
-                self.stats['pool_hits'] += 1
-                return session
-            else:
-                # 죽은 세션 제거
-                if session:
-                    self._remove_session(session_id)
-
-        except Empty:
-            pass
-
-        # 새 세션 생성 (최대값 미만인 경우)
+        """초기 세션 풀 생성 - 워커를 동시에 띄운 뒤 준비 완료 대기"""
+        sessions = []
+        with self.lock:
+            for _ in range(self.min_sessions):
+                session = self._new_session()
+                session.spawn()
+                sessions.append(session)
+
+        for session in sessions:
+            if not session.wait_ready():
+                print(f"[POOL] {session.session_id} 시작 실패", file=sys.stderr)
+                with self.lock:
+                    self._remove_session(session.session_id)
+
+    def _new_session(self) -> REPLSession:
+        """세션 객체 생성 및 등록 (호출자가 lock 보유)"""
+        session_id = f"repl_{next(self._session_counter)}_{int(time.time())}"
+        session = REPLSession(
+            session_id,
+            project_path=self.project_path,
+            warmup_code=self.warmup_code,
+            max_executions=self.max_executions,
+            max_rss_mb=self.max_rss_mb
+        )
+        self.sessions[session_id] = session
+        self.stats['total_created'] += 1
+        return session
+
+    def acquire_session(self, timeout: float = 5,
+                        session_hint: str = None) -> Optional[REPLSession]:
+        """
+        사용 가능한 세션 획득
+
+        session_hint가 이미 배정된 워커가 살아 있으면 바쁘더라도 그 워커를
+        반환합니다 (실행은 워커 lock에서 순서대로 대기).
+        """
+        created = None
         with self.lock:
-            if len(self.sessions) < self.max_sessions:
-                session = self._create_new_session()
+            session = None
+
+            # 1. 고정 라우팅
+            if session_hint is not None:
+                bound = self.sessions.get(self.affinity.get(session_hint))
+                if bound and bound.healthy and bound.is_alive():
+                    session = bound
+                    self.stats['sticky_hits'] += 1
+
+            # 2. 유휴 워커 (힌트가 배정되지 않은 워커 우선)
+            if session is None:
+                bound_ids = set(self.affinity.values())
+                idle = [s for s in self.sessions.values()
+                        if s.load == 0 and s.healthy and s.is_alive()]
+                if idle:
+                    idle.sort(key=lambda s: (s.session_id in bound_ids, s.use_count))
+                    session = idle[0]
+                    self.stats['pool_hits'] += 1
+
+            # 3. 새 워커 (최대값 미만인 경우)
+            if session is None and len(self.sessions) < self.max_sessions:
+                session = created = self._new_session()
                 self.stats['pool_misses'] += 1
-                return session
 
-        return None
+            # 4. 가장 한가한 워커에서 대기
+            if session is None:
+                alive = [s for s in self.sessions.values()
+                         if s.healthy and s.is_alive()]
+                if alive:
+                    session = min(alive, key=lambda s: s.load)
+                    self.stats['pool_hits'] += 1
+
+            if session is None:
+                return None
+
+            session.load += 1
+            if session_hint is not None:
+                self.affinity[session_hint] = session.session_id
+
+        # 워커 시작은 lock 밖에서 (다른 요청을 막지 않도록)
+        if created is not None and not created.start(timeout=max(timeout, 30)):
+            self.release_session(created)
+            with self.lock:
+                self._remove_session(created.session_id)
+            return None
+
+        return session
 
     def release_session(self, session: REPLSession):
-        """세션 반환"""
-        if session.session_id in self.sessions:
-            self.available_queue.put(session.session_id)
+        """세션 반환 - 교체 기준에 도달한 워커는 재활용"""
+        with self.lock:
+            session.load = max(0, session.load - 1)
+            recycle = (session.session_id in self.sessions and
+                       session.load == 0 and session.needs_recycle())
+            if recycle:
+                self._remove_session(session.session_id)
+                self.stats['total_recycled'] += 1
+
+        if recycle:
+            self._ensure_min_sessions_async()
+
+    def _ensure_min_sessions_async(self):
+        """최소 세션 수를 백그라운드에서 보충"""
+        def refill():
+            with self.lock:
+                if self._shutdown.is_set():
+                    return
+                new_sessions = [self._new_session()
+                                for _ in range(self.min_sessions - len(self.sessions))]
+            for session in new_sessions:
+                session.spawn()
+            for session in new_sessions:
+                if not session.wait_ready():
+                    with self.lock:
+                        self._remove_session(session.session_id)
+
+        threading.Thread(target=refill, name="repl-pool-refill", daemon=True).start()
 
     def _create_new_session(self) -> REPLSession:
         """새 세션 생성"""
-        session_id = f"repl_{len(self.sessions)}_{int(time.time())}"
-        session = REPLSession(session_id)
+        with self.lock:
+            session = self._new_session()
         session.start()
-        self.sessions[session_id] = session
-        self.stats['total_created'] += 1
         return session
 
     def _remove_session(self, session_id: str):
-        """세션 제거"""
+        """세션 제거 (호출자가 lock 보유)"""
         if session_id in self.sessions:
-            session = self.sessions[session_id]
+            session = self.sessions.pop(session_id)
             session.terminate()
-            del self.sessions[session_id]
             self.stats['total_terminated'] += 1
 
+            # 이 워커에 고정된 힌트 해제 (워커 상태는 함께 사라짐)
+            for hint in [h for h, sid in self.affinity.items() if sid == session_id]:
+                del self.affinity[hint]
+
     def _cleanup_worker(self):
-        """유휴 세션 정리 워커"""
-        while True:
-            time.sleep(60)  # 1분마다 체크
+        """유휴 세션 정리 및 상태 점검 워커"""
+        while not self._shutdown.wait(self.health_interval):
+            now = datetime.now()
+            with self.lock:
+                candidates = [s for s in self.sessions.values() if s.load == 0]
+
+            # 상태 점검은 lock 밖에서 (요청 라우팅을 막지 않도록)
+            unhealthy = []
+            for session in candidates:
+                if not session.health_check():
+                    unhealthy.append(session.session_id)
+                    self.stats['health_failures'] += 1
 
             with self.lock:
-                now = datetime.now()
-                to_remove = []
+                to_remove = set(unhealthy)
+                remaining = len(self.sessions) - len(to_remove)
 
                 for session_id, session in self.sessions.items():
+                    if session_id in to_remove or session.load > 0:
+                        continue
+
                     # 유휴 시간 체크
                     idle_time = (now - session.last_used).total_seconds()
+                    if idle_time > self.idle_timeout and remaining > self.min_sessions:
+                        to_remove.add(session_id)
+                        remaining -= 1
 
-                    if (not session.is_busy and 
-                        idle_time > self.idle_timeout and
-                        len(self.sessions) > self.min_sessions):
-                        to_remove.append(session_id)
+                # 세션 제거 (실행 중인 워커는 건드리지 않음)
+                for session_id in to_remove:
+                    session = self.sessions.get(session_id)
+                    if session is not None and session.load == 0:
+                        self._remove_session(session_id)
 
-                    # 죽은 세션 체크
-                    elif not session.is_alive():
-                        to_remove.append(session_id)
+                refill = len(self.sessions) < self.min_sessions
 
-                # 세션 제거
-                for session_id in to_remove:
-                    self._remove_session(session_id)
+            if refill:
+                self._ensure_min_sessions_async()
 
-    def execute_code(self, code: str, session_hint: str = None) -> Dict[str, Any]:
+    def execute_code(self, code: str, session_hint: str = None,
+                     timeout: float = 30) -> Dict[str, Any]:
         """코드 실행 (자동 세션 관리)"""
-        session = self.acquire_session()
+        session = self.acquire_session(session_hint=session_hint)
 
         if not session:
             return {
@@ -231,13 +619,16 @@ class REPLSessionPool:
             }
 
         try:
-            result = session.execute(code)
+            result = session.execute(code, timeout=timeout)
             self.stats['total_executions'] += 1
+            if not result['ok']:
+                self.stats['total_errors'] += 1
 
             # 세션 정보 추가
             result['session_info'] = {
                 'session_id': session.session_id,
-                'use_count': session.use_count
+                'use_count': session.use_count,
+                'session_hint': session_hint
             }
 
             return result
@@ -255,26 +646,31 @@ class REPLSessionPool:
 
     def get_pool_stats(self) -> Dict[str, Any]:
         """풀 통계 반환"""
-        active_sessions = []
-        for session in self.sessions.values():
-            active_sessions.append(session.get_stats())
+        with self.lock:
+            sessions = list(self.sessions.values())
+            affinity = dict(self.affinity)
 
         return {
-            'pool_size': len(self.sessions),
+            'pool_size': len(sessions),
             'min_sessions': self.min_sessions,
             'max_sessions': self.max_sessions,
             'idle_timeout': self.idle_timeout,
+            'max_executions': self.max_executions,
+            'max_rss_mb': self.max_rss_mb,
             'statistics': self.stats,
-            'active_sessions': active_sessions,
-            'available_count': self.available_queue.qsize()
+            'active_sessions': [session.get_stats() for session in sessions],
+            'available_count': sum(1 for s in sessions if s.load == 0),
+            'affinity': affinity
         }
 
     def shutdown(self):
         """풀 종료"""
+        self._shutdown.set()
         with self.lock:
             for session in self.sessions.values():
                 session.terminate()
             self.sessions.clear()
+            self.affinity.clear()
 
     def resize_pool(self, min_sessions: int = None, max_sessions: int = None):
         """풀 크기 조정"""
@@ -284,34 +680,33 @@ class REPLSessionPool:
             self.max_sessions = max_sessions
 
         # 최소 세션 수 보장
-        with self.lock:
-            while len(self.sessions) < self.min_sessions:
-                session = self._create_new_session()
-                self.available_queue.put(session.session_id)
+        while len(self.sessions) < self.min_sessions:
+            self._create_new_session()
 
-            # 최대 세션 수 초과 제거
-            while len(self.sessions) > self.max_sessions:
-                try:
-                    session_id = self.available_queue.get_nowait()
-                    self._remove_session(session_id)
-                except Empty:
-                    break
+        # 최대 세션 수 초과 제거 (유휴 워커부터)
+        with self.lock:
+            idle = [sid for sid, s in self.sessions.items() if s.load == 0]
+            while len(self.sessions) > self.max_sessions and idle:
+                self._remove_session(idle.pop())
 
 
 # 싱글톤 인스턴스
 _pool_instance = None
+_pool_lock = threading.Lock()
 
 def get_repl_pool() -> REPLSessionPool:
     """REPL 풀 싱글톤 인스턴스 반환"""
     global _pool_instance
-    if _pool_instance is None:
-        _pool_instance = REPLSessionPool()
+    with _pool_lock:
+        if _pool_instance is None:
+            _pool_instance = REPLSessionPool()
     return _pool_instance
 
-def execute_with_pool(code: str) -> Dict[str, Any]:
+def execute_with_pool(code: str, session_hint: str = None,
+                      timeout: float = 30) -> Dict[str, Any]:
     """풀을 사용한 코드 실행"""
     pool = get_repl_pool()
-    return pool.execute_code(code)
+    return pool.execute_code(code, session_hint=session_hint, timeout=timeout)
 
 def get_pool_stats() -> Dict[str, Any]:
     """풀 통계 조회"""
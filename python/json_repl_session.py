@@ -11,6 +11,16 @@ Features:
 - Variable limit management  
 - Memory usage reporting in stdout
 - Non-blocking I/O with timeout
+- Multiplexed requests (read-only methods answered while a cell runs)
+- Negotiated length-prefixed framing (json/msgpack) with newline-JSON fallback
+- Bounded output capture (head/tail kept, full output spilled to a file)
+- Incremental namespace snapshots with lazy restore after restart
+- Background cells in threads (referenced names only) or forked processes (explicit inputs/outputs)
+- RSS budget: cold large variables are moved to the cache and restored on next use
+- Opt-in cell memoization (memoize: true or @cached_cell) keyed by code and input fingerprints
+- Lazy DataFrame/stream plans (scan_csv, scan_parquet, lazy) optimized and run at sinks
+- Multi-process DataStream execution (run_distributed, stream.distribute)
+- cancel method and per-request timeout: running cells are interrupted, namespace kept
 - Safe resource cleanup
 """
 
@@ -23,9 +33,19 @@ import io
 import traceback
 import threading
 import atexit
-import select
 import queue
-from typing import Dict, Any, Optional, List
+import struct
+import hashlib
+import cProfile
+import pstats
+import pickle
+import types
+import builtins
+import multiprocessing
+import concurrent.futures
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, List, Callable
 from pathlib import Path
 from datetime import datetime
 
@@ -34,7 +54,22 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from memory_facade import MEMORY_MANAGER, execute_code_with_memory_check, get_memory_report
 
 # Import original components
-from repl_core import EnhancedREPLSession, ExecutionMode
+from repl_core import EnhancedREPLSession, ExecutionMode, NamespaceSnapshotter
+from repl_core.output_capture import StreamingCapture, BoundedCapture, read_output
+from repl_core.namespace import referenced_names
+from repl_core.eviction import NamespaceEvictor
+from repl_core.memo import strip_marker
+from repl_core.history import ExecutionHistory
+from repl_core.interrupt import CellInterrupter
+from repl_core.lazy import lazy, scan_csv, scan_parquet, col
+from repl_core.distributed import run_distributed, Combiner
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
 
 # Windows UTF-8 configuration
 if sys.platform == 'win32':
@@ -46,6 +81,174 @@ if sys.platform == 'win32':
         pass
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
+# 프로파일 파일 저장 위치
+PROFILE_DIR = Path('.ai-brain') / 'profiles'
+
+# 중단 요청에도 멈추지 않는 셀 때문에 종료할 때의 종료 코드 (EX_TEMPFAIL - 재시작하면 복구됨)
+EXIT_STUCK_CELL = 75
+
+
+def summarize_profile(profiler: 'cProfile.Profile', top_n: int = 20,
+                      sort: str = 'cumulative', save: bool = False,
+                      name: Optional[str] = None) -> Dict[str, Any]:
+    """cProfile 결과를 상위 핫스팟 표로 요약
+    
+    Args:
+        profiler: 실행이 끝난 프로파일러
+        top_n: 표에 포함할 함수 수
+        sort: 정렬 기준 (cumulative, tottime, ncalls 등 pstats 키)
+        save: True면 .ai-brain/profiles/ 아래에 .pstats 파일 저장
+        name: 저장 파일 이름에 붙일 식별자 (요청 id 등)
+    """
+    stats = pstats.Stats(profiler)
+    try:
+        stats.sort_stats(sort)
+    except KeyError:
+        sort = 'cumulative'
+        stats.sort_stats(sort)
+    
+    top = []
+    for func in stats.fcn_list[:max(0, int(top_n))]:
+        primitive_calls, ncalls, tottime, cumtime, _ = stats.stats[func]
+        filename, lineno, func_name = func
+        location = func_name if filename == '~' else \
+            f"{os.path.basename(filename)}:{lineno}({func_name})"
+        top.append({
+            'function': location,
+            'ncalls': ncalls if ncalls == primitive_calls else f"{ncalls}/{primitive_calls}",
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+            'percall_ms': round(cumtime * 1000 / ncalls, 3) if ncalls else 0.0
+        })
+    
+    report = {
+        'sort': sort,
+        'total_calls': stats.total_calls,
+        'total_time_ms': round(stats.total_tt * 1000, 3),
+        'top': top
+    }
+    
+    if save:
+        try:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            suffix = f"_{name}" if name is not None else ''
+            safe_suffix = ''.join(c if c.isalnum() or c in '-_' else '_' for c in suffix)
+            path = PROFILE_DIR / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{safe_suffix}.pstats"
+            stats.dump_stats(str(path))
+            report['pstats_file'] = str(path)
+        except OSError as e:
+            report['pstats_error'] = str(e)
+    
+    return report
+
+
+def _run_background_process(code: str, inputs: Dict[str, Any],
+                            modules: Dict[str, str],
+                            outputs: Optional[List[str]]) -> Dict[str, Any]:
+    """프로세스 모드 백그라운드 실행 (자식 프로세스에서 호출)
+    
+    전달받은 inputs만으로 네임스페이스를 구성하고, outputs로 선언된 이름만
+    돌려줍니다. outputs가 없으면 새로 만들어진 값 중 pickle 가능한 것을 모두 반환합니다.
+    """
+    import importlib
+    
+    namespace = {'__builtins__': builtins, '__name__': '__main__'}
+    for name, module_name in modules.items():
+        namespace[name] = importlib.import_module(module_name)
+    namespace.update(inputs)
+    
+    # 자식의 stdout은 부모의 프로토콜 채널이므로 반드시 가로챔
+    stdout, stderr = io.StringIO(), io.StringIO()
+    old_stdout, old_stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        exec(compile(code, '<bg>', 'exec', dont_inherit=True), namespace)
+    except Exception as e:
+        return {'status': 'error', 'error': str(e), 'traceback': traceback.format_exc(),
+                'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+    finally:
+        sys.stdout, sys.stderr = old_stdout, old_stderr
+    
+    if outputs is None:
+        names = [name for name, value in namespace.items()
+                 if not name.startswith('_') and name not in inputs and name not in modules
+                 and not isinstance(value, types.ModuleType)]
+    else:
+        names = [name for name in outputs if name in namespace]
+    
+    result_outputs, skipped = {}, []
+    for name in names:
+        try:
+            pickle.dumps(namespace[name], protocol=pickle.HIGHEST_PROTOCOL)
+            result_outputs[name] = namespace[name]
+        except Exception:
+            skipped.append(name)
+    
+    result = {'status': 'success', 'outputs': result_outputs,
+              'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+    if skipped:
+        result['skipped_outputs'] = skipped
+    if outputs is not None:
+        missing = [name for name in outputs if name not in namespace]
+        if missing:
+            result['missing_outputs'] = missing
+    return result
+
+
+class CompiledCodeCache:
+    """컴파일된 코드 객체 LRU 캐시 - 소스 해시를 키로 사용
+    
+    동일한 스니펫(상태 확인, 헬퍼 호출 등)이 반복 전송될 때
+    파싱/컴파일 비용을 건너뛴다.
+    """
+    
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._codes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def compile(self, source: str, filename: str = '<string>'):
+        """캐시된 코드 객체 반환, 없으면 컴파일 후 저장 (SyntaxError는 그대로 전파)"""
+        key = hashlib.blake2b(
+            source.encode('utf-8', 'surrogatepass'), digest_size=16
+        ).digest()
+        
+        with self._lock:
+            code_obj = self._codes.get(key)
+            if code_obj is not None:
+                self._codes.move_to_end(key)
+                self.hits += 1
+                return code_obj
+        
+        code_obj = compile(source, filename, 'exec', dont_inherit=True)
+        
+        with self._lock:
+            self.misses += 1
+            self._codes[key] = code_obj
+            while len(self._codes) > self.max_size:
+                self._codes.popitem(last=False)
+        
+        return code_obj
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._codes),
+            'max_size': self.max_size,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+    
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._codes.clear()
+
+
 class SmartSessionPool:
     """메모리 관리가 강화된 세션 풀 - 백그라운드 작업 지원"""
     
@@ -61,15 +264,49 @@ class SmartSessionPool:
         self.background_tasks = {}
         self.task_counter = 0
         self.executor = None
+        # process 모드 백그라운드 작업용 (처음 사용할 때 생성)
+        self.process_executor = None
+        self.process_workers = max(1, (os.cpu_count() or 2) - 1)
+        
+        # 실행 출력 상한 (문자 수) - 초과분은 파일로 내보내고 read_output()으로 조회
+        self.output_limit = 1024 * 1024
+        
+        # 컴파일된 코드 캐시
+        self.code_cache = CompiledCodeCache(max_size=256)
+        
+        # 네임스페이스 스냅샷 (REPL_SNAPSHOT=false로 비활성화)
+        # 주기적으로 변경된 변수만 디스크에 저장하고, 재시작 시 처음 사용할 때 복원
+        self.snapshot_enabled = os.environ.get('REPL_SNAPSHOT', 'true').lower() not in ('0', 'false', 'off')
+        self.snapshotter = None
+        
+        # RSS 예산 (REPL_RSS_BUDGET_MB, 0이면 비활성화)
+        # 초과 시 오래 사용하지 않은 큰 변수를 캐시로 옮기고, 다음에 사용하는 셀 실행 전에 복원
+        self.rss_budget_mb = float(os.environ.get(
+            'REPL_RSS_BUDGET_MB', self.memory_manager.MEMORY_LIMIT_GB * 1024))
+        self.evictor = None
         
         # 통계
         self.stats = {
             'total_executions': 0,
             'memory_cleanups': 0,
             'peak_memory_mb': 0,
-            'background_tasks': 0
+            'background_tasks': 0,
+            'evicted_variables': 0,
+            'memo_hits': 0,
+            'code_cache': self.code_cache.get_stats()
         }
         
+        # 최근 실행 기록 (고정 크기 링 버퍼) - 실행 시간/메모리 변화 백분위수
+        self.history = ExecutionHistory(capacity=1000)
+        
+        # 실행 중인 셀 중단 (cancel 요청, timeout) - 셀 스레드에 KeyboardInterrupt 주입
+        # REPL_CANCEL_GRACE초(0이면 무제한) 안에 멈추지 않으면 네임스페이스를 저장하고
+        # 프로세스를 종료한다 (재시작 후 스냅샷에서 복원)
+        self.interrupter = CellInterrupter(
+            grace=float(os.environ.get('REPL_CANCEL_GRACE', 10)),
+            on_stuck=self._on_stuck_cell
+        )
+        
         # 리소스 정리 등록
         atexit.register(self.cleanup)
     
@@ -82,9 +319,117 @@ class SmartSessionPool:
                     enable_streaming=True,
                     enable_caching=True
                 )
+                # 메모리 측정은 공용 샘플러 하나로 (실행마다 psutil 호출 방지)
+                self.session.memory_manager.sampler = self.memory_manager.sampler
                 self._init_namespace()
+                self._init_snapshotter()
+                self._init_evictor()
             return self.session
     
+    def _init_snapshotter(self):
+        """스냅샷 초기화 - 이전 세션의 변수를 지연 복원 대상으로 등록"""
+        if not self.snapshot_enabled:
+            return
+        try:
+            self.snapshotter = NamespaceSnapshotter(
+                cache_dir=self.session.cache_dir,
+                exclude=self.namespace.keys()
+            )
+            pending = self.snapshotter.restore(self.namespace)
+            if pending:
+                print(f"[SNAPSHOT] 이전 세션 변수 {pending}개 - 처음 사용할 때 복원", file=sys.stderr)
+        except Exception as e:
+            print(f"[SNAPSHOT] 초기화 실패: {e}", file=sys.stderr)
+            self.snapshotter = None
+    
+    def _init_evictor(self):
+        """RSS 예산 관리 초기화"""
+        if self.rss_budget_mb <= 0 or self.session.cache is None:
+            return
+        self.evictor = NamespaceEvictor(
+            cache=self.session.cache,
+            budget_mb=self.rss_budget_mb,
+            exclude=self.namespace.keys(),
+            owner=self._evict_owner()
+        )
+        # 이전 프로세스가 캐시로 옮긴 변수 - 스냅샷보다 최신이므로 캐시에서 복원
+        recovered = self.evictor.recover(self.namespace)
+        if recovered:
+            if self.snapshotter is not None:
+                for name in recovered:
+                    self.snapshotter.pending.pop(name, None)
+            print(f"[EVICT] 이전 세션에서 옮긴 변수 {len(recovered)}개 - 처음 사용할 때 복원", file=sys.stderr)
+    
+    @staticmethod
+    def _evict_owner() -> str:
+        """
+        옮긴 변수의 소유자 - 같은 캐시를 쓰는 다른 프로세스의 변수는 복원하지 않음
+        (REPL_SESSION_ID가 없으면 이 프로세스를 띄운 부모 - 재시작해도 같은 값)
+        """
+        return os.environ.get('REPL_SESSION_ID') or f"ppid-{os.getppid()}"
+    
+    def _evicted_names(self):
+        """캐시로 옮겨져 네임스페이스에 없는 변수 이름"""
+        return self.evictor.evicted.keys() if self.evictor is not None else ()
+    
+    def maybe_snapshot(self):
+        """실행 사이 유휴 시점에 호출 - 주기가 되면 변경된 변수만 저장"""
+        if self.snapshotter is None:
+            return
+        with self.lock:
+            try:
+                result = self.snapshotter.maybe_snapshot(self.namespace, self._evicted_names())
+                if result and result['written']:
+                    print(f"[SNAPSHOT] {result['written']}개 저장 ({result['duration_ms']:.0f}ms)", file=sys.stderr)
+            except Exception as e:
+                print(f"[SNAPSHOT] 저장 실패: {e}", file=sys.stderr)
+    
+    def cancel_execution(self, request_id: Any = None, reason: str = 'cancelled') -> bool:
+        """실행 중인 셀 중단 (request_id 지정 시 그 요청일 때만) - 실행 중이 아니면 False"""
+        return self.interrupter.interrupt(reason, token=request_id)
+    
+    def _on_stuck_cell(self, reason: str):
+        """중단 요청 후에도 멈추지 않는 셀 - 네임스페이스를 저장하고 프로세스 종료"""
+        print(f"[CANCEL] 셀이 {self.interrupter.grace:g}초 안에 멈추지 않음 ({reason}) - 프로세스 종료",
+              file=sys.__stderr__)
+        
+        # 셀은 계속 실행 중이므로 현재 상태의 복사본을 저장 (실패해도 종료는 진행)
+        if self.snapshotter is not None and self.lock.acquire(timeout=5):
+            try:
+                result = self.snapshotter.snapshot(dict(self.namespace), self._evicted_names(), full=True)
+                print(f"[CANCEL] 네임스페이스 {result['written']}개 저장 - 재시작 후 복원", file=sys.__stderr__)
+            except Exception as e:
+                print(f"[CANCEL] 네임스페이스 저장 실패: {e}", file=sys.__stderr__)
+            finally:
+                self.lock.release()
+        
+        # 응답을 기다리는 클라이언트에 중단 결과 전송
+        if MULTIPLEXER is not None:
+            request_id = self.interrupter.token
+            if request_id is not None:
+                MULTIPLEXER.transport.send(_rpc_error(
+                    {'id': request_id}, REQUEST_CANCELLED, f'실행 중단 실패: {reason}',
+                    {'cancelled': reason, 'restarting': True}
+                ))
+        
+        sys.__stderr__.flush()
+        os._exit(EXIT_STUCK_CELL)
+    
+    def snapshot_namespace(self) -> Dict[str, Any]:
+        """즉시 스냅샷 저장"""
+        if self.snapshotter is None:
+            return {'error': 'snapshot disabled'}
+        with self.lock:
+            return self.snapshotter.snapshot(self.namespace, self._evicted_names(), full=True)
+    
+    def discard_snapshot(self) -> Dict[str, Any]:
+        """저장된 스냅샷 삭제 (복원 대기 중인 변수도 취소)"""
+        if self.snapshotter is None:
+            return {'error': 'snapshot disabled'}
+        with self.lock:
+            self.snapshotter.discard()
+        return {'ok': True}
+    
     def _init_namespace(self):
         """네임스페이스 초기화 - 백그라운드 헬퍼 포함"""
         self.namespace = {
@@ -99,6 +444,7 @@ class SmartSessionPool:
             'mem_status': self.memory_manager.get_memory_status,
             'mem_clean': self.memory_manager.clean_memory,
             'mem_report': lambda: print(get_memory_report()),
+            'mem_timeline': self.memory_manager.get_memory_timeline,
             'set_var': self.memory_manager.set_variable,
             'get_var': self.memory_manager.get_variable,
             # 백그라운드 작업 함수 추가
@@ -106,13 +452,52 @@ class SmartSessionPool:
             'bg_status': self.get_background_status,
             'bg_result': self.get_background_result,
             'bg_list': self.list_background_tasks,
+            # 잘린 출력 조회
+            'read_output': read_output,
+            # 네임스페이스 스냅샷
+            'ns_snapshot': self.snapshot_namespace,
+            'ns_discard_snapshot': self.discard_snapshot,
+            # 지연 실행 - 연산을 DAG로 기록하고 collect/print 등에서 최적화 후 실행
+            'lazy': lazy,
+            'scan_csv': scan_csv,
+            'scan_parquet': scan_parquet,
+            'col': col,
+            # 스트림을 여러 프로세스로 나눠 실행
+            'run_distributed': run_distributed,
+            'Combiner': Combiner,
         }
     
-    def execute_with_memory_management(self, code: str) -> Dict[str, Any]:
-        """메모리 관리가 포함된 코드 실행 - MCP 호환 개선"""
+    def execute_with_memory_management(self, code: str,
+                                       on_output: Optional[Callable[[str, str], None]] = None,
+                                       chunk_size: int = 8192,
+                                       interval: float = 0.1,
+                                       profile: Optional[Dict[str, Any]] = None,
+                                       memoize: bool = False,
+                                       timeout: Optional[float] = None,
+                                       request_id: Any = None) -> Dict[str, Any]:
+        """메모리 관리가 포함된 코드 실행 - MCP 호환 개선
+        
+        Args:
+            code: 실행할 코드
+            on_output: 지정 시 출력 스트리밍 모드 - (stream_name, chunk)로 실행 중 출력 전달.
+                       최종 결과에는 출력의 마지막 부분과 합계만 포함된다.
+            chunk_size: 스트리밍 시 청크 크기 (문자 수)
+            interval: 스트리밍 시 최대 플러시 간격 (초)
+            profile: 지정 시 cProfile로 실행 - {'top_n', 'sort', 'save', 'name'}.
+                     결과에 상위 핫스팟 표가 'profile'로 추가된다.
+            memoize: 같은 코드와 입력 값(읽는 변수, 읽는 파일)으로 성공한 이전 실행이 있으면
+                     실행하지 않고 저장된 출력과 변수 변경을 재생. 첫 줄 @cached_cell로도 지정.
+                     결과에 'memo' 정보가 추가된다.
+            timeout: 지정 시 이 시간(초)을 넘기면 셀을 중단. 그때까지 만든 변수는 유지되고
+                     결과에 'cancelled' 사유가 추가된다.
+            request_id: cancel 요청이 대상을 확인할 때 쓰는 요청 id
+        """
+        code, marked = strip_marker(code)
+        memoize = memoize or marked
         
-        # 실행 전 메모리 체크
+        # 실행 전 메모리 체크 (샘플러의 최신 측정값, psutil 호출 없음)
         before_status = self.memory_manager.get_memory_status()
+        started_at = time.time()
         
         # 메모리 정보는 stderr로만 출력 (디버그용)
         print(f"\n[MEM] 실행 시작 - {before_status['used_mb']:.1f}MB ({before_status['percent_used']:.1f}%)", file=sys.stderr)
@@ -127,53 +512,159 @@ class SmartSessionPool:
         # 실제 코드 실행 - 모든 환경에서 StringIO 캡처
         old_stdout = sys.stdout
         old_stderr = sys.stderr
+        profile_report = None
+        memo_call = None
+        # 캡처 생성 전에 실패할 수 있으므로 except에서 확인
+        stdout_buffer = stderr_buffer = None
         
         try:
-            # stdout 캡처를 위한 StringIO 설정
-            stdout_buffer = io.StringIO()
-            stderr_buffer = io.StringIO()
+            if on_output is not None:
+                # 스트리밍 캡처 - 실행 중 청크 단위로 전달, 마지막 부분만 보관
+                stdout_buffer = StreamingCapture(
+                    lambda chunk: on_output('stdout', chunk),
+                    chunk_size=chunk_size, interval=interval
+                ).start()
+                stderr_buffer = StreamingCapture(
+                    lambda chunk: on_output('stderr', chunk),
+                    chunk_size=chunk_size, interval=interval
+                ).start()
+            else:
+                # 상한이 있는 캡처 - 초과분은 파일로 내보내고 앞/뒤 부분만 보관
+                stdout_buffer = BoundedCapture(max_size=self.output_limit)
+                stderr_buffer = BoundedCapture(max_size=self.output_limit)
             
             sys.stdout = stdout_buffer
             sys.stderr = stderr_buffer
             
-            # 네임스페이스에서 코드 실행
-            exec(code, self.namespace)
+            # 네임스페이스에서 코드 실행 (컴파일 결과는 캐시에서 재사용)
+            code_obj = self.code_cache.compile(code)
+            if self.snapshotter is not None and self.snapshotter.pending:
+                # 이전 세션에서 복원 대기 중인 변수 중 이 셀이 사용하는 것만 로드
+                self.snapshotter.resolve(code_obj, self.namespace)
+            if self.evictor is not None:
+                # 예산 초과로 캐시에 옮긴 변수 중 이 셀이 사용하는 것 복원
+                self.evictor.resolve(code_obj, self.namespace)
+            if self.snapshotter is not None:
+                # 이 셀이 쓰는 변수만 다음 스냅샷에서 다시 검사 (제자리 변경 대비)
+                self.snapshotter.touch(code_obj, self.namespace)
+            if memoize and profile is None and self.session is not None and self.session.cell_memo is not None:
+                memo_call = self.session.cell_memo.prepare(code, code_obj, self.namespace)
+            
+            # cancel 요청이나 timeout 시 KeyboardInterrupt로 중단 (그때까지 만든 변수는 유지)
+            with self.interrupter.running(timeout=timeout, token=request_id):
+                if memo_call is not None and memo_call.hit:
+                    # 같은 코드와 입력 - 실행 대신 저장된 출력과 변수 변경 재생
+                    cached_stdout, cached_stderr = memo_call.replay(self.namespace)
+                    stdout_buffer.write(cached_stdout)
+                    stderr_buffer.write(cached_stderr)
+                    self.stats['memo_hits'] += 1
+                elif profile is None:
+                    recording = (memo_call.recording(self.namespace)
+                                 if memo_call is not None and memo_call.active else nullcontext())
+                    with recording:
+                        exec(code_obj, self.namespace)
+                else:
+                    profiler = cProfile.Profile()
+                    profiler.enable()
+                    try:
+                        exec(code_obj, self.namespace)
+                    finally:
+                        profiler.disable()
+                        profile_report = summarize_profile(profiler, **profile)
             
             # 출력 가져오기
+            stdout_buffer.close()
+            stderr_buffer.close()
             output = stdout_buffer.getvalue()
             error_output = stderr_buffer.getvalue()
             
-            # 실행 후 메모리 상태
-            after_status = self.memory_manager.get_memory_status()
+            # 출력 전체가 남아 있을 때만 결과 저장 (잘린 출력은 재생 불가)
+            if memo_call is not None and not (stdout_buffer.truncated or stderr_buffer.truncated):
+                memo_call.store(self.namespace, output, error_output)
+            
+            # 실행 후 메모리 상태 (RSS만 새로 측정, 실행 중 최대값은 샘플러 버퍼에서)
+            after_status = self.memory_manager.get_memory_status(fresh=True)
             memory_delta = after_status['used_mb'] - before_status['used_mb']
+            peak_mb = max(self.memory_manager.sampler.peak_since(started_at) or 0,
+                          after_status['used_mb'])
+            
+            # RSS 예산 초과 시 오래 사용하지 않은 큰 변수를 캐시로 이동
+            eviction = None
+            if self.evictor is not None:
+                eviction = self.evictor.maybe_evict(self.namespace, after_status['used_mb'])
+                if eviction and eviction['evicted']:
+                    self.stats['evicted_variables'] += len(eviction['evicted'])
+                    print(f"[MEM] 예산 초과 - 변수 {len(eviction['evicted'])}개 캐시로 이동 "
+                          f"({eviction['freed_mb']:.1f}MB)", file=old_stderr)
             
             # 통계 업데이트
             self.stats['total_executions'] += 1
-            if after_status['used_mb'] > self.stats['peak_memory_mb']:
-                self.stats['peak_memory_mb'] = after_status['used_mb']
+            self.stats['code_cache'] = self.code_cache.get_stats()
+            if peak_mb > self.stats['peak_memory_mb']:
+                self.stats['peak_memory_mb'] = round(peak_mb, 2)
             
-            print(f"[MEM] 실행 완료 - 메모리 변화: {memory_delta:+.1f}MB", file=sys.stderr)
+            print(f"[MEM] 실행 완료 - 메모리 변화: {memory_delta:+.1f}MB", file=old_stderr)
             
-            return {
+            if memo_call is not None and memo_call.hit:
+                label = 'memo'
+            else:
+                label = 'execute' if profile is None else 'profile'
+            self.history.record(
+                (time.time() - started_at) * 1000,
+                memory_mb=after_status['used_mb'],
+                memory_delta_mb=memory_delta,
+                label=label,
+                preview=code
+            )
+            
+            result = {
                 'status': 'success',
                 'stdout': output,
                 'stderr': '',
                 'memory': {
                     'before_mb': before_status['used_mb'],
                     'after_mb': after_status['used_mb'],
+                    'peak_mb': round(peak_mb, 2),
                     'delta_mb': round(memory_delta, 2),
                     'percent': after_status['percent_used'],
                     'variables': after_status['variables_count']
                 },
                 'stats': self.stats
             }
+            if eviction and eviction['evicted']:
+                result['memory']['evicted'] = eviction['evicted']
+            if memo_call is not None:
+                result['memo'] = memo_call.info()
+            if profile is not None:
+                result['profile'] = profile_report
+            if on_output is not None or stdout_buffer.truncated:
+                result['output'] = {
+                    'streamed': on_output is not None,
+                    'stdout': stdout_buffer.get_totals(),
+                    'stderr': stderr_buffer.get_totals()
+                }
+            return result
             
-        except Exception as e:
+        except (Exception, KeyboardInterrupt) as e:
+            # 스트리밍 모드에서는 에러 직전까지의 출력도 전달
+            for buffer in (stdout_buffer, stderr_buffer):
+                if buffer is not None:
+                    buffer.close()
+            # KeyboardInterrupt - cancel 요청, timeout 또는 Ctrl-C로 중단됨 (네임스페이스는 유지)
+            cancelled = isinstance(e, KeyboardInterrupt)
             
             # 에러 시에도 메모리 상태 확인
             error_status = self.memory_manager.get_memory_status()
+            self.history.record(
+                (time.time() - started_at) * 1000,
+                memory_mb=error_status['used_mb'],
+                memory_delta_mb=error_status['used_mb'] - before_status['used_mb'],
+                success=False,
+                label='execute' if profile is None else 'profile',
+                preview=code
+            )
             
-            return {
+            result = {
                 'status': 'error',
                 'error': str(e),
                 'traceback': traceback.format_exc(),
@@ -183,45 +674,131 @@ class SmartSessionPool:
                     'variables': error_status['variables_count']
                 }
             }
+            if cancelled:
+                reason = self.interrupter.last_reason or 'interrupted'
+                result['error'] = f'실행 중단: {reason}'
+                result['cancelled'] = reason
+                result['stdout'] = stdout_buffer.getvalue() if stdout_buffer is not None else ''
+            if profile is not None and profile_report is not None:
+                result['profile'] = profile_report
+            return result
         finally:
             # stdout/stderr 복원 보장
             sys.stdout = old_stdout
             sys.stderr = old_stderr
     
-    def run_background(self, code: str, task_name: str = None) -> str:
-        """백그라운드에서 코드 실행"""
-        import concurrent.futures
+    def run_background(self, code: str, task_name: str = None,
+                       inputs: Optional[List[str]] = None,
+                       outputs: Optional[List[str]] = None,
+                       mode: str = 'thread') -> str:
+        """백그라운드에서 코드 실행
         
-        if self.executor is None:
-            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        Args:
+            code: 실행할 코드
+            task_name: 작업 이름
+            inputs: 작업에 넘길 변수 이름 (생략 시 코드가 참조하는 이름)
+            outputs: 결과로 돌려받을 변수 이름 (생략 시 thread는 작업 네임스페이스,
+                     process는 새로 만들어진 pickle 가능한 값 전체)
+            mode: 'thread' - 같은 프로세스 (I/O 위주 작업)
+                  'process' - 미리 fork된 프로세스 풀 (CPU 위주 작업, GIL 회피)
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"mode must be 'thread' or 'process', got {mode!r}")
         
         task_id = f"bg_task_{self.task_counter}"
         self.task_counter += 1
         
+        try:
+            code_obj = self.code_cache.compile(code, '<bg>')
+            # 네임스페이스는 제출하는 스레드에서만 읽고 고침 (작업 쪽은 exec만)
+            selected = self._background_inputs(code_obj, inputs)
+        except Exception as e:
+            future = concurrent.futures.Future()
+            future.set_result({'status': 'error', 'error': str(e),
+                               'traceback': traceback.format_exc()})
+        else:
+            if mode == 'process':
+                future = self._submit_process(code, selected, inputs, outputs)
+            else:
+                if self.executor is None:
+                    self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+                future = self.executor.submit(self._execute_background, code_obj, selected, outputs)
+        
         # 백그라운드 작업 등록
-        future = self.executor.submit(self._execute_background, code)
         self.background_tasks[task_id] = {
             'future': future,
             'name': task_name or task_id,
+            'mode': mode,
             'start_time': datetime.now(),
             'code': code[:100] + '...' if len(code) > 100 else code,
             'status': 'running'
         }
         
         self.stats['background_tasks'] += 1
-        print(f"[BG] 백그라운드 작업 시작: {task_id}", file=sys.stderr)
+        print(f"[BG] 백그라운드 작업 시작: {task_id} ({mode})", file=sys.stderr)
         return task_id
     
-    def _execute_background(self, code: str) -> Dict[str, Any]:
-        """백그라운드 실행 워커"""
+    def _background_inputs(self, code_obj: types.CodeType,
+                           inputs: Optional[List[str]]) -> Dict[str, Any]:
+        """작업에 넘길 변수 선택 - 네임스페이스 전체 대신 필요한 이름만"""
+        if self.snapshotter is not None:
+            self.snapshotter.resolve(code_obj, self.namespace)
+        if self.evictor is not None:
+            self.evictor.resolve(code_obj, self.namespace)
+        if self.snapshotter is not None:
+            self.snapshotter.touch(code_obj, self.namespace)
+        
+        names = referenced_names(code_obj) if inputs is None else inputs
+        namespace = self.namespace
+        selected = {name: namespace[name] for name in names if name in namespace}
+        
+        if inputs is not None:
+            missing = [name for name in inputs if name not in namespace]
+            if missing:
+                raise NameError(f"bg_run inputs not defined: {', '.join(missing)}")
+        return selected
+    
+    def _execute_background(self, code_obj: types.CodeType, bg_namespace: Dict[str, Any],
+                            outputs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """백그라운드 실행 워커 (thread 모드)"""
         try:
-            # 별도 네임스페이스에서 실행
-            bg_namespace = dict(self.namespace)
-            exec(code, bg_namespace)
-            return {'status': 'success', 'namespace': bg_namespace}
+            # 참조하는 이름만 담은 별도 네임스페이스 (쓰기는 메인 네임스페이스에 영향 없음)
+            bg_namespace['__builtins__'] = self.namespace.get('__builtins__', builtins)
+            bg_namespace.setdefault('__name__', '__main__')
+            exec(code_obj, bg_namespace)
+            if outputs is None:
+                return {'status': 'success', 'namespace': bg_namespace}
+            return {'status': 'success',
+                    'outputs': {name: bg_namespace[name] for name in outputs if name in bg_namespace}}
         except Exception as e:
             return {'status': 'error', 'error': str(e), 'traceback': traceback.format_exc()}
     
+    def _submit_process(self, code: str, selected: Dict[str, Any], inputs: Optional[List[str]],
+                        outputs: Optional[List[str]]) -> 'concurrent.futures.Future':
+        """프로세스 풀에 작업 제출 - inputs로 지정한 값만 pickle로 전달"""
+        # 모듈은 이름만 넘기고 자식에서 import (fork로 이미 로드되어 있음)
+        # inputs 없이 참조 이름을 고른 경우 함수 등 pickle 불가 값은 제외
+        modules, values = {}, {}
+        for name, value in selected.items():
+            if isinstance(value, types.ModuleType):
+                modules[name] = value.__name__
+            elif inputs is not None or not callable(value):
+                values[name] = value
+        
+        if self.process_executor is None:
+            self.process_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=self._process_context()
+            )
+        return self.process_executor.submit(_run_background_process, code, values, modules, outputs)
+    
+    @staticmethod
+    def _process_context():
+        """가능하면 fork - 워커가 현재 프로세스의 import 상태를 그대로 물려받음"""
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('fork')
+        return multiprocessing.get_context()
+    
     def get_background_status(self, task_id: str = None) -> Dict[str, Any]:
         """백그라운드 작업 상태 확인"""
         if task_id:
@@ -232,6 +809,7 @@ class SmartSessionPool:
                 return {
                     'task_id': task_id,
                     'name': task['name'],
+                    'mode': task.get('mode', 'thread'),
                     'status': task['status'],
                     'running_time': str(datetime.now() - task['start_time'])
                 }
@@ -267,6 +845,7 @@ class SmartSessionPool:
             tasks.append({
                 'id': task_id,
                 'name': task['name'],
+                'mode': task.get('mode', 'thread'),
                 'status': 'completed' if task['future'].done() else 'running',
                 'start_time': task['start_time'].isoformat(),
                 'code_preview': task['code']
@@ -275,33 +854,62 @@ class SmartSessionPool:
     
     def cleanup(self):
         """리소스 정리"""
+        if self.snapshotter is not None:
+            try:
+                self.snapshotter.snapshot(self.namespace, self._evicted_names(), full=True)
+            except Exception as e:
+                print(f"[SNAPSHOT] 종료 시 저장 실패: {e}", file=sys.stderr)
+            self.snapshotter = None
         if self.executor:
             try:
                 self.executor.shutdown(wait=False)
                 print("[CLEANUP] ThreadPoolExecutor 종료됨", file=sys.stderr)
             except:
                 pass
+        if self.process_executor:
+            try:
+                self.process_executor.shutdown(wait=False, cancel_futures=True)
+                print("[CLEANUP] ProcessPoolExecutor 종료됨", file=sys.stderr)
+            except:
+                pass
     
     def get_stats_report(self) -> str:
         """통계 리포트 생성"""
         bg_status = self.get_background_status()
+        code_cache = self.code_cache.get_stats()
+        history = self.history.summary()
+        latency = history['elapsed_ms']
+        delta = history['memory_delta_mb']
         return f"""
 📊 세션 통계
 - 총 실행: {self.stats['total_executions']}회
 - 메모리 정리: {self.stats['memory_cleanups']}회
 - 최대 메모리: {self.stats['peak_memory_mb']:.1f}MB
 - 백그라운드 작업: {self.stats['background_tasks']}개 (실행중: {bg_status.get('running', 0)})
+- 코드 캐시: 적중 {code_cache['hits']}회 / 미스 {code_cache['misses']}회 ({code_cache['size']}개 보관)
+- 실행 시간 (최근 {history['retained']}회): p50 {latency['p50']:.1f}ms / p95 {latency['p95']:.1f}ms / p99 {latency['p99']:.1f}ms
+- 메모리 변화: p50 {delta['p50']:+.1f}MB / p95 {delta['p95']:+.1f}MB / 최대 {delta['max']:+.1f}MB
 """
 
 # 전역 세션 풀
 SESSION_POOL = SmartSessionPool()
 
 def execute_code(code: str, agent_id: Optional[str] = None, 
-                session_id: Optional[str] = None) -> Dict[str, Any]:
+                session_id: Optional[str] = None,
+                on_output: Optional[Callable[[str, str], None]] = None,
+                chunk_size: int = 8192,
+                interval: float = 0.1,
+                profile: Optional[Dict[str, Any]] = None,
+                memoize: bool = False,
+                timeout: Optional[float] = None,
+                request_id: Any = None) -> Dict[str, Any]:
     """메모리 관리가 강화된 코드 실행"""
     
     # 세션 풀에서 실행
-    result = SESSION_POOL.execute_with_memory_management(code)
+    result = SESSION_POOL.execute_with_memory_management(
+        code, on_output=on_output, chunk_size=chunk_size, interval=interval,
+        profile=profile, memoize=memoize, timeout=timeout, request_id=request_id
+    )
     
     # 주기적으로 통계 출력 (10회마다)
     if SESSION_POOL.stats['total_executions'] % 10 == 0:
@@ -310,98 +918,459 @@ def execute_code(code: str, agent_id: Optional[str] = None,
     
     return result
 
+# 읽기 전용 메서드 - 셀 실행 중에도 동시에 응답
+READ_ONLY_METHODS = frozenset({'memory', 'status', 'bg_status', 'read_output'})
+
+# 네임스페이스를 변경하는 메서드 - 요청 순서대로 직렬 실행
+MUTATING_METHODS = frozenset({'execute'})
+
+# 제어 메서드 - 셀 실행 중에도 즉시 처리
+CONTROL_METHODS = frozenset({'cancel'})
+
+# 취소된 요청의 JSON-RPC 에러 코드 (LSP RequestCancelled와 같은 값)
+REQUEST_CANCELLED = -32800
+
+# 현재 동작 중인 멀티플렉서 (main()에서 설정)
+MULTIPLEXER = None
+
+
+def _rpc_result(request: Dict[str, Any], result: Any) -> Dict[str, Any]:
+    """JSON-RPC 성공 응답 생성"""
+    return {
+        'jsonrpc': '2.0',
+        'id': request.get('id', 1),
+        'result': result
+    }
+
+
+def _rpc_error(request: Dict[str, Any], code: int, message: str,
+               data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """JSON-RPC 에러 응답 생성"""
+    error = {'code': code, 'message': message}
+    if data is not None:
+        error['data'] = data
+    return {
+        'jsonrpc': '2.0',
+        'id': request.get('id', 1),
+        'error': error
+    }
+
+
+def _make_output_notifier(request_id: Any, transport) -> Callable[[str, str], None]:
+    """실행 중 출력 청크를 output 알림으로 전송하는 콜백 생성"""
+    seq_lock = threading.Lock()
+    seq = [0]
+    
+    def notify(stream_name: str, chunk: str):
+        # stdout/stderr 플러시 스레드가 달라도 seq 순서대로 전송
+        with seq_lock:
+            seq[0] += 1
+            transport.send({
+                'jsonrpc': '2.0',
+                'method': 'output',
+                'params': {
+                    'id': request_id,
+                    'stream': stream_name,
+                    'seq': seq[0],
+                    'data': chunk
+                }
+            })
+    
+    return notify
+
+
+def _handle_execute(request: Dict[str, Any]) -> Dict[str, Any]:
+    """execute 요청 처리 (네임스페이스 변경)"""
+    # 코드 추출
+    params = request.get('params', {})
+    code = params.get('code', '')
+    agent_id = params.get('agent_id')
+    session_id = params.get('session_id')
+    
+    # 출력 스트리밍 (stream: true) - 실행 중 output 알림 전송
+    on_output = None
+    if params.get('stream') and MULTIPLEXER is not None:
+        on_output = _make_output_notifier(request.get('id', 1), MULTIPLEXER.transport)
+    
+    # 프로파일링 (profile: true) - 꺼져 있으면 추가 비용 없음
+    profile = None
+    if params.get('profile'):
+        profile = {
+            'top_n': int(params.get('top_n', 20)),
+            'sort': params.get('sort', 'cumulative'),
+            'save': bool(params.get('save_profile', False)),
+            'name': request.get('id')
+        }
+    
+    # 실행 시간 제한 (timeout: 초) - 초과하면 셀을 중단하고 네임스페이스는 유지
+    timeout = params.get('timeout')
+    
+    # 코드 실행
+    result = execute_code(
+        code, agent_id, session_id,
+        on_output=on_output,
+        chunk_size=int(params.get('stream_chunk_size', 8192)),
+        interval=float(params.get('stream_interval', 0.1)),
+        profile=profile,
+        memoize=bool(params.get('memoize', False)),
+        timeout=float(timeout) if timeout else None,
+        request_id=request.get('id')
+    )
+    
+    # 응답 생성
+    if result['status'] == 'success':
+        response = {
+            'stdout': result['stdout'],  # Changed to match the updated property name
+            'stderr': result.get('stderr', ''),
+            'memory': result['memory'],
+            'stats': result['stats']
+        }
+        for key in ('output', 'profile', 'memo'):
+            if key in result:
+                response[key] = result[key]
+        return _rpc_result(request, response)
+    error_data = {
+        'traceback': result.get('traceback'),
+        'memory': result['memory']
+    }
+    if 'profile' in result:
+        error_data['profile'] = result['profile']
+    if 'cancelled' in result:
+        error_data['cancelled'] = result['cancelled']
+        error_data['stdout'] = result['stdout']
+        return _rpc_error(request, REQUEST_CANCELLED, result['error'], error_data)
+    return _rpc_error(request, -32603, result['error'], error_data)
+
+
+def _handle_memory(request: Dict[str, Any]) -> Dict[str, Any]:
+    """memory 요청 처리 (읽기 전용)"""
+    return _rpc_result(request, MEMORY_MANAGER.get_memory_status())
+
+
+def _handle_status(request: Dict[str, Any]) -> Dict[str, Any]:
+    """status 요청 처리 (읽기 전용)"""
+    status = {
+        'stats': dict(SESSION_POOL.stats),
+        'background': SESSION_POOL.get_background_status(),
+        'history': SESSION_POOL.history.summary(),
+        'interrupts': SESSION_POOL.interrupter.get_stats()
+    }
+    if SESSION_POOL.snapshotter is not None:
+        status['snapshot'] = SESSION_POOL.snapshotter.get_stats()
+    if SESSION_POOL.evictor is not None:
+        status['eviction'] = SESSION_POOL.evictor.get_stats()
+    if SESSION_POOL.session is not None and SESSION_POOL.session.cell_memo is not None:
+        status['memo'] = SESSION_POOL.session.cell_memo.get_stats()
+    if MULTIPLEXER is not None:
+        status['requests'] = MULTIPLEXER.get_status()
+    return _rpc_result(request, status)
+
+
+def _handle_bg_status(request: Dict[str, Any]) -> Dict[str, Any]:
+    """bg_status 요청 처리 (읽기 전용)"""
+    params = request.get('params', {})
+    return _rpc_result(request, SESSION_POOL.get_background_status(params.get('task_id')))
+
+
+def _handle_read_output(request: Dict[str, Any]) -> Dict[str, Any]:
+    """read_output 요청 처리 (읽기 전용) - 파일로 내보낸 출력 페이지 조회"""
+    params = request.get('params', {})
+    try:
+        page = read_output(
+            params.get('handle', ''),
+            params.get('offset', 0),
+            params.get('length', 65536)
+        )
+    except KeyError as e:
+        return _rpc_error(request, -32602, str(e.args[0]))
+    return _rpc_result(request, page)
+
+
+def _handle_cancel(request: Dict[str, Any]) -> Dict[str, Any]:
+    """cancel 요청 처리 (즉시 처리) - 실행 중이거나 대기 중인 execute 요청 취소
+    
+    params.id로 대상 요청을 지정하며, 생략하면 실행 중인 셀을 중단한다.
+    """
+    params = request.get('params', {})
+    target = params.get('id')
+    reason = params.get('reason', 'cancelled')
+    
+    # 아직 시작하지 않은 요청은 큐에서 꺼낼 때 바로 취소 응답
+    if target is not None and MULTIPLEXER is not None and MULTIPLEXER.cancel_queued(target):
+        return _rpc_result(request, {'cancelled': True, 'state': 'queued', 'id': target})
+    
+    running_id = SESSION_POOL.interrupter.token
+    if SESSION_POOL.cancel_execution(target, reason):
+        return _rpc_result(request, {'cancelled': True, 'state': 'running', 'id': running_id})
+    return _rpc_result(request, {'cancelled': False, 'state': 'not_found', 'id': target})
+
+
+# 메서드 → 핸들러 매핑
+METHOD_HANDLERS = {
+    'execute': _handle_execute,
+    'cancel': _handle_cancel,
+    'memory': _handle_memory,
+    'status': _handle_status,
+    'bg_status': _handle_bg_status,
+    'read_output': _handle_read_output,
+}
+
+
 def process_json_request(request: Dict[str, Any]) -> Dict[str, Any]:
     """JSON-RPC 요청 처리"""
     try:
         # method 체크
         method = request.get('method', '')
-        if method != 'execute':
-            return {
-                'jsonrpc': '2.0',
-                'id': request.get('id', 1),
-                'error': {
-                    'code': -32601,
-                    'message': f'Method not found: {method}'
-                }
-            }
-        
-        # 코드 추출
-        params = request.get('params', {})
-        code = params.get('code', '')
-        agent_id = params.get('agent_id')
-        session_id = params.get('session_id')
+        handler = METHOD_HANDLERS.get(method)
+        if handler is None:
+            return _rpc_error(request, -32601, f'Method not found: {method}')
         
-        # 코드 실행
-        result = execute_code(code, agent_id, session_id)
-        
-        # 응답 생성
-        if result['status'] == 'success':
-            return {
-                'jsonrpc': '2.0',
-                'id': request.get('id', 1),
-                'result': {
-                    'stdout': result['stdout'],  # Changed to match the updated property name
-                    'stderr': result.get('stderr', ''),
-                    'memory': result['memory'],
-                    'stats': result['stats']
-                }
-            }
-        else:
-            return {
-                'jsonrpc': '2.0',
-                'id': request.get('id', 1),
-                'error': {
-                    'code': -32603,
-                    'message': result['error'],
-                    'data': {
-                        'traceback': result.get('traceback'),
-                        'memory': result['memory']
-                    }
-                }
-            }
+        return handler(request)
     except Exception as e:
+        return _rpc_error(request, -32603, str(e))
+
+
+class StdioTransport:
+    """stdio 프로토콜 전송 계층 - 요청 수신과 응답 전송
+    
+    프레이밍 모드:
+    - line: 한 줄에 JSON 하나 (기본값, MCP 핸들러 호환)
+    - length-prefixed: 4바이트 big-endian 길이 + 페이로드 (json 또는 msgpack)
+    
+    클라이언트가 negotiate 요청을 보내면 그 응답까지는 기존 모드로,
+    이후의 모든 송수신은 새 모드로 처리된다.
+    stdin은 항상 바이너리 버퍼로 읽고, 셀 실행 중에는 sys.stdout이
+    캡처 버퍼로 교체되므로 생성 시점의 실제 stdout을 보관해 사용한다.
+    """
+    
+    FRAMING_LINE = 'line'
+    FRAMING_LENGTH_PREFIXED = 'length-prefixed'
+    FRAME_HEADER = struct.Struct('>I')
+    
+    def __init__(self, stdin=None, stdout=None):
+        stdin = stdin or sys.stdin
+        self.reader = getattr(stdin, 'buffer', stdin)
+        self.stream = stdout or sys.stdout
+        self.buffer = getattr(self.stream, 'buffer', None)
+        self.lock = threading.Lock()
+        self.framing = self.FRAMING_LINE
+        self.codec = 'json'
+    
+    @staticmethod
+    def available_codecs() -> List[str]:
+        """사용 가능한 페이로드 코덱"""
+        return ['json', 'msgpack'] if MSGPACK_AVAILABLE else ['json']
+    
+    def negotiate(self, framing: str, codec: str = 'json') -> Dict[str, Any]:
+        """프레이밍 모드 협상 - 지원하지 않는 옵션은 기본값으로 대체"""
+        if framing != self.FRAMING_LENGTH_PREFIXED or self.buffer is None:
+            framing = self.FRAMING_LINE
+        if framing == self.FRAMING_LINE or codec not in self.available_codecs():
+            codec = 'json'
         return {
-            'jsonrpc': '2.0',
-            'id': request.get('id', 1),
-            'error': {
-                'code': -32603,
-                'message': str(e)
-            }
+            'framing': framing,
+            'codec': codec,
+            'codecs': self.available_codecs(),
+            'header': 'uint32-be' if framing == self.FRAMING_LENGTH_PREFIXED else None
         }
-
-def read_stdin_with_timeout(timeout=0.5):
-    """타임아웃과 함께 stdin 읽기"""
-    if sys.platform == 'win32':
-        # Windows에서는 threading 사용
-        import queue
-        q = queue.Queue()
+    
+    def switch(self, framing: str, codec: str):
+        """협상 결과 적용 (이후 송수신부터 적용)"""
+        with self.lock:
+            self.framing = framing
+            self.codec = codec
+    
+    def _read_exact(self, size: int) -> Optional[bytes]:
+        """정확히 size 바이트 읽기 (EOF면 None)"""
+        data = self.reader.read(size)
+        if len(data) < size:
+            return None
+        return data
+    
+    def read_message(self) -> Optional[bytes]:
+        """요청 한 건의 원본 바이트 읽기 (EOF면 None)"""
+        if self.framing == self.FRAMING_LENGTH_PREFIXED:
+            header = self._read_exact(self.FRAME_HEADER.size)
+            if header is None:
+                return None
+            (length,) = self.FRAME_HEADER.unpack(header)
+            return self._read_exact(length)
         
-        def read_input():
+        line = self.reader.readline()
+        if not line:
+            return None
+        if isinstance(line, str):
+            line = line.encode('utf-8')
+        return line
+    
+    def decode(self, payload: bytes) -> Any:
+        """요청 페이로드 디코딩"""
+        if self.codec == 'msgpack':
             try:
-                line = sys.stdin.readline()
-                if line:
-                    q.put(line)
-                else:
-                    q.put(None)
-            except:
-                q.put(None)
+                return msgpack.unpackb(payload, raw=False)
+            except Exception as e:
+                raise json.JSONDecodeError(f'Invalid msgpack payload: {e}', '', 0)
+        return json.loads(payload)
+    
+    def send(self, response: Dict[str, Any]):
+        """응답 한 건 전송"""
+        with self.lock:
+            self._write(response)
+    
+    def send_and_switch(self, response: Dict[str, Any], framing: str, codec: str):
+        """negotiate 응답을 기존 모드로 보내고 같은 잠금 안에서 새 모드로 전환
         
-        thread = threading.Thread(target=read_input)
-        thread.daemon = True
-        thread.start()
+        (사이에 다른 스레드의 응답이 끼어들어 잘못된 프레이밍으로 나가는 것을 방지)
+        """
+        with self.lock:
+            self._write(response)
+            self.framing = framing
+            self.codec = codec
+    
+    def _write(self, response: Dict[str, Any]):
+        """현재 모드로 응답 기록 (self.lock을 잡은 상태에서 호출)"""
+        if self.framing == self.FRAMING_LENGTH_PREFIXED:
+            if self.codec == 'msgpack':
+                payload = msgpack.packb(response, use_bin_type=True)
+            else:
+                payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
+            # 텍스트 계층에 남은 데이터를 먼저 내보낸 뒤 헤더+페이로드를 그대로 기록
+            self.stream.flush()
+            self.buffer.write(self.FRAME_HEADER.pack(len(payload)))
+            self.buffer.write(payload)
+            self.buffer.flush()
+        else:
+            response_json = json.dumps(response, ensure_ascii=False)
+            self.stream.write(response_json + '\n')
+            self.stream.flush()
+
+
+class RequestMultiplexer:
+    """JSON-RPC 요청 멀티플렉서
+    
+    - 읽기 전용 요청(memory/status/bg_status)과 cancel은 스레드 풀에서 즉시 처리
+    - 네임스페이스를 변경하는 요청(execute)은 직렬 큐에 넣어 순서대로 처리
+      (대기 중에 취소된 요청은 실행하지 않고 취소 응답)
+    - 응답은 완료 순서대로 전송되며, 클라이언트는 JSON-RPC id로 매칭한다
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, transport: StdioTransport, max_concurrent: int = 4,
+                 on_idle: Optional[Callable[[], None]] = None):
+        self.transport = transport
+        self.on_idle = on_idle  # 직렬 큐가 비었을 때 호출 (스냅샷 등)
+        self.serial_queue = queue.Queue()
+        self.concurrent_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrent,
+            thread_name_prefix='repl-readonly'
+        )
+        self.current_request_id = None
+        self.current_started_at = None
+        self.lock = threading.Lock()
         
-        try:
-            return q.get(timeout=timeout)
-        except queue.Empty:
-            return ""
-    else:
-        # Unix/Linux에서는 select 사용
-        if select.select([sys.stdin], [], [], timeout)[0]:
-            return sys.stdin.readline()
-        return ""
+        # 직렬 큐에서 대기 중인 요청 id와 그중 취소된 것
+        self.queued_ids = set()
+        self.cancelled_ids = set()
+        
+        # 통계
+        self.stats = {
+            'received': 0,
+            'concurrent': 0,
+            'serial': 0
+        }
+    
+    def dispatch(self, request: Dict[str, Any]):
+        """요청 분배 - 읽기 전용은 동시 처리, 나머지는 직렬 큐"""
+        method = request.get('method', '') if isinstance(request, dict) else ''
+        with self.lock:
+            self.stats['received'] += 1
+        
+        if method in READ_ONLY_METHODS or method in CONTROL_METHODS:
+            with self.lock:
+                self.stats['concurrent'] += 1
+            self.concurrent_pool.submit(self._respond, request)
+        else:
+            request_id = request.get('id') if isinstance(request, dict) else None
+            if request_id is not None:
+                with self.lock:
+                    self.queued_ids.add(request_id)
+            self.serial_queue.put(request)
+    
+    def cancel_queued(self, request_id: Any) -> bool:
+        """대기 중인 요청 취소 표시 - 아직 시작하지 않았으면 True"""
+        with self.lock:
+            if request_id not in self.queued_ids:
+                return False
+            self.cancelled_ids.add(request_id)
+            return True
+    
+    def _respond(self, request: Dict[str, Any]):
+        """요청 처리 후 응답 전송"""
+        if not isinstance(request, dict):
+            response = _rpc_error({}, -32600, 'Invalid Request')
+        else:
+            response = process_json_request(request)
+        self.transport.send(response)
+    
+    def run_serial(self):
+        """직렬 실행 루프 - 메인 스레드에서 실행 (stop() 호출 시 종료)"""
+        while True:
+            request = self.serial_queue.get()
+            if request is self._STOP:
+                break
+            
+            request_id = request.get('id') if isinstance(request, dict) else None
+            with self.lock:
+                self.queued_ids.discard(request_id)
+                if request_id in self.cancelled_ids:
+                    self.cancelled_ids.discard(request_id)
+                    cancelled = True
+                else:
+                    cancelled = False
+                    self.stats['serial'] += 1
+                    self.current_request_id = request_id
+                    self.current_started_at = time.time()
+            if cancelled:
+                self.transport.send(_rpc_error(request, REQUEST_CANCELLED, '실행 전 취소됨',
+                                               {'cancelled': 'cancelled before start'}))
+                continue
+            try:
+                self._respond(request)
+            finally:
+                with self.lock:
+                    self.current_request_id = None
+                    self.current_started_at = None
+            
+            # 응답 전송 후, 대기 중인 요청이 없을 때만 유휴 작업 수행
+            if self.on_idle is not None and self.serial_queue.empty():
+                self.on_idle()
+    
+    def stop(self):
+        """직렬 루프 종료 요청 (대기 중인 요청은 모두 처리 후 종료)"""
+        self.serial_queue.put(self._STOP)
+    
+    def shutdown(self):
+        """동시 처리 풀 종료 (진행 중인 응답은 모두 전송)"""
+        self.concurrent_pool.shutdown(wait=True)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """멀티플렉서 상태"""
+        with self.lock:
+            running_for = None
+            if self.current_started_at is not None:
+                running_for = round(time.time() - self.current_started_at, 3)
+            return {
+                'busy': self.current_request_id is not None,
+                'current_request_id': self.current_request_id,
+                'running_seconds': running_for,
+                'queued': self.serial_queue.qsize(),
+                **self.stats
+            }
 
 def main():
     """메인 실행 루프 - 세션 영속성 보장"""
+    global MULTIPLEXER
     DEBUG = os.environ.get('DEBUG', '').lower() == 'true'
     
     print("Enhanced JSON REPL with Memory Management v4.1", file=sys.stderr)
@@ -425,63 +1394,81 @@ def main():
         SESSION_POOL.get_or_create_session()
         print("세션 풀 초기화 완료 - 요청 대기 중", file=sys.stderr)
     
-    # 에러 카운터
-    error_counter = 0
-    max_errors = 5
-    request_count = 0
+    transport = StdioTransport(sys.stdin, sys.stdout)
+    multiplexer = RequestMultiplexer(transport, on_idle=SESSION_POOL.maybe_snapshot)
+    MULTIPLEXER = multiplexer
     
-    # 메인 루프 - 모든 요청을 블로킹으로 처리 (안정성 최우선)
-    while error_counter < max_errors:
+    def read_requests():
+        """요청 수신 스레드 - 셀 실행 중에도 계속 stdin을 읽는다"""
+        # 에러 카운터
+        error_counter = 0
+        max_errors = 5
+        request_count = 0
+        
         try:
-            # 모든 요청을 블로킹으로 대기 (MCP 핸들러 완벽 호환)
-            line = sys.stdin.readline()
-            
-            if not line:  # EOF
-                if DEBUG:
-                    print("[EOF] 입력 스트림 종료", file=sys.stderr)
-                break
-            
-            request_count += 1
-            error_counter = 0  # 성공적인 읽기 시 에러 카운터 리셋
-            
-            # 디버그 출력 (조건부)
-            if DEBUG:
-                print(f"[DEBUG] Received request: {line.strip()[:100]}...", file=sys.stderr)
-            
-            # JSON 파싱
-            request = json.loads(line.strip())
-            
-            # 요청 처리
-            response = process_json_request(request)
-            
-            # 디버그 출력 (조건부)
-            if DEBUG:
-                print(f"[DEBUG] Sending response", file=sys.stderr)
-            
-            # 응답 전송
-            response_json = json.dumps(response, ensure_ascii=False)
-            print(response_json)
-            sys.stdout.flush()
-            
-        except KeyboardInterrupt:
-            print("\n[INTERRUPT] 사용자 중단", file=sys.stderr)
-            break
-        except json.JSONDecodeError as e:
-            error_counter += 1
-            error_response = {
-                'jsonrpc': '2.0',
-                'error': {
-                    'code': -32700,
-                    'message': f'Parse error: {str(e)}'
-                }
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
-        except Exception as e:
-            error_counter += 1
-            print(f"[ERROR {error_counter}/{max_errors}] {e}", file=sys.stderr)
-            if error_counter >= max_errors:
-                print(f"[FATAL] 연속 {max_errors}회 에러 - 종료", file=sys.stderr)
+            while error_counter < max_errors:
+                try:
+                    message = transport.read_message()
+                    
+                    if message is None:  # EOF
+                        if DEBUG:
+                            print("[EOF] 입력 스트림 종료", file=sys.stderr)
+                        break
+                    
+                    if not message.strip():
+                        continue
+                    
+                    request_count += 1
+                    error_counter = 0  # 성공적인 읽기 시 에러 카운터 리셋
+                    
+                    # 디버그 출력 (조건부)
+                    if DEBUG:
+                        print(f"[DEBUG] Received request: {message[:100]!r}...", file=sys.stderr)
+                    
+                    # 디코딩
+                    request = transport.decode(message)
+                    
+                    # 프레이밍 협상은 수신 스레드에서 즉시 처리
+                    # (응답은 기존 모드로 보내고, 다음 요청부터 새 모드로 읽는다)
+                    if isinstance(request, dict) and request.get('method') == 'negotiate':
+                        params = request.get('params', {})
+                        agreed = transport.negotiate(
+                            params.get('framing', StdioTransport.FRAMING_LINE),
+                            params.get('codec', 'json')
+                        )
+                        transport.send_and_switch(_rpc_result(request, agreed),
+                                                  agreed['framing'], agreed['codec'])
+                        continue
+                    
+                    multiplexer.dispatch(request)
+                    
+                except json.JSONDecodeError as e:
+                    error_counter += 1
+                    transport.send({
+                        'jsonrpc': '2.0',
+                        'error': {
+                            'code': -32700,
+                            'message': f'Parse error: {str(e)}'
+                        }
+                    })
+                except Exception as e:
+                    error_counter += 1
+                    print(f"[ERROR {error_counter}/{max_errors}] {e}", file=sys.stderr)
+                    if error_counter >= max_errors:
+                        print(f"[FATAL] 연속 {max_errors}회 에러 - 종료", file=sys.stderr)
+        finally:
+            multiplexer.stop()
+    
+    reader = threading.Thread(target=read_requests, name='repl-reader', daemon=True)
+    reader.start()
+    
+    # 메인 루프 - 네임스페이스 변경 요청은 메인 스레드에서 순서대로 처리
+    try:
+        multiplexer.run_serial()
+    except KeyboardInterrupt:
+        print("\n[INTERRUPT] 사용자 중단", file=sys.stderr)
+    finally:
+        multiplexer.shutdown()
     
     # 정리
     print("\n[EXIT] 세션 종료", file=sys.stderr)
@@ -5,15 +5,173 @@
 실시간 메모리 모니터링과 자동 정리 시스템
 """
 
+import os
 import sys
 import gc
 import psutil
 import json
 import time
-from typing import Dict, Any, Optional
+import threading
+from collections import namedtuple
+from typing import Dict, Any, Optional, List
 from datetime import datetime
 import traceback
 
+from repl_core.sizing import estimate_size
+
+
+# 메모리 측정값 (MB 단위, percent는 시스템 메모리 사용률)
+MemorySample = namedtuple(
+    'MemorySample',
+    ['timestamp', 'rss_mb', 'vms_mb', 'available_mb', 'total_mb', 'percent']
+)
+
+
+class MemorySampler:
+    """백그라운드 메모리 샘플러
+    
+    일정 간격으로 프로세스 RSS와 시스템 메모리를 측정해 고정 크기 링 버퍼에 기록합니다.
+    실행 경로는 psutil을 호출하지 않고 최신 측정값을 읽으며, 실행 중 최대 사용량과
+    메모리 타임라인도 버퍼에서 계산합니다.
+    
+    기록은 샘플러 스레드(와 즉시 측정 요청)만 하고, 읽기는 잠금 없이 수행합니다.
+    슬롯에 완성된 튜플을 넣은 뒤 카운터를 올리므로 읽는 쪽은 항상 완전한 값을 봅니다.
+    """
+    
+    def __init__(self, interval: float = 0.5, capacity: int = 1200):
+        """
+        Args:
+            interval: 측정 간격 (초), 0이면 스레드 없이 요청 시에만 측정
+            capacity: 보관할 측정값 수 (기본 0.5초 x 1200 = 10분)
+        """
+        self.interval = interval
+        self.capacity = capacity
+        
+        self._slots: List[Optional[MemorySample]] = [None] * capacity
+        self._count = 0  # 지금까지 기록된 측정값 수
+        self._write_lock = threading.Lock()
+        
+        self._pid = os.getpid()
+        self._process = psutil.Process()
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def start(self) -> 'MemorySampler':
+        """샘플러 스레드 시작"""
+        if self.interval > 0 and not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="memory-sampler", daemon=True
+            )
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        """샘플러 스레드 중지"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2 + 1)
+            self._thread = None
+    
+    @property
+    def running(self) -> bool:
+        return (self._thread is not None and self._thread.is_alive()
+                and self._pid == os.getpid())
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+    
+    def _proc(self) -> 'psutil.Process':
+        # fork된 자식 프로세스에서는 자신의 pid로 다시 생성
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._process = psutil.Process()
+            self._thread = None
+        return self._process
+    
+    def _record(self, sample: MemorySample) -> MemorySample:
+        with self._write_lock:
+            self._slots[self._count % self.capacity] = sample
+            self._count += 1
+        return sample
+    
+    def sample(self) -> MemorySample:
+        """프로세스와 시스템 메모리를 측정해 기록"""
+        memory_info = self._proc().memory_info()
+        system_memory = psutil.virtual_memory()
+        return self._record(MemorySample(
+            timestamp=time.time(),
+            rss_mb=memory_info.rss / 1024 / 1024,
+            vms_mb=memory_info.vms / 1024 / 1024,
+            available_mb=system_memory.available / 1024 / 1024,
+            total_mb=system_memory.total / 1024 / 1024,
+            percent=system_memory.percent
+        ))
+    
+    def sample_process(self) -> MemorySample:
+        """프로세스 RSS만 새로 측정 (시스템 값은 최신 측정값 재사용)"""
+        last = self._last()
+        if last is None:
+            return self.sample()
+        memory_info = self._proc().memory_info()
+        return self._record(last._replace(
+            timestamp=time.time(),
+            rss_mb=memory_info.rss / 1024 / 1024,
+            vms_mb=memory_info.vms / 1024 / 1024
+        ))
+    
+    def _last(self) -> Optional[MemorySample]:
+        count = self._count
+        if count == 0:
+            return None
+        return self._slots[(count - 1) % self.capacity]
+    
+    def latest(self) -> MemorySample:
+        """최신 측정값 - 샘플러가 멈춰 있거나 값이 오래됐으면 즉시 측정"""
+        last = self._last()
+        if (last is None or not self.running or
+                time.time() - last.timestamp > self.interval * 2):
+            return self.sample()
+        return last
+    
+    def samples(self, since: Optional[float] = None) -> List[MemorySample]:
+        """버퍼의 측정값 (오래된 순), since 이후 것만"""
+        count = self._count
+        start = max(0, count - self.capacity)
+        result = []
+        for i in range(start, count):
+            sample = self._slots[i % self.capacity]
+            if sample is not None and (since is None or sample.timestamp >= since):
+                result.append(sample)
+        return result
+    
+    def peak_since(self, since: float) -> Optional[float]:
+        """since 이후 최대 RSS (MB), 측정값이 없으면 None"""
+        peak = None
+        for sample in self.samples(since):
+            if peak is None or sample.rss_mb > peak:
+                peak = sample.rss_mb
+        return peak
+    
+    def timeline(self, seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        """메모리 타임라인 (최근 seconds초, 생략 시 버퍼 전체)"""
+        since = time.time() - seconds if seconds else None
+        return [
+            {
+                'time': datetime.fromtimestamp(s.timestamp).isoformat(timespec='milliseconds'),
+                'rss_mb': round(s.rss_mb, 2),
+                'available_mb': round(s.available_mb, 2),
+                'percent': s.percent
+            }
+            for s in self.samples(since)
+        ]
+
+
 class MemoryManager:
     """스마트 메모리 관리자"""
     
@@ -38,29 +196,34 @@ class MemoryManager:
         # 공유 변수 저장소
         self.shared_variables = {}
         self.variable_access_time = {}  # LRU 캐시용
+        
+        # 백그라운드 메모리 샘플러 (MEM_SAMPLE_INTERVAL=0이면 요청 시에만 측정)
+        interval = float(os.environ.get('MEM_SAMPLE_INTERVAL', '0.5'))
+        self.sampler = MemorySampler(interval=interval).start()
     
-    def get_memory_status(self) -> Dict[str, Any]:
-        """현재 메모리 상태 조회"""
-        process = psutil.Process()
-        memory_info = process.memory_info()
-        system_memory = psutil.virtual_memory()
+    def get_memory_status(self, fresh: bool = False) -> Dict[str, Any]:
+        """현재 메모리 상태 조회
         
-        # MB 단위로 변환
-        used_mb = memory_info.rss / 1024 / 1024
-        available_mb = system_memory.available / 1024 / 1024
-        total_mb = system_memory.total / 1024 / 1024
-        percent = system_memory.percent
+        Args:
+            fresh: True면 프로세스 RSS를 새로 측정 (기본은 샘플러의 최신 값)
+        """
+        sample = self.sampler.sample_process() if fresh else self.sampler.latest()
+        percent = sample.percent
         
         return {
-            'used_mb': round(used_mb, 2),
-            'available_mb': round(available_mb, 2),
-            'total_mb': round(total_mb, 2),
+            'used_mb': round(sample.rss_mb, 2),
+            'available_mb': round(sample.available_mb, 2),
+            'total_mb': round(sample.total_mb, 2),
             'percent_used': percent,
             'variables_count': len(self.shared_variables),
             'warning': percent > self.MEMORY_WARNING_THRESHOLD,
             'critical': percent > self.MEMORY_CRITICAL_THRESHOLD
         }
     
+    def get_memory_timeline(self, seconds: Optional[float] = 60) -> List[Dict[str, Any]]:
+        """최근 메모리 타임라인 (샘플러 버퍼)"""
+        return self.sampler.timeline(seconds)
+    
     def should_clean_memory(self) -> bool:
         """메모리 정리가 필요한지 확인"""
         status = self.get_memory_status()
@@ -81,14 +244,14 @@ class MemoryManager:
     
     def clean_memory(self, force: bool = False) -> Dict[str, Any]:
         """메모리 정리 수행"""
-        before = self.get_memory_status()
+        before = self.get_memory_status(fresh=True)
         
         cleaned_vars = 0
         
         # 1. 큰 변수 정리 (1GB 초과)
         for key in list(self.shared_variables.keys()):
             try:
-                size_mb = sys.getsizeof(self.shared_variables[key]) / 1024 / 1024
+                size_mb = estimate_size(self.shared_variables[key]) / 1024 / 1024
                 if size_mb > self.MAX_VAR_SIZE_MB:
                     del self.shared_variables[key]
                     cleaned_vars += 1
@@ -115,7 +278,7 @@ class MemoryManager:
         self.stats['gc_runs'] += 1
         self.stats['last_gc_time'] = datetime.now().isoformat()
         
-        after = self.get_memory_status()
+        after = self.get_memory_status(fresh=True)
         
         return {
             'before': before,
@@ -128,7 +291,7 @@ class MemoryManager:
     def set_variable(self, key: str, value: Any) -> Dict[str, Any]:
         """변수 저장 with 메모리 체크"""
         # 크기 체크
-        size_mb = sys.getsizeof(value) / 1024 / 1024
+        size_mb = estimate_size(value) / 1024 / 1024
         
         if size_mb > self.MAX_VAR_SIZE_MB:
             return {
@@ -190,7 +353,7 @@ def execute_code_with_memory_check(code: str) -> Dict[str, Any]:
         exec(code, namespace)
         
         # 실행 후 메모리 상태
-        after_status = MEMORY_MANAGER.get_memory_status()
+        after_status = MEMORY_MANAGER.get_memory_status(fresh=True)
         memory_delta = after_status['used_mb'] - before_status['used_mb']
         
         # 메모리 증가량이 크면 경고
@@ -267,6 +430,10 @@ def mem_report():
     """메모리 리포트 출력"""
     print(get_memory_report())
 
+def mem_timeline(seconds: float = 60):
+    """최근 메모리 타임라인"""
+    return MEMORY_MANAGER.get_memory_timeline(seconds)
+
 if __name__ == "__main__":
     # 테스트
     print("Memory Management Facade Initialized")
@@ -15,6 +15,7 @@ from .base import (
 
 from .session import EnhancedREPLSession
 from .memory_manager import MemoryManager
+from .snapshot import NamespaceSnapshotter
 
 __version__ = "1.0.0"
 __all__ = [
@@ -24,5 +25,6 @@ __all__ = [
     "ExecutionResult",
     "ExecutionMode",
     "EnhancedREPLSession",
-    "MemoryManager"
+    "MemoryManager",
+    "NamespaceSnapshotter"
 ]
\ No newline at end of file
@@ -3,10 +3,11 @@ Base classes and interfaces for REPL Core components.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Generator, AsyncGenerator, Union
+from typing import Dict, Any, Optional, Generator, AsyncGenerator, Union, Iterable, List, Mapping
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
+import pickle
 
 
 class ExecutionMode(Enum):
@@ -14,7 +15,7 @@ class ExecutionMode(Enum):
     IMMEDIATE = "immediate"      # Execute immediately in memory
     STREAMING = "streaming"       # Stream processing for large data
     LAZY = "lazy"                # Lazy evaluation with DAG
-    DISTRIBUTED = "distributed"   # Distributed processing (future)
+    DISTRIBUTED = "distributed"   # Multi-process processing on this host
 
 
 @dataclass
@@ -107,6 +108,56 @@ class BaseCache(ABC):
     def get_size(self) -> int:
         """Get cache size in bytes."""
         pass
+    
+    def put_bytes(self, key: str, data: bytes) -> bool:
+        """
+        Store a value that is already pickled.
+        
+        Backends that persist bytes override this to write ``data`` as is,
+        so a value serialized once can move between caches without being
+        pickled again.
+        """
+        return self.put(key, pickle.loads(data))
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Retrieve a value in pickled form (counterpart of ``put_bytes``)."""
+        value = self.get(key)
+        if value is None:
+            return None
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    # Batch operations. These defaults loop over the single-key methods;
+    # backends with per-call overhead (transactions, files) override them.
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Retrieve several values; missing keys are left out."""
+        result = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                result[key] = value
+        return result
+    
+    def put_many(self, items: Mapping[str, Any]) -> List[str]:
+        """Store several values. Returns the keys that were stored."""
+        return [key for key, value in items.items() if self.put(key, value)]
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys. Returns how many were deleted."""
+        return sum(1 for key in keys if self.delete(key))
+    
+    def get_many_bytes(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Batch counterpart of ``get_bytes``."""
+        result = {}
+        for key in keys:
+            data = self.get_bytes(key)
+            if data is not None:
+                result[key] = data
+        return result
+    
+    def put_many_bytes(self, items: Mapping[str, bytes]) -> List[str]:
+        """Batch counterpart of ``put_bytes``. Returns the keys that were stored."""
+        return [key for key, data in items.items() if self.put_bytes(key, data)]
 
 
 class BaseStream(ABC):
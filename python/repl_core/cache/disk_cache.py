@@ -8,7 +8,8 @@ import hashlib
 import time
 import json
 import logging
-from typing import Any, Optional, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, List, Dict, Mapping
 import zlib
 from pathlib import Path
 
@@ -17,10 +18,17 @@ from ..base import BaseCache
 logger = logging.getLogger(__name__)
 
 
+# Threads for batch file I/O (reads, writes and zlib release the GIL)
+IO_WORKERS = 8
+
+
 class DiskCache(BaseCache):
     """
     File-based cache with optional compression.
     Supports Parquet for DataFrames and pickle for general objects.
+    
+    Batch operations read and write their files on a thread pool and save
+    the metadata file once per batch instead of once per key.
     """
     
     def __init__(
@@ -68,6 +76,37 @@ class DiskCache(BaseCache):
         """Check if object is a pandas DataFrame."""
         return type(obj).__name__ == 'DataFrame'
     
+    def _touch(self, *keys: str):
+        """Update access time."""
+        touched = False
+        for key in keys:
+            if key in self.metadata:
+                self.metadata[key]['accessed_at'] = time.time()
+                self.metadata[key]['access_count'] += 1
+                touched = True
+        if touched:
+            self._save_metadata()
+    
+    def _map(self, func: Callable, items: Iterable) -> List:
+        """Apply ``func`` to each item, on a thread pool when there are several."""
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(IO_WORKERS, len(items))) as pool:
+            return list(pool.map(func, items))
+    
+    def _metadata_entry(self, file_path: Path, file_type: str) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'file_path': str(file_path),
+            'size_bytes': file_path.stat().st_size,
+            'type': file_type,
+            'created_at': now,
+            'accessed_at': now,
+            'access_count': 0,
+            'compressed': self.compress
+        }
+    
     def get(self, key: str) -> Optional[Any]:
         """Retrieve value from disk."""
         file_path = self._get_file_path(key)
@@ -76,11 +115,7 @@ class DiskCache(BaseCache):
             return None
         
         try:
-            # Update access time
-            if key in self.metadata:
-                self.metadata[key]['accessed_at'] = time.time()
-                self.metadata[key]['access_count'] += 1
-                self._save_metadata()
+            self._touch(key)
             
             # Check file type from metadata
             file_type = self.metadata.get(key, {}).get('type', 'pickle')
@@ -96,60 +131,152 @@ class DiskCache(BaseCache):
             
             else:
                 # Load as pickle
-                with open(file_path, 'rb') as f:
-                    data = f.read()
-                    if self.compress:
-                        data = zlib.decompress(data)
-                    return pickle.loads(data)
+                return pickle.loads(self._read_pickled(file_path))
                     
         except Exception as e:
             logger.error(f"Failed to load {key}: {e}")
             return None
     
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Retrieve the pickled value (decompressed) without unpickling it."""
+        file_path = self._get_file_path(key)
+        
+        if not file_path.exists():
+            return None
+        
+        if self.metadata.get(key, {}).get('type', 'pickle') == 'parquet':
+            # Stored as Parquet: only available as an object
+            return super().get_bytes(key)
+        
+        try:
+            self._touch(key)
+            return self._read_pickled(file_path)
+        except Exception as e:
+            logger.error(f"Failed to load {key}: {e}")
+            return None
+    
+    def _read_pickled(self, file_path: Path) -> bytes:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if self.compress:
+            data = zlib.decompress(data)
+        return data
+    
+    def _read_many(self, keys: Iterable[str], as_bytes: bool) -> Dict[str, Any]:
+        def read(key: str):
+            file_path = self._get_file_path(key)
+            try:
+                if self.metadata.get(key, {}).get('type', 'pickle') == 'parquet':
+                    import pandas as pd
+                    value = pd.read_parquet(file_path)
+                    if as_bytes:
+                        value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                    return key, value
+                data = self._read_pickled(file_path)
+                return key, data if as_bytes else pickle.loads(data)
+            except FileNotFoundError:
+                return key, None
+            except Exception as e:
+                logger.error(f"Failed to load {key}: {e}")
+                return key, None
+        
+        result = {key: value for key, value in self._map(read, dict.fromkeys(keys))
+                  if value is not None}
+        self._touch(*result)
+        return result
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Retrieve several values, reading the files in parallel."""
+        return self._read_many(keys, as_bytes=False)
+    
+    def get_many_bytes(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Batch counterpart of ``get_bytes``."""
+        return self._read_many(keys, as_bytes=True)
+    
     def put(self, key: str, value: Any) -> bool:
         """Store value on disk."""
+        if self._is_dataframe(value):
+            try:
+                import pandas as pd
+            except ImportError:
+                pass
+            else:
+                # Save as Parquet for DataFrames
+                return self._store(
+                    key,
+                    lambda path: value.to_parquet(path, compression='snappy' if self.compress else None),
+                    'parquet'
+                )
+        
+        # Use pickle for general objects
+        try:
+            serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.error(f"Failed to cache {key}: {e}")
+            return False
+        return self.put_bytes(key, serialized)
+    
+    def put_bytes(self, key: str, data: bytes) -> bool:
+        """Store an already pickled value (compressed if enabled)."""
+        def write(path: Path):
+            with open(path, 'wb') as f:
+                f.write(zlib.compress(data) if self.compress else data)
+        
+        return self._store(key, write, 'pickle')
+    
+    def put_many(self, items: Mapping[str, Any]) -> List[str]:
+        """Store several values; DataFrames go to Parquet one by one."""
+        stored = []
+        pickled = {}
+        for key, value in items.items():
+            if self._is_dataframe(value):
+                if self.put(key, value):
+                    stored.append(key)
+                continue
+            try:
+                pickled[key] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.error(f"Failed to cache {key}: {e}")
+        return stored + self.put_many_bytes(pickled)
+    
+    def put_many_bytes(self, items: Mapping[str, bytes]) -> List[str]:
+        """Store several pickled values, writing the files in parallel."""
+        def write(item):
+            key, data = item
+            file_path = self._get_file_path(key)
+            try:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(file_path, 'wb') as f:
+                    f.write(zlib.compress(data) if self.compress else data)
+                return key, self._metadata_entry(file_path, 'pickle')
+            except Exception as e:
+                logger.error(f"Failed to cache {key}: {e}")
+                # Clean up partial file
+                file_path.unlink(missing_ok=True)
+                return key, None
+        
+        stored = []
+        for key, entry in self._map(write, items.items()):
+            if entry is not None:
+                self.metadata[key] = entry
+                stored.append(key)
+        
+        if stored:
+            self._save_metadata()
+            self._ensure_capacity()
+        return stored
+    
+    def _store(self, key: str, write, file_type: str) -> bool:
+        """Write a cache file with ``write(path)`` and record its metadata."""
         file_path = self._get_file_path(key)
         
         try:
             # Create directory if needed
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Determine storage format
-            if self._is_dataframe(value):
-                # Save as Parquet for DataFrames
-                try:
-                    import pandas as pd
-                    value.to_parquet(file_path, compression='snappy' if self.compress else None)
-                    file_type = 'parquet'
-                except ImportError:
-                    # Fallback to pickle
-                    file_type = 'pickle'
-                    serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
-                    if self.compress:
-                        serialized = zlib.compress(serialized)
-                    with open(file_path, 'wb') as f:
-                        f.write(serialized)
-            else:
-                # Use pickle for general objects
-                file_type = 'pickle'
-                serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
-                if self.compress:
-                    serialized = zlib.compress(serialized)
-                
-                with open(file_path, 'wb') as f:
-                    f.write(serialized)
+            write(file_path)
             
             # Update metadata
-            file_size = file_path.stat().st_size
-            self.metadata[key] = {
-                'file_path': str(file_path),
-                'size_bytes': file_size,
-                'type': file_type,
-                'created_at': time.time(),
-                'accessed_at': time.time(),
-                'access_count': 0,
-                'compressed': self.compress
-            }
+            self.metadata[key] = self._metadata_entry(file_path, file_type)
             self._save_metadata()
             
             # Check capacity
@@ -217,6 +344,25 @@ class DiskCache(BaseCache):
         
         return False
     
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys, removing the files in parallel."""
+        def unlink(key: str):
+            try:
+                self._get_file_path(key).unlink()
+                return key
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                logger.error(f"Failed to delete {key}: {e}")
+                return None
+        
+        deleted = [key for key in self._map(unlink, dict.fromkeys(keys)) if key is not None]
+        for key in deleted:
+            self.metadata.pop(key, None)
+        if deleted:
+            self._save_metadata()
+        return len(deleted)
+    
     def clear(self):
         """Clear all cache files."""
         # Remove all cache files
@@ -248,6 +394,10 @@ class DiskCache(BaseCache):
         """List all cached keys."""
         return list(self.metadata.keys())
     
+    def key_sizes(self) -> Dict[str, int]:
+        """Map each stored key to its size in bytes."""
+        return {key: entry['size_bytes'] for key, entry in self.metadata.items()}
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         if not self.metadata:
@@ -2,11 +2,14 @@
 SQLite-based cache for warm data storage.
 """
 
+import os
 import sqlite3
 import pickle
 import time
+import atexit
 import logging
-from typing import Any, Optional, List
+import threading
+from typing import Any, Dict, Iterable, Optional, List, Mapping, Tuple
 import zlib
 
 from ..base import BaseCache
@@ -14,9 +17,27 @@ from ..base import BaseCache
 logger = logging.getLogger(__name__)
 
 
+# Memory-map up to this much of the database file for reads
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Buffered access stats are written once this many keys were read ...
+ACCESS_FLUSH_EVERY = 256
+# ... or this many seconds after the last write
+ACCESS_FLUSH_INTERVAL = 5.0
+
+# Keys per "IN (...)" query in batch operations (SQLite's parameter limit)
+BATCH_SIZE = 500
+
+
 class SQLiteCache(BaseCache):
     """
     SQLite cache with compression support.
+    
+    Each thread keeps one connection in WAL mode with ``synchronous=NORMAL``
+    and a memory-mapped read path. Reads do not write: access times and
+    counts are buffered and written in one batch every
+    ``ACCESS_FLUSH_EVERY`` reads or ``ACCESS_FLUSH_INTERVAL`` seconds, and
+    before anything that orders by them (capacity eviction, stats).
     """
     
     def __init__(
@@ -29,11 +50,80 @@ class SQLiteCache(BaseCache):
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.compress = compress
         
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        
+        # key -> (last access time, reads since the last flush)
+        self._pending_access: Dict[str, Tuple[float, int]] = {}
+        self._last_flush = time.time()
+        
         self._init_db()
+        atexit.register(self.close)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the calling thread, opened on first use."""
+        conn = getattr(self._local, 'conn', None)
+        # A forked child must not reuse the parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            # Used only by this thread; close() may run on another one
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def _record_access(self, *keys: str):
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                _, count = self._pending_access.get(key, (0.0, 0))
+                self._pending_access[key] = (now, count + 1)
+            due = (len(self._pending_access) >= ACCESS_FLUSH_EVERY or
+                   time.time() - self._last_flush >= ACCESS_FLUSH_INTERVAL)
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """Write buffered access times and counts."""
+        with self._lock:
+            pending, self._pending_access = self._pending_access, {}
+            self._last_flush = time.time()
+        if not pending:
+            return
+        try:
+            with self._connection() as conn:
+                conn.executemany(
+                    """UPDATE cache
+                       SET accessed_at = ?, access_count = access_count + ?
+                       WHERE key = ?""",
+                    [(accessed_at, count, key) for key, (accessed_at, count) in pending.items()]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write access stats: {e}")
+    
+    def close(self):
+        """Flush access stats and close all connections."""
+        try:
+            self.flush()
+        except sqlite3.ProgrammingError:
+            pass  # Already closed
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
     
     def _init_db(self):
         """Initialize database schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS cache (
                     key TEXT PRIMARY KEY,
@@ -56,44 +146,87 @@ class SQLiteCache(BaseCache):
     
     def get(self, key: str) -> Optional[Any]:
         """Retrieve value from cache."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT value FROM cache WHERE key = ?",
-                (key,)
-            )
-            row = cursor.fetchone()
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            logger.error(f"Failed to deserialize {key}: {e}")
+            return None
+    
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Retrieve the pickled value (decompressed)."""
+        cursor = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ?",
+            (key,)
+        )
+        row = cursor.fetchone()
+        
+        if row:
+            # Update access metadata (buffered)
+            self._record_access(key)
             
-            if row:
-                # Update access metadata
-                conn.execute(
-                    """UPDATE cache 
-                       SET accessed_at = ?, access_count = access_count + 1
-                       WHERE key = ?""",
-                    (time.time(), key)
-                )
-                conn.commit()
-                
-                # Deserialize value
-                try:
-                    data = row[0]
-                    if self.compress:
-                        data = zlib.decompress(data)
-                    return pickle.loads(data)
-                except Exception as e:
-                    logger.error(f"Failed to deserialize {key}: {e}")
-                    return None
+            try:
+                data = row[0]
+                if self.compress:
+                    data = zlib.decompress(data)
+                return data
+            except Exception as e:
+                logger.error(f"Failed to decompress {key}: {e}")
+                return None
         
         return None
     
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Retrieve several values with one query per ``BATCH_SIZE`` keys."""
+        result = {}
+        for key, data in self.get_many_bytes(keys).items():
+            try:
+                result[key] = pickle.loads(data)
+            except Exception as e:
+                logger.error(f"Failed to deserialize {key}: {e}")
+        return result
+    
+    def get_many_bytes(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Batch counterpart of ``get_bytes``."""
+        keys = list(dict.fromkeys(keys))
+        conn = self._connection()
+        rows = []
+        for i in range(0, len(keys), BATCH_SIZE):
+            chunk = keys[i:i + BATCH_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(conn.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders})",
+                chunk
+            ))
+        
+        result = {}
+        for key, data in rows:
+            try:
+                result[key] = zlib.decompress(data) if self.compress else data
+            except Exception as e:
+                logger.error(f"Failed to decompress {key}: {e}")
+        if result:
+            self._record_access(*result)
+        return result
+    
     def put(self, key: str, value: Any) -> bool:
         """Store value in cache."""
         try:
-            # Serialize value
             serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.error(f"Failed to cache {key}: {e}")
+            return False
+        return self.put_bytes(key, serialized)
+    
+    def put_bytes(self, key: str, data: bytes) -> bool:
+        """Store an already pickled value (compressed if enabled)."""
+        try:
             if self.compress:
-                serialized = zlib.compress(serialized)
+                data = zlib.compress(data)
             
-            size_bytes = len(serialized)
+            size_bytes = len(data)
             
             # Check size limit
             if size_bytes > self.max_size_bytes:
@@ -103,14 +236,14 @@ class SQLiteCache(BaseCache):
             self._ensure_capacity(size_bytes)
             
             # Store in database
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 conn.execute(
                     """INSERT OR REPLACE INTO cache 
                        (key, value, size_bytes, created_at, accessed_at, access_count)
                        VALUES (?, ?, ?, ?, ?, COALESCE(
                            (SELECT access_count FROM cache WHERE key = ?), 0
                        ))""",
-                    (key, serialized, size_bytes, time.time(), time.time(), key)
+                    (key, data, size_bytes, time.time(), time.time(), key)
                 )
                 conn.commit()
             
@@ -120,15 +253,55 @@ class SQLiteCache(BaseCache):
             logger.error(f"Failed to cache {key}: {e}")
             return False
     
+    def put_many(self, items: Mapping[str, Any]) -> List[str]:
+        """Store several values in one transaction."""
+        pickled = {}
+        for key, value in items.items():
+            try:
+                pickled[key] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                logger.error(f"Failed to cache {key}: {e}")
+        return self.put_many_bytes(pickled)
+    
+    def put_many_bytes(self, items: Mapping[str, bytes]) -> List[str]:
+        """Store several pickled values in one transaction (``executemany``)."""
+        rows = []
+        now = time.time()
+        for key, data in items.items():
+            if self.compress:
+                data = zlib.compress(data)
+            if len(data) > self.max_size_bytes:
+                continue
+            rows.append((key, data, len(data), now, now, key))
+        if not rows:
+            return []
+        
+        try:
+            self._ensure_capacity(sum(row[2] for row in rows))
+            with self._connection() as conn:
+                conn.executemany(
+                    """INSERT OR REPLACE INTO cache 
+                       (key, value, size_bytes, created_at, accessed_at, access_count)
+                       VALUES (?, ?, ?, ?, ?, COALESCE(
+                           (SELECT access_count FROM cache WHERE key = ?), 0
+                       ))""",
+                    rows
+                )
+        except Exception as e:
+            logger.error(f"Failed to cache {len(rows)} entries: {e}")
+            return []
+        return [row[0] for row in rows]
+    
     def _ensure_capacity(self, required_bytes: int):
         """Ensure cache has capacity by evicting LRU entries."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             # Get current size
             cursor = conn.execute("SELECT SUM(size_bytes) FROM cache")
             current_size = cursor.fetchone()[0] or 0
             
             if current_size + required_bytes > self.max_size_bytes:
-                # Need to evict
+                # Need to evict; LRU order needs the buffered access times
+                self.flush()
                 bytes_to_free = (current_size + required_bytes) - self.max_size_bytes
                 
                 # Get LRU entries
@@ -158,7 +331,7 @@ class SQLiteCache(BaseCache):
     
     def exists(self, key: str) -> bool:
         """Check if key exists."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM cache WHERE key = ? LIMIT 1",
                 (key,)
@@ -167,7 +340,9 @@ class SQLiteCache(BaseCache):
     
     def delete(self, key: str) -> bool:
         """Delete key from cache."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
+            self._pending_access.pop(key, None)
+        with self._connection() as conn:
             cursor = conn.execute(
                 "DELETE FROM cache WHERE key = ?",
                 (key,)
@@ -175,38 +350,64 @@ class SQLiteCache(BaseCache):
             conn.commit()
             return cursor.rowcount > 0
     
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys in one transaction."""
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for key in keys:
+                self._pending_access.pop(key, None)
+        
+        deleted = 0
+        with self._connection() as conn:
+            for i in range(0, len(keys), BATCH_SIZE):
+                chunk = keys[i:i + BATCH_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                cursor = conn.execute(
+                    f"DELETE FROM cache WHERE key IN ({placeholders})",
+                    chunk
+                )
+                deleted += cursor.rowcount
+        return deleted
+    
     def clear(self):
         """Clear all entries."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
+            self._pending_access.clear()
+        with self._connection() as conn:
             conn.execute("DELETE FROM cache")
             conn.commit()
         
         # VACUUM must be run outside transaction
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.execute("VACUUM")
-            conn.close()
+            self._connection().execute("VACUUM")
         except:
             pass  # VACUUM is optional optimization
     
     def get_size(self) -> int:
         """Get total cache size in bytes."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute("SELECT SUM(size_bytes) FROM cache")
             return cursor.fetchone()[0] or 0
     
     def list_keys(self, pattern: str = "%") -> List[str]:
         """List keys matching pattern."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.execute(
                 "SELECT key FROM cache WHERE key LIKE ?",
                 (pattern,)
             )
             return [row[0] for row in cursor]
     
+    def key_sizes(self) -> Dict[str, int]:
+        """Map each stored key to its size in bytes."""
+        with self._connection() as conn:
+            cursor = conn.execute("SELECT key, size_bytes FROM cache")
+            return dict(cursor.fetchall())
+    
     def get_stats(self) -> dict:
         """Get cache statistics."""
-        with sqlite3.connect(self.db_path) as conn:
+        self.flush()
+        with self._connection() as conn:
             # Entry count
             cursor = conn.execute("SELECT COUNT(*) FROM cache")
             count = cursor.fetchone()[0]
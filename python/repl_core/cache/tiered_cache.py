@@ -2,9 +2,13 @@
 Multi-tier caching system with automatic tier migration.
 """
 
+import os
 import time
+import heapq
+import atexit
 import logging
-from typing import Any, Optional, Dict, List, Tuple
+import sqlite3
+from typing import Any, Optional, Dict, Iterable, List, Mapping, Set, Tuple
 from enum import Enum
 from dataclasses import dataclass
 from collections import OrderedDict
@@ -16,6 +20,39 @@ from ..base import BaseCache
 logger = logging.getLogger(__name__)
 
 
+# Marks "no object given" where None is a valid cached value
+_MISSING = object()
+
+# The entry index is written once this many entries changed ...
+INDEX_FLUSH_EVERY = 64
+# ... or this many seconds after the last write
+INDEX_FLUSH_INTERVAL = 5.0
+
+
+def _lock_file(path: str):
+    """
+    Open ``path`` holding an exclusive lock on it, or return None if
+    another process holds it. The lock lasts until the file is closed
+    (at the latest when the process exits).
+    """
+    try:
+        handle = open(path, 'a+b')
+    except OSError:
+        return None
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
 class CacheTier(Enum):
     """Cache tier levels."""
     L1_MEMORY = "memory"      # Hot data (<100MB)
@@ -34,6 +71,8 @@ class CacheEntry:
     last_access: float = 0.0
     created_at: float = 0.0
     ttl: Optional[float] = None
+    # Disk tier still holding a copy of an entry promoted out of it
+    backing: Optional[CacheTier] = None
     
     @property
     def is_expired(self) -> bool:
@@ -61,6 +100,21 @@ class TieredCache:
     - TTL support
     - Compression for large objects
     - Statistics tracking
+    
+    Values are pickled once on ``put``; the disk tiers store those bytes
+    and hand them back on reads, so moving an entry between disk tiers
+    copies bytes instead of unpickling and pickling it again.
+    
+    The index of disk-tier entries (tier, size, access stats, TTL) is kept
+    in ``index.db`` so they stay reachable after a restart. It is loaded
+    on first use and reconciled with what the backends hold: entries whose
+    data is gone are dropped, data the index does not know about (written
+    after the last index flush) is adopted. Only one process at a time
+    uses the index: while another live process holds it, this one keeps
+    its entries in memory only and adopts nothing. An entry promoted from SQLite
+    into memory keeps its SQLite copy, so it is restored from there;
+    values put straight into memory are not persisted (pass
+    ``min_tier=CacheTier.L2_SQLITE`` for those).
     """
     
     def __init__(
@@ -68,7 +122,8 @@ class TieredCache:
         memory_limit_mb: float = 100,
         sqlite_limit_mb: float = 1000,
         parquet_limit_mb: float = 10000,
-        cache_dir: str = ".repl_cache"
+        cache_dir: str = ".repl_cache",
+        persist_index: bool = True
     ):
         self.memory_limit_mb = memory_limit_mb
         self.sqlite_limit_mb = sqlite_limit_mb
@@ -83,6 +138,10 @@ class TieredCache:
         self._tier_sizes: Dict[CacheTier, int] = {
             tier: 0 for tier in CacheTier
         }
+        # Keys of each tier, least recently used first
+        self._tier_lru: Dict[CacheTier, "OrderedDict[str, None]"] = {
+            tier: OrderedDict() for tier in CacheTier
+        }
         
         # Statistics
         self._stats = {
@@ -90,9 +149,181 @@ class TieredCache:
             'misses': 0,
             'evictions': 0,
             'promotions': 0,
-            'demotions': 0
+            'demotions': 0,
+            'restored_entries': 0,
+            'index_flushes': 0
         }
         
+        # Persistent entry index, loaded on first use
+        self.persist_index = persist_index
+        self._index_path = os.path.join(cache_dir, "index.db")
+        self._index_loaded = not persist_index
+        self._index_lock = None
+        self._dirty: Set[str] = set()
+        self._last_flush = time.time()
+        if persist_index:
+            atexit.register(self.flush)
+    
+    # ------------------------------------------------------------------
+    # Persistent index
+    # ------------------------------------------------------------------
+    
+    def _load_index(self):
+        """Load the entry index and reconcile it with the tier backends."""
+        if self._index_loaded:
+            return
+        self._index_loaded = True
+        start = time.perf_counter()
+        
+        if self._index_lock is None:
+            self._index_lock = _lock_file(self._index_path + ".lock")
+            if self._index_lock is None:
+                # Its entries and unflushed data belong to the other process
+                logger.info(f"Cache index {self._index_path} is in use by another process; "
+                            "not persisting entries of this one")
+                self.persist_index = False
+                return
+        
+        try:
+            with sqlite3.connect(self._index_path) as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS entries (
+                        key TEXT PRIMARY KEY,
+                        tier TEXT,
+                        size_bytes INTEGER,
+                        access_count INTEGER,
+                        last_access REAL,
+                        created_at REAL,
+                        ttl REAL
+                    )
+                """)
+                rows = conn.execute("SELECT * FROM entries ORDER BY last_access").fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Cannot read cache index, starting empty: {e}")
+            self.persist_index = False
+            return
+        
+        disk_tiers = [tier for tier in CacheTier if tier != CacheTier.L1_MEMORY]
+        held = {tier: self._tier_backends[tier].key_sizes() for tier in disk_tiers}
+        
+        for key, tier_value, size_bytes, access_count, last_access, created_at, ttl in rows:
+            tier = CacheTier(tier_value)
+            if tier not in held or key not in held[tier]:
+                self._dirty.add(key)  # Data is gone
+                continue
+            entry = CacheEntry(key, size_bytes, tier, access_count, last_access, created_at, ttl)
+            if entry.is_expired:
+                self._tier_backends[tier].delete(key)
+                self._dirty.add(key)
+                continue
+            self._add_entry(entry)
+        
+        # Data the index does not know about
+        now = time.time()
+        for tier in disk_tiers:
+            for key, size_bytes in held[tier].items():
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry.tier != tier:
+                        # Copy left behind by an interrupted move
+                        self._tier_backends[tier].delete(key)
+                    continue
+                self._add_entry(CacheEntry(key, size_bytes, tier, last_access=now, created_at=now))
+                self._dirty.add(key)
+        
+        self._stats['restored_entries'] = len(self._entries)
+        self.flush()
+        
+        if self._entries:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"Restored {len(self._entries)} cache entries in {elapsed_ms:.0f}ms")
+    
+    def _add_entry(self, entry: CacheEntry, recent: bool = True):
+        """Track an entry in its tier, as most (or least) recently used."""
+        self._entries[entry.key] = entry
+        self._tier_sizes[entry.tier] += entry.size_bytes
+        lru = self._tier_lru[entry.tier]
+        lru[entry.key] = None
+        if not recent:
+            lru.move_to_end(entry.key, last=False)
+        if entry.backing is not None:
+            # The backing copy takes space (and can be evicted) in its tier
+            self._tier_sizes[entry.backing] += entry.size_bytes
+            self._tier_lru[entry.backing][entry.key] = None
+    
+    def _remove_entry(self, entry: CacheEntry):
+        """Stop tracking an entry."""
+        del self._entries[entry.key]
+        self._tier_sizes[entry.tier] -= entry.size_bytes
+        self._tier_lru[entry.tier].pop(entry.key, None)
+        if entry.backing is not None:
+            self._tier_sizes[entry.backing] -= entry.size_bytes
+            self._tier_lru[entry.backing].pop(entry.key, None)
+    
+    def _drop_backing(self, entry: CacheEntry):
+        """Delete the backing copy of an entry; it then lives only in its tier."""
+        tier = entry.backing
+        self._tier_backends[tier].delete(entry.key)
+        self._tier_sizes[tier] -= entry.size_bytes
+        self._tier_lru[tier].pop(entry.key, None)
+        entry.backing = None
+        self._mark(entry.key)
+    
+    def _restore_backing(self, entry: CacheEntry, recent: bool = True):
+        """Make the backing copy the entry (the memory backend dropped the object)."""
+        self._remove_entry(entry)
+        entry.tier, entry.backing = entry.backing, None
+        self._add_entry(entry, recent=recent)
+        self._mark(entry.key)
+    
+    def _mark(self, *keys: str):
+        """Record that entries changed; writes the index now and then."""
+        if not self.persist_index:
+            return
+        self._dirty.update(keys)
+        if (len(self._dirty) >= INDEX_FLUSH_EVERY or
+                time.time() - self._last_flush >= INDEX_FLUSH_INTERVAL):
+            self.flush()
+    
+    def flush(self):
+        """Write changed entries to the persistent index."""
+        if not self.persist_index or not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        
+        rows = []
+        removed = []
+        for key in keys:
+            entry = self._entries.get(key)
+            # A memory entry is restored from its backing copy, if any
+            tier = None if entry is None else (
+                entry.backing if entry.tier == CacheTier.L1_MEMORY else entry.tier)
+            if tier is None:
+                removed.append((key,))
+            else:
+                rows.append((key, tier.value, entry.size_bytes, entry.access_count,
+                             entry.last_access, entry.created_at, entry.ttl))
+        
+        try:
+            with sqlite3.connect(self._index_path) as conn:
+                conn.executemany("DELETE FROM entries WHERE key = ?", removed)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to write cache index: {e}")
+            self._dirty |= keys
+        
+        self._last_flush = time.time()
+        self._stats['index_flushes'] += 1
+    
+    def keys(self, prefix: str = "") -> List[str]:
+        """Keys of the cached entries, optionally only those starting with ``prefix``."""
+        self._load_index()
+        return [key for key in self._entries if key.startswith(prefix)]
+        
     def _init_tiers(self):
         """Initialize cache tier backends."""
         import os
@@ -149,6 +380,7 @@ class TieredCache:
         """
         Retrieve value from cache with automatic tier promotion.
         """
+        self._load_index()
         if key not in self._entries:
             self._stats['misses'] += 1
             return None
@@ -161,23 +393,40 @@ class TieredCache:
             self._stats['misses'] += 1
             return None
         
-        # Get from appropriate tier
+        # Get from appropriate tier (disk tiers hand out the pickled bytes,
+        # which are reused as is if the entry is promoted to another disk tier)
         backend = self._tier_backends[entry.tier]
-        value = backend.get(key)
+        data = None
+        if entry.tier == CacheTier.L1_MEMORY:
+            value = backend.get(key)
+        else:
+            data = backend.get_bytes(key)
+            value = self._deserialize(key, data)
+        
+        if value is None and entry.backing is not None:
+            # Dropped by the memory backend; the disk copy is still there
+            data = self._tier_backends[entry.backing].get_bytes(key)
+            value = self._deserialize(key, data)
+            if value is not None:
+                self._restore_backing(entry)
         
         if value is None:
             # Data corruption or missing
-            del self._entries[key]
+            self._remove_entry(entry)
+            self._mark(key)
             self._stats['misses'] += 1
             return None
         
         # Update access metadata
         entry.access_count += 1
         entry.last_access = time.time()
+        self._tier_lru[entry.tier].move_to_end(key)
+        if entry.tier != CacheTier.L1_MEMORY:
+            self._mark(key)
         
         # Consider promotion if frequently accessed
         if entry.access_frequency > 10 and entry.tier != CacheTier.L1_MEMORY:
-            self._promote_entry(key, entry, value)
+            self._promote_entry(key, entry, value=value, data=data)
         
         self._stats['hits'] += 1
         return value
@@ -186,31 +435,41 @@ class TieredCache:
         self,
         key: str,
         value: Any,
-        ttl: Optional[float] = None
+        ttl: Optional[float] = None,
+        min_tier: Optional[CacheTier] = None
     ) -> bool:
         """
         Store value in appropriate cache tier.
+        ``min_tier`` keeps the value at or below that tier (e.g. L2_SQLITE
+        to make sure it leaves process memory).
         """
-        # Estimate size
-        try:
-            serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
-            size_bytes = len(serialized)
-        except:
+        self._load_index()
+        
+        # Serialize once: the bytes give the size and are what disk tiers store
+        serialized = self._serialize(key, value)
+        if serialized is None:
             return False
+        size_bytes = len(serialized)
         
         # Determine tier
         tier = self._determine_tier(size_bytes)
+        tiers = list(CacheTier)
+        if min_tier is not None and tiers.index(tier) < tiers.index(min_tier):
+            tier = min_tier
         
         # Check tier capacity and evict if needed
         self._ensure_capacity(tier, size_bytes)
         
+        # Replacing a key: drop the old copy (it may live in another tier)
+        if key in self._entries:
+            self.delete(key)
+        
         # Store in backend
-        backend = self._tier_backends[tier]
-        success = backend.put(key, value)
+        success = self._store(key, tier, value=value, data=serialized)
         
         if success:
             # Update metadata
-            self._entries[key] = CacheEntry(
+            self._add_entry(CacheEntry(
                 key=key,
                 size_bytes=size_bytes,
                 tier=tier,
@@ -218,13 +477,192 @@ class TieredCache:
                 last_access=time.time(),
                 created_at=time.time(),
                 ttl=ttl
-            )
-            self._tier_sizes[tier] += size_bytes
+            ))
+            if tier != CacheTier.L1_MEMORY:
+                self._mark(key)
             
             logger.debug(f"Cached {key} in {tier.value} (size: {size_bytes})")
         
         return success
     
+    # ------------------------------------------------------------------
+    # Batch operations
+    # ------------------------------------------------------------------
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Retrieve several values with one batch read per tier.
+        Missing and expired keys are left out.
+        """
+        self._load_index()
+        by_tier: Dict[CacheTier, List[str]] = {}
+        misses = 0
+        for key in dict.fromkeys(keys):
+            entry = self._entries.get(key)
+            if entry is None:
+                misses += 1
+            elif entry.is_expired:
+                self.delete(key)
+                misses += 1
+            else:
+                by_tier.setdefault(entry.tier, []).append(key)
+        
+        result = {}
+        raw: Dict[str, bytes] = {}
+        for tier, tier_keys in by_tier.items():
+            backend = self._tier_backends[tier]
+            if tier == CacheTier.L1_MEMORY:
+                result.update(backend.get_many(tier_keys))
+                continue
+            data = backend.get_many_bytes(tier_keys)
+            for key, payload in data.items():
+                value = self._deserialize(key, payload)
+                if value is not None:
+                    result[key] = value
+                    raw[key] = payload
+        
+        now = time.time()
+        promote = []
+        changed = []
+        for tier_keys in by_tier.values():
+            for key in tier_keys:
+                entry = self._entries[key]
+                if key not in result and entry.backing is not None:
+                    # Dropped by the memory backend; the disk copy is still there
+                    data = self._tier_backends[entry.backing].get_bytes(key)
+                    value = self._deserialize(key, data)
+                    if value is not None:
+                        result[key] = value
+                        raw[key] = data
+                        self._restore_backing(entry)
+                if key not in result:
+                    # Data corruption or missing
+                    self._remove_entry(entry)
+                    changed.append(key)
+                    misses += 1
+                    continue
+                entry.access_count += 1
+                entry.last_access = now
+                self._tier_lru[entry.tier].move_to_end(key)
+                if entry.tier != CacheTier.L1_MEMORY:
+                    changed.append(key)
+                    if entry.access_frequency > 10:
+                        promote.append(entry)
+        self._mark(*changed)
+        
+        # After the bookkeeping: promoting may evict other entries of the batch
+        self._promote_many(promote, result, raw)
+        
+        self._stats['hits'] += len(result)
+        self._stats['misses'] += misses
+        return result
+    
+    def put_many(
+        self,
+        items: Mapping[str, Any],
+        ttl: Optional[float] = None,
+        min_tier: Optional[CacheTier] = None
+    ) -> List[str]:
+        """
+        Store several values with one batch write per tier (see ``put``).
+        Returns the keys that were stored.
+        """
+        self._load_index()
+        tiers = list(CacheTier)
+        
+        by_tier: Dict[CacheTier, Dict[str, bytes]] = {}
+        for key, value in items.items():
+            serialized = self._serialize(key, value)
+            if serialized is None:
+                continue
+            tier = self._determine_tier(len(serialized))
+            if min_tier is not None and tiers.index(tier) < tiers.index(min_tier):
+                tier = min_tier
+            by_tier.setdefault(tier, {})[key] = serialized
+        
+        # Replacing keys: drop the old copies (they may live in other tiers)
+        self.delete_many([key for batch in by_tier.values() for key in batch if key in self._entries])
+        
+        stored = []
+        now = time.time()
+        for tier, batch in by_tier.items():
+            self._ensure_capacity(tier, sum(len(data) for data in batch.values()))
+            backend = self._tier_backends[tier]
+            if tier == CacheTier.L1_MEMORY:
+                tier_stored = [key for key in batch if backend.put(key, items[key])]
+            else:
+                tier_stored = backend.put_many_bytes(batch)
+            
+            for key in tier_stored:
+                self._add_entry(CacheEntry(
+                    key=key,
+                    size_bytes=len(batch[key]),
+                    tier=tier,
+                    access_count=0,
+                    last_access=now,
+                    created_at=now,
+                    ttl=ttl
+                ))
+            if tier != CacheTier.L1_MEMORY:
+                self._mark(*tier_stored)
+            stored.extend(tier_stored)
+        
+        logger.debug(f"Cached {len(stored)} of {len(items)} entries in a batch")
+        return stored
+    
+    def _promote_many(self, entries: List[CacheEntry], values: Dict[str, Any], raw: Dict[str, bytes]):
+        """Promote several entries one tier up; old copies are deleted in one batch per tier."""
+        tiers = list(CacheTier)
+        moved: Dict[CacheTier, List[str]] = {}
+        for entry in entries:
+            if self._entries.get(entry.key) is not entry:
+                continue  # Evicted while promoting an earlier one
+            old_tier = entry.tier
+            new_tier = tiers[tiers.index(old_tier) - 1]
+            self._ensure_capacity(new_tier, entry.size_bytes)
+            if not self._store(entry.key, new_tier, value=values[entry.key], data=raw[entry.key]):
+                continue
+            self._remove_entry(entry)
+            if new_tier == CacheTier.L1_MEMORY:
+                # Copied up: the disk copy stays for restarts
+                entry.backing = old_tier
+            else:
+                moved.setdefault(old_tier, []).append(entry.key)
+            entry.tier = new_tier
+            self._add_entry(entry)
+            self._mark(entry.key)
+            self._stats['promotions'] += 1
+        
+        for tier, keys in moved.items():
+            # Skip keys that were demoted back into this tier meanwhile
+            stale = [key for key in keys
+                     if key not in self._entries or self._entries[key].tier != tier]
+            self._tier_backends[tier].delete_many(stale)
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several entries with one batch delete per tier."""
+        self._load_index()
+        by_tier: Dict[CacheTier, List[CacheEntry]] = {}
+        for key in dict.fromkeys(keys):
+            entry = self._entries.get(key)
+            if entry is not None:
+                by_tier.setdefault(entry.tier, []).append(entry)
+        
+        deleted = 0
+        for tier, entries in by_tier.items():
+            self._tier_backends[tier].delete_many([entry.key for entry in entries])
+            # Forget the entries even if the backend had already dropped them
+            for entry in entries:
+                self._remove_entry(entry)
+            backed = [entry for entry in entries if entry.backing is not None]
+            for backing in {entry.backing for entry in backed}:
+                self._tier_backends[backing].delete_many(
+                    [entry.key for entry in backed if entry.backing == backing])
+            if tier != CacheTier.L1_MEMORY or backed:
+                self._mark(*(entry.key for entry in entries))
+            deleted += len(entries)
+        return deleted
+    
     def _ensure_capacity(self, tier: CacheTier, required_bytes: int):
         """Ensure tier has capacity, evicting if necessary."""
         tier_limit_bytes = {
@@ -242,35 +680,145 @@ class TieredCache:
             self._evict_from_tier(tier, required_bytes)
     
     def _evict_from_tier(self, tier: CacheTier, required_bytes: int):
-        """Evict entries from tier to make space."""
-        # Get entries in this tier sorted by LRU
-        tier_entries = [
-            (k, e) for k, e in self._entries.items()
-            if e.tier == tier
-        ]
-        tier_entries.sort(key=lambda x: x[1].last_access)
+        """Evict entries from tier to make space, least recently used first."""
+        lru = self._tier_lru[tier]
         
         freed_bytes = 0
-        for key, entry in tier_entries:
-            if freed_bytes >= required_bytes:
-                break
+        while lru and freed_bytes < required_bytes:
+            key = next(iter(lru))
+            entry = self._entries[key]
+            
+            if entry.tier != tier:
+                # Backing copy of an entry held in a higher tier
+                self._drop_backing(entry)
+                freed_bytes += entry.size_bytes
+                continue
             
             # Try to demote to lower tier
             if tier != CacheTier.L4_COMPRESSED:
                 next_tier = CacheTier(list(CacheTier)[list(CacheTier).index(tier) + 1])
-                backend = self._tier_backends[tier]
-                value = backend.get(key)
-                
-                if value and self._demote_entry(key, entry, value, next_tier):
+                if self._demote_entry(key, entry, next_tier):
                     freed_bytes += entry.size_bytes
                     continue
             
-            # Otherwise evict completely
-            self.delete(key)
+            # Otherwise evict completely (forget it even if the backend
+            # already dropped it on its own)
+            if not self.delete(key):
+                self._remove_entry(entry)
+                self._mark(key)
             freed_bytes += entry.size_bytes
             self._stats['evictions'] += 1
     
-    def _promote_entry(self, key: str, entry: CacheEntry, value: Any) -> bool:
+    def _serialize(self, key: str, value: Any) -> Optional[bytes]:
+        try:
+            return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Cannot cache {key}: {e}")
+            return None
+    
+    def _deserialize(self, key: str, data: Optional[bytes]) -> Optional[Any]:
+        if data is None:
+            return None
+        try:
+            return pickle.loads(data)
+        except Exception as e:
+            logger.error(f"Failed to deserialize {key}: {e}")
+            return None
+    
+    def _store(
+        self,
+        key: str,
+        tier: CacheTier,
+        value: Any = _MISSING,
+        data: Optional[bytes] = None
+    ) -> bool:
+        """
+        Write an entry to a tier. The memory tier keeps the object itself;
+        the other tiers write the pickled bytes as they are.
+        """
+        backend = self._tier_backends[tier]
+        if tier == CacheTier.L1_MEMORY:
+            if value is _MISSING:
+                value = self._deserialize(key, data)
+                if value is None:
+                    return False
+            return backend.put(key, value)
+        
+        if data is None:
+            data = self._serialize(key, value)
+            if data is None:
+                return False
+        return backend.put_bytes(key, data)
+    
+    def _move_entry(
+        self,
+        key: str,
+        entry: CacheEntry,
+        new_tier: CacheTier,
+        value: Any = _MISSING,
+        data: Optional[bytes] = None
+    ) -> bool:
+        """
+        Move an entry to another tier. Between disk tiers the stored bytes
+        are copied without unpickling; only an object leaving the memory
+        tier is pickled (it is the live object and may have changed).
+        """
+        old_backend = self._tier_backends[entry.tier]
+        
+        if value is _MISSING and data is None:
+            if entry.tier == CacheTier.L1_MEMORY:
+                value = old_backend.get(key)
+                if value is None:
+                    if entry.backing != new_tier:
+                        return False
+                    # Dropped by the memory backend: the backing copy is the
+                    # demoted entry already
+                    self._restore_backing(entry, recent=False)
+                    return True
+            else:
+                data = old_backend.get_bytes(key)
+                if data is None:
+                    return False
+        
+        if entry.tier == CacheTier.L1_MEMORY and new_tier != CacheTier.L1_MEMORY:
+            # Also replaces a backing copy in new_tier (the object may have changed)
+            data = self._serialize(key, value)
+            if data is None:
+                return False
+        
+        if not self._store(key, new_tier, value=value, data=data):
+            return False
+        
+        # Promoted into memory: copy up and keep the disk copy for restarts
+        keep = new_tier == CacheTier.L1_MEMORY
+        if not keep:
+            old_backend.delete(key)
+        
+        # Update metadata; a promoted entry was just used, a demoted one
+        # is the coldest in its new tier
+        tiers = list(CacheTier)
+        promoted = tiers.index(new_tier) < tiers.index(entry.tier)
+        self._remove_entry(entry)
+        if keep:
+            entry.backing = entry.tier
+        elif entry.backing is not None:
+            if entry.backing != new_tier:
+                self._tier_backends[entry.backing].delete(key)
+            entry.backing = None
+        if data is not None:
+            entry.size_bytes = len(data)
+        entry.tier = new_tier
+        self._add_entry(entry, recent=promoted)
+        self._mark(key)
+        return True
+    
+    def _promote_entry(
+        self,
+        key: str,
+        entry: CacheEntry,
+        value: Any = _MISSING,
+        data: Optional[bytes] = None
+    ) -> bool:
         """Promote entry to higher tier."""
         current_tier_idx = list(CacheTier).index(entry.tier)
         if current_tier_idx == 0:
@@ -282,17 +830,7 @@ class TieredCache:
         self._ensure_capacity(new_tier, entry.size_bytes)
         
         # Move to new tier
-        old_backend = self._tier_backends[entry.tier]
-        new_backend = self._tier_backends[new_tier]
-        
-        if new_backend.put(key, value):
-            old_backend.delete(key)
-            
-            # Update metadata
-            self._tier_sizes[entry.tier] -= entry.size_bytes
-            self._tier_sizes[new_tier] += entry.size_bytes
-            entry.tier = new_tier
-            
+        if self._move_entry(key, entry, new_tier, value=value, data=data):
             self._stats['promotions'] += 1
             logger.debug(f"Promoted {key} to {new_tier.value}")
             return True
@@ -303,21 +841,10 @@ class TieredCache:
         self,
         key: str,
         entry: CacheEntry,
-        value: Any,
         new_tier: CacheTier
     ) -> bool:
         """Demote entry to lower tier."""
-        old_backend = self._tier_backends[entry.tier]
-        new_backend = self._tier_backends[new_tier]
-        
-        if new_backend.put(key, value):
-            old_backend.delete(key)
-            
-            # Update metadata
-            self._tier_sizes[entry.tier] -= entry.size_bytes
-            self._tier_sizes[new_tier] += entry.size_bytes
-            entry.tier = new_tier
-            
+        if self._move_entry(key, entry, new_tier):
             self._stats['demotions'] += 1
             logger.debug(f"Demoted {key} to {new_tier.value}")
             return True
@@ -326,21 +853,29 @@ class TieredCache:
     
     def delete(self, key: str) -> bool:
         """Delete entry from cache."""
+        self._load_index()
         if key not in self._entries:
             return False
         
         entry = self._entries[key]
         backend = self._tier_backends[entry.tier]
         
-        if backend.delete(key):
-            self._tier_sizes[entry.tier] -= entry.size_bytes
-            del self._entries[key]
+        deleted = backend.delete(key)
+        if entry.backing is not None:
+            # Also when the memory backend already dropped the object
+            deleted = self._tier_backends[entry.backing].delete(key) or deleted
+        
+        if deleted:
+            self._remove_entry(entry)
+            if entry.tier != CacheTier.L1_MEMORY or entry.backing is not None:
+                self._mark(key)
             return True
         
         return False
     
     def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
+        self._load_index()
         if key not in self._entries:
             return False
         
@@ -358,11 +893,24 @@ class TieredCache:
         
         self._entries.clear()
         self._tier_sizes = {tier: 0 for tier in CacheTier}
+        self._tier_lru = {tier: OrderedDict() for tier in CacheTier}
+        
+        if self.persist_index:
+            # Recreated (empty) on next use
+            self._index_loaded = False
+            self._dirty.clear()
+            try:
+                with sqlite3.connect(self._index_path) as conn:
+                    conn.execute("DROP TABLE IF EXISTS entries")
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to clear cache index: {e}")
         
         logger.info("Cache cleared")
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
+        self._load_index()
         hit_rate = 0.0
         total = self._stats['hits'] + self._stats['misses']
         if total > 0:
@@ -377,7 +925,7 @@ class TieredCache:
                 for tier, size in self._tier_sizes.items()
             },
             'tier_counts': {
-                tier.value: sum(1 for e in self._entries.values() if e.tier == tier)
+                tier.value: len(self._tier_lru[tier])
                 for tier in CacheTier
             }
         }
@@ -387,28 +935,27 @@ class TieredCache:
         Optimize cache by rebalancing tiers based on access patterns.
         """
         logger.info("Optimizing cache...")
+        self._load_index()
         
-        # Sort entries by access frequency
-        entries_by_freq = sorted(
-            self._entries.items(),
-            key=lambda x: x[1].access_frequency,
-            reverse=True
-        )
+        # Rank once (access_frequency depends on the current time);
+        # heapq keeps the selection O(n log 10) instead of sorting everything
+        now = time.time()
+        
+        def frequency(entry: CacheEntry) -> float:
+            age = now - entry.created_at
+            return entry.access_count / age if age > 0 else float('inf')
+        
+        entries = list(self._entries.values())
         
         # Promote frequently accessed items
-        for key, entry in entries_by_freq[:10]:  # Top 10
+        for entry in heapq.nlargest(10, entries, key=frequency):  # Top 10
             if entry.tier != CacheTier.L1_MEMORY:
-                backend = self._tier_backends[entry.tier]
-                value = backend.get(key)
-                if value:
-                    self._promote_entry(key, entry, value)
+                self._promote_entry(entry.key, entry)
         
         # Demote rarely accessed items
-        for key, entry in entries_by_freq[-10:]:  # Bottom 10
+        for entry in heapq.nsmallest(10, entries, key=frequency):  # Bottom 10
             if entry.tier == CacheTier.L1_MEMORY:
-                backend = self._tier_backends[entry.tier]
-                value = backend.get(key)
-                if value:
-                    self._demote_entry(key, entry, value, CacheTier.L2_SQLITE)
+                self._demote_entry(entry.key, entry, CacheTier.L2_SQLITE)
         
+        self.flush()
         logger.info("Cache optimization completed")
\ No newline at end of file
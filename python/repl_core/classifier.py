@@ -0,0 +1,258 @@
+"""
+Execution mode classification for REPL cells.
+"""
+
+import os
+import ast
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple, FrozenSet
+
+from .base import ExecutionMode
+
+logger = logging.getLogger(__name__)
+
+
+# Session helpers that stream by default (keyword that turns streaming off)
+STREAMING_CALLS = {
+    'load_csv': True,
+    'load_parquet': True,
+    'load_json': False,
+    'process_large': True,
+}
+
+# Streaming entry points regardless of arguments
+STREAMING_NAMES = frozenset({'DataStream'})
+
+# Helpers that start a deferred plan (see lazy.py)
+LAZY_CALLS = frozenset({'scan_csv', 'scan_parquet', 'lazy'})
+
+# Helpers that fan a stream out to worker processes (see distributed.py)
+DISTRIBUTED_CALLS = frozenset({'run_distributed', 'distribute'})
+
+# Eager readers whose input size decides the mode
+READER_CALLS = frozenset({'read_csv', 'read_parquet', 'read_json', 'read_table', 'read_feather'})
+
+# Keyword names that carry the input path of a reader
+PATH_KEYWORDS = ('filepath', 'filepath_or_buffer', 'path', 'source', 'path_or_buf')
+
+# Names the session binds; method calls only count on values built from these
+SESSION_HELPERS = STREAMING_NAMES | LAZY_CALLS | DISTRIBUTED_CALLS | frozenset(STREAMING_CALLS)
+
+
+def _receiver_root(node: ast.AST) -> Optional[str]:
+    """Name a method chain starts from: ``scan_csv(p).select('a')`` -> ``scan_csv``."""
+    while True:
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Call):
+            node = node.func
+        elif isinstance(node, (ast.Attribute, ast.Subscript)):
+            node = node.value
+        else:
+            return None
+
+
+@dataclass(frozen=True)
+class CellAnalysis:
+    """Static facts about a cell that the execution mode depends on."""
+    streaming: bool = False
+    lazy: bool = False
+    distributed: bool = False
+    paths: FrozenSet[str] = field(default_factory=frozenset)
+    syntax_error: bool = False
+
+
+class _CellVisitor(ast.NodeVisitor):
+    """Collects streaming, lazy and distributed calls and reader input paths from a cell."""
+
+    def __init__(self, constants: Dict[str, str]):
+        self.constants = constants
+        self.streaming = False
+        self.lazy = False
+        self.distributed = False
+        self.paths = set()
+
+    @staticmethod
+    def _call_name(func: ast.AST) -> Optional[str]:
+        # load_csv(...), pd.read_csv(...), DataStream.from_csv(...),
+        # DataStream.from_file(p).distribute(); but not pl.scan_csv(...) or df.lazy()
+        if isinstance(func, ast.Name):
+            return func.id
+        if isinstance(func, ast.Attribute):
+            if isinstance(func.value, ast.Name) and func.value.id in STREAMING_NAMES:
+                return func.value.id
+            if func.attr in READER_CALLS or _receiver_root(func.value) in SESSION_HELPERS:
+                return func.attr
+        return None
+
+    def _literal_path(self, node: ast.AST) -> Optional[str]:
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, ast.Name):
+            return self.constants.get(node.id)
+        return None
+
+    def _input_path(self, call: ast.Call) -> Optional[str]:
+        if call.args:
+            return self._literal_path(call.args[0])
+        for keyword in call.keywords:
+            if keyword.arg in PATH_KEYWORDS:
+                return self._literal_path(keyword.value)
+        return None
+
+    @staticmethod
+    def _streaming_flag(call: ast.Call, default: bool) -> bool:
+        for keyword in call.keywords:
+            if keyword.arg == 'streaming':
+                if isinstance(keyword.value, ast.Constant):
+                    return bool(keyword.value.value)
+                return True  # Not known statically; assume it may stream
+        return default
+
+    def visit_Call(self, node: ast.Call):
+        name = self._call_name(node.func)
+
+        if name in LAZY_CALLS:
+            self.lazy = True
+        elif name in DISTRIBUTED_CALLS:
+            self.distributed = True
+        elif name in STREAMING_NAMES:
+            self.streaming = True
+        elif name in STREAMING_CALLS:
+            if self._streaming_flag(node, STREAMING_CALLS[name]):
+                self.streaming = True
+            else:
+                path = self._input_path(node)
+                if path:
+                    self.paths.add(path)
+        elif name in READER_CALLS:
+            path = self._input_path(node)
+            if path:
+                self.paths.add(path)
+
+        self.generic_visit(node)
+
+
+def _string_constants(tree: ast.Module) -> Dict[str, str]:
+    """Top-level ``name = "literal"`` assignments, for resolving path variables."""
+    constants = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and
+                isinstance(node.value, ast.Constant) and
+                isinstance(node.value.value, str)):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    constants[target.id] = node.value.value
+    return constants
+
+
+def analyze_cell(code: str) -> CellAnalysis:
+    """Parse a cell and collect the facts the execution mode depends on."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return CellAnalysis(syntax_error=True)
+
+    visitor = _CellVisitor(_string_constants(tree))
+    visitor.visit(tree)
+    return CellAnalysis(streaming=visitor.streaming, lazy=visitor.lazy,
+                        distributed=visitor.distributed, paths=frozenset(visitor.paths))
+
+
+class ExecutionModeClassifier:
+    """
+    Chooses between IMMEDIATE, STREAMING, LAZY and DISTRIBUTED execution
+    for a cell.
+
+    The decision is based on what the cell actually calls, not on
+    substrings: names inside comments and strings are ignored. Cells that
+    start a lazy plan run in LAZY mode, cells that fan a stream out to
+    worker processes in DISTRIBUTED mode; cells that call a streaming
+    helper run in STREAMING mode; cells that call an eager reader on a
+    literal path run in STREAMING mode only if that file is larger than
+    ``large_file_mb``.
+
+    Analyses are cached by source hash. On a cache hit only the referenced
+    files are stat'ed, and the cached mode is reused while their size and
+    mtime are unchanged.
+    """
+
+    def __init__(self, large_file_mb: float = 100.0, max_entries: int = 512):
+        self.large_file_bytes = large_file_mb * 1024 * 1024
+        self.max_entries = max_entries
+
+        # source hash -> (analysis, file signature, mode)
+        self._cache: "OrderedDict[str, Tuple[CellAnalysis, Tuple, ExecutionMode]]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def _key(code: str) -> str:
+        return hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _file_signature(paths: FrozenSet[str]) -> Tuple:
+        signature = []
+        for path in sorted(paths):
+            try:
+                st = os.stat(path)
+                signature.append((path, st.st_size, st.st_mtime_ns))
+            except (OSError, ValueError):
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _decide(self, analysis: CellAnalysis, signature: Tuple) -> ExecutionMode:
+        if analysis.lazy:
+            return ExecutionMode.LAZY
+        if analysis.distributed:
+            return ExecutionMode.DISTRIBUTED
+        if analysis.streaming:
+            return ExecutionMode.STREAMING
+        for _, size, _ in signature:
+            if size is not None and size > self.large_file_bytes:
+                return ExecutionMode.STREAMING
+        return ExecutionMode.IMMEDIATE
+
+    def classify(self, code: str) -> ExecutionMode:
+        """Return the execution mode for a cell."""
+        key = self._key(code)
+        entry = self._cache.get(key)
+
+        if entry is not None:
+            self._cache.move_to_end(key)
+            analysis, signature, mode = entry
+            if not analysis.paths:
+                self._stats['hits'] += 1
+                return mode
+            current = self._file_signature(analysis.paths)
+            if current == signature:
+                self._stats['hits'] += 1
+                return mode
+            signature = current
+        else:
+            analysis = analyze_cell(code)
+            signature = self._file_signature(analysis.paths)
+
+        self._stats['misses'] += 1
+        mode = self._decide(analysis, signature)
+
+        self._cache[key] = (analysis, signature, mode)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        return mode
+
+    def clear(self):
+        """Forget cached decisions."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get classifier cache statistics."""
+        total = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'size': len(self._cache),
+            'hit_rate': self._stats['hits'] / total if total else 0.0
+        }
@@ -0,0 +1,434 @@
+"""
+Single-host multi-process execution of DataStream pipelines.
+"""
+
+import io
+import os
+import math
+import time
+import pickle
+import locale
+import operator
+import logging
+import functools
+import multiprocessing
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# Files smaller than this per partition are not worth another process
+MIN_PARTITION_BYTES = 1024 * 1024
+
+# Partitions per worker, so faster workers pick up more of them
+PARTITIONS_PER_WORKER = 4
+
+# Read size when scanning a CSV file for quoted line breaks
+SCAN_BLOCK_BYTES = 1024 * 1024
+
+# Transforms whose result depends on items of other partitions
+_ORDER_DEPENDENT = ('take', 'skip')
+
+
+# ----------------------------------------------------------------------
+# Combiners
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Combiner:
+    """
+    How stream items are reduced to one result.
+
+    ``fold(acc, item)`` runs inside the workers over a partition,
+    starting from ``initial()``; ``merge(a, b)`` joins the partition
+    accumulators in the parent, in partition order; ``finish`` turns
+    the merged accumulator into the result.
+    """
+    initial: Callable[[], Any]
+    fold: Callable[[Any, Any], Any]
+    merge: Callable[[Any, Any], Any]
+    finish: Optional[Callable[[Any], Any]] = None
+
+    @classmethod
+    def from_function(cls, func: Callable[[Any, Any], Any]) -> 'Combiner':
+        """Use an associative binary function (like ``functools.reduce``) for both steps."""
+        step = functools.partial(_reduce_step, func)
+        return cls(_empty, step, step, _empty_to_none)
+
+
+class _Empty:
+    """Accumulator of a partition that had no items."""
+
+
+def _empty() -> type:
+    return _Empty
+
+
+def _reduce_step(func: Callable[[Any, Any], Any], acc: Any, value: Any) -> Any:
+    if acc is _Empty:
+        return value
+    if value is _Empty:
+        return acc
+    return func(acc, value)
+
+
+def _empty_to_none(acc: Any) -> Any:
+    return None if acc is _Empty else acc
+
+
+def _append(acc: list, item: Any) -> list:
+    acc.append(item)
+    return acc
+
+
+def _extend(acc: list, other: list) -> list:
+    acc.extend(other)
+    return acc
+
+
+def _count(acc: int, item: Any) -> int:
+    return acc + 1
+
+
+def _concat_frames(frames: list) -> Any:
+    import pandas as pd
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+COLLECT = Combiner(list, _append, _extend)
+SUM = Combiner(int, operator.add, operator.add)
+COUNT = Combiner(int, _count, operator.add)
+CONCAT_FRAMES = Combiner(list, _append, _extend, _concat_frames)
+MIN = Combiner.from_function(min)
+MAX = Combiner.from_function(max)
+
+
+def _as_combiner(combine: Union[Combiner, Callable, None]) -> Combiner:
+    if combine is None:
+        return COLLECT
+    if isinstance(combine, Combiner):
+        return combine
+    if combine is sum:
+        # sum(iterable) is not a binary function
+        return SUM
+    return Combiner.from_function(combine)
+
+
+# ----------------------------------------------------------------------
+# Partitioning
+# ----------------------------------------------------------------------
+
+def _byte_ranges(start: int, end: int, parts: int, align: int = 1) -> List[Tuple[int, int]]:
+    size = end - start
+    parts = max(1, min(parts, math.ceil(size / MIN_PARTITION_BYTES)))
+    step = max(align, math.ceil(size / parts / align) * align)
+    return [(offset, min(offset + step, end)) for offset in range(start, end, step)]
+
+
+def _has_quoted_newline(path: str, quote: bytes = b'"') -> bool:
+    """Whether a quoted CSV field spans lines, so byte ranges could cut a row."""
+    inside = False
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                return False
+            # Pieces alternate between outside and inside quotes ("" toggles twice)
+            pieces = block.split(quote)
+            for piece in pieces[1 if not inside else 0::2]:
+                if b'\n' in piece or b'\r' in piece:
+                    return True
+            inside ^= (len(pieces) - 1) % 2 == 1
+
+
+def partition(spec: Tuple, parts: int) -> List[Tuple]:
+    """Split a stream source into up to ``parts`` independent pieces."""
+    kind = spec[0]
+
+    if kind == 'sequence':
+        length = len(spec[1])
+        parts = max(1, min(parts, length))
+        step = math.ceil(length / parts) if length else 1
+        return [('slice', start, min(start + step, length)) for start in range(0, length, step)]
+
+    if kind == 'file':
+        _, path, mode, chunk_size = spec
+        size = os.path.getsize(path)
+        # Binary chunks keep their boundaries; text lines are aligned by the reader
+        align = chunk_size if mode == 'rb' else 1
+        return [('bytes',) + r for r in _byte_ranges(0, size, parts, align)]
+
+    if kind == 'csv':
+        path = spec[1]
+        with open(path, 'rb') as f:
+            header_end = len(f.readline())
+        size = os.path.getsize(path)
+        ranges = _byte_ranges(header_end, size, parts)
+        if len(ranges) > 1 and _has_quoted_newline(path):
+            # Rows cannot be found from an arbitrary offset; read it serially
+            logger.info(f"{path} has line breaks inside quoted fields; not partitioning")
+            return [('bytes', header_end, size)]
+        return [('bytes',) + r for r in ranges]
+
+    if kind == 'parquet':
+        import pyarrow.parquet as pq
+
+        groups = pq.ParquetFile(spec[1]).num_row_groups
+        parts = max(1, min(parts, groups))
+        step = math.ceil(groups / parts) if groups else 1
+        return [('row_groups', tuple(range(start, min(start + step, groups))))
+                for start in range(0, groups, step)]
+
+    raise ValueError(f"Cannot partition stream source: {kind}")
+
+
+def _read_lines(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Lines whose first byte lies in [start, end)."""
+    with open(path, 'rb') as f:
+        if start > 0:
+            # The line running through start-1 belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+
+
+def read_partition(spec: Tuple, part: Tuple) -> Iterator[Any]:
+    """Items of one partition, as the serial stream would produce them."""
+    kind = spec[0]
+
+    if kind == 'sequence':
+        _, start, stop = part
+        yield from spec[1][start:stop]
+
+    elif kind == 'file':
+        _, path, mode, chunk_size = spec
+        _, start, end = part
+        if mode == 'rb':
+            with open(path, 'rb') as f:
+                f.seek(start)
+                while f.tell() < end:
+                    chunk = f.read(min(chunk_size, end - f.tell()))
+                    if not chunk:
+                        break
+                    yield chunk
+        else:
+            # As open(path, mode) in DataStream.from_file: locale encoding
+            # and universal newlines ('\n', '\r\n' and '\r' end a line)
+            encoding = locale.getpreferredencoding(False)
+            for line in _read_lines(path, start, end):
+                text = line.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+                lines = text.split('\n')
+                if not lines[-1]:
+                    lines.pop()
+                yield from lines
+
+    elif kind == 'csv':
+        import pandas as pd
+
+        _, path, chunk_size = spec
+        _, start, end = part
+        with open(path, 'rb') as f:
+            header = f.readline()
+        rows = []
+        for line in _read_lines(path, start, end):
+            rows.append(line)
+            if len(rows) >= chunk_size:
+                yield pd.read_csv(io.BytesIO(header + b''.join(rows)))
+                rows = []
+        if rows:
+            yield pd.read_csv(io.BytesIO(header + b''.join(rows)))
+
+    elif kind == 'parquet':
+        import pyarrow.parquet as pq
+
+        _, path, batch_size = spec
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=list(part[1])):
+            yield batch.to_pandas()
+
+    else:
+        raise ValueError(f"Cannot read stream source: {kind}")
+
+
+# ----------------------------------------------------------------------
+# Workers
+# ----------------------------------------------------------------------
+
+def apply_transforms(items: Iterator[Any], transforms: List[Tuple]) -> Iterator[Any]:
+    """Apply a DataStream transform chain (map/filter/batch) to items."""
+    for op, arg in transforms:
+        if op == 'map':
+            items = map(arg, items)
+        elif op == 'filter':
+            items = filter(arg, items)
+        elif op == 'batch':
+            items = _batched(items, arg)
+        else:
+            raise ValueError(f"Transform '{op}' cannot run per partition")
+    return items
+
+
+def _batched(items: Iterator[Any], size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Job of the current worker process, set by the pool initializer
+_job: Optional[Tuple[Tuple, List[Tuple], Combiner]] = None
+
+
+def _init_worker(job: Union[Tuple[Tuple, List[Tuple], Combiner], bytes]):
+    # With fork the job is inherited, not pickled; with spawn it arrives
+    # already pickled (see DistributedExecutor._prepare_job)
+    global _job
+    _job = pickle.loads(job) if isinstance(job, bytes) else job
+
+
+def _run_partition(part: Tuple) -> Any:
+    spec, transforms, combiner = _job
+    acc = combiner.initial()
+    for item in apply_transforms(read_partition(spec, part), transforms):
+        acc = combiner.fold(acc, item)
+    return acc
+
+
+# ----------------------------------------------------------------------
+# Executor
+# ----------------------------------------------------------------------
+
+class DistributedExecutor:
+    """
+    Runs DataStream pipelines across the cores of this host.
+
+    The stream's source is split into partitions (byte ranges of text,
+    binary and CSV files aligned to line/chunk boundaries, Parquet row
+    groups, slices of sequences). Each worker process reads its
+    partitions, applies the stream's map/filter/batch chain and folds
+    the items with a ``Combiner``; the parent merges the partition
+    results in order, so ``COLLECT`` returns items in the serial order.
+
+    Streams whose source cannot be re-read (generators) run serially
+    with the same combiner. ``take``/``skip`` depend on global order and
+    must be applied to the combined result instead. ``batch`` groups
+    items within a partition.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._stats = {'jobs': 0, 'serial_jobs': 0, 'partitions': 0, 'last_duration_ms': 0.0}
+
+    @staticmethod
+    def _context():
+        # fork: workers inherit imports and the job without pickling it
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('fork')
+        return multiprocessing.get_context()
+
+    def run(
+        self,
+        stream: Any,
+        combine: Union[Combiner, Callable, None] = None,
+        max_workers: Optional[int] = None
+    ) -> Any:
+        """
+        Run ``stream`` in worker processes and return the combined result.
+
+        ``combine`` is a ``Combiner`` (``COLLECT``, ``SUM``, ``COUNT``,
+        ``CONCAT_FRAMES``, ...) or an associative binary function.
+        """
+        start = time.perf_counter()
+        combiner = _as_combiner(combine)
+        workers = max_workers or self.max_workers
+        transforms = list(stream._transforms)
+
+        for op, _ in transforms:
+            if op in _ORDER_DEPENDENT:
+                raise ValueError(f"'{op}' depends on item order across partitions; "
+                                 "apply it to the combined result")
+
+        spec = stream.source_spec
+        parts = partition(spec, workers * PARTITIONS_PER_WORKER) if spec else []
+
+        job = None
+        if len(parts) > 1 and workers > 1:
+            job = self._prepare_job(spec, transforms, combiner)
+
+        if job is None:
+            result = self._run_serial(stream, combiner)
+        else:
+            result = self._run_parallel(job, combiner, parts, workers)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._stats['last_duration_ms'] = round(elapsed_ms, 2)
+        logger.info(f"Distributed stream: {len(parts)} partitions on {workers} workers in {elapsed_ms:.0f}ms")
+        return result
+
+    def _prepare_job(self, spec: Tuple, transforms: List[Tuple], combiner: Combiner) -> Any:
+        """
+        Return the job handed to worker processes, or None to run serially.
+
+        Without fork the job must be pickled; it is pickled once here so
+        that cell-defined functions (lambdas, closures) fall back to the
+        serial path instead of failing inside the pool.
+        """
+        job = (spec, transforms, combiner)
+        if self._context().get_start_method() == 'fork':
+            return job
+        try:
+            return pickle.dumps(job)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            logger.warning(f"Distributed stream runs serially: the job cannot be pickled for "
+                           f"worker processes ({e}); use module-level functions to run it in parallel")
+            return None
+
+    def _run_serial(self, stream: Any, combiner: Combiner) -> Any:
+        self._stats['serial_jobs'] += 1
+        acc = combiner.initial()
+        for item in stream._iterate():
+            acc = combiner.fold(acc, item)
+        return combiner.finish(acc) if combiner.finish else acc
+
+    def _run_parallel(self, job: Any, combiner: Combiner, parts: List[Tuple], workers: int) -> Any:
+        self._stats['jobs'] += 1
+        self._stats['partitions'] += len(parts)
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(workers, len(parts)),
+            mp_context=self._context(),
+            initializer=_init_worker,
+            initargs=(job,)
+        ) as pool:
+            results = [pool.submit(_run_partition, part) for part in parts]
+
+            acc = None
+            for i, future in enumerate(results):
+                value = future.result()
+                acc = value if i == 0 else combiner.merge(acc, value)
+
+        return combiner.finish(acc) if combiner.finish else acc
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics."""
+        return {**self._stats, 'max_workers': self.max_workers}
+
+
+# Shared executor
+DEFAULT_EXECUTOR = DistributedExecutor()
+
+
+def run_distributed(stream: Any, combine: Union[Combiner, Callable, None] = None,
+                    max_workers: Optional[int] = None) -> Any:
+    """Run ``stream`` on the shared executor (see ``DistributedExecutor.run``)."""
+    return DEFAULT_EXECUTOR.run(stream, combine=combine, max_workers=max_workers)
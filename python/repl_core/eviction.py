@@ -0,0 +1,252 @@
+"""
+Memory-budget eviction of cold namespace variables.
+"""
+
+import gc
+import sys
+import time
+import types
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache.tiered_cache import TieredCache, CacheTier
+from .namespace import used_names
+from .sizing import estimate_size
+
+logger = logging.getLogger(__name__)
+
+
+# Values that are cheap to keep or cannot be moved out meaningfully
+_UNEVICTABLE_TYPES = (
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    type,
+)
+
+# References to a candidate held by the namespace, the local variable and
+# the getrefcount argument; anything above means the value is shared
+_BASE_REFCOUNT = 3
+
+
+class NamespaceEvictor:
+    """
+    Keeps a REPL namespace under an RSS budget.
+
+    Each cell's name usage (from its compiled code, following functions it
+    calls) updates a last-used counter per variable. When RSS exceeds
+    ``budget_mb``, the least recently used variables of at least
+    ``min_size_mb`` are moved to the disk tiers of a ``TieredCache`` and
+    removed from the namespace until the estimated usage is back under
+    ``target_ratio * budget_mb``. A moved variable is put back before the
+    next cell that refers to it runs.
+
+    Variables referenced from elsewhere (another name, a container),
+    containers holding other variables and array views are never moved:
+    it would not free memory and restoring would break identity.
+
+    Cache keys carry ``owner`` so that processes sharing a cache directory
+    never restore (or delete) each other's variables; a restarted process
+    passes the same owner to take over what its predecessor moved out.
+    """
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        budget_mb: float,
+        min_size_mb: float = 16.0,
+        target_ratio: float = 0.9,
+        exclude: Iterable[str] = (),
+        owner: str = ''
+    ):
+        self.cache = cache
+        self.owner = owner
+        self.budget_mb = budget_mb
+        self.min_size_mb = min_size_mb
+        self.target_ratio = target_ratio
+        self.exclude = set(exclude)
+
+        # name -> number of the last cell that used it
+        self.last_used: Dict[str, int] = {}
+        # name -> cache key of moved-out variables
+        self.evicted: Dict[str, str] = {}
+        self._cell = 0
+
+        self._stats = {
+            'evictions': 0,
+            'restores': 0,
+            'freed_mb': 0.0,
+            'last_duration_ms': 0.0
+        }
+
+    def _key(self, name: str) -> str:
+        return f"evicted:{self.owner}:{name}"
+
+    @staticmethod
+    def _shares_memory(value: Any, bound_ids: set) -> bool:
+        """Whether moving ``value`` out would split objects shared with other names."""
+        if getattr(value, 'base', None) is not None and hasattr(value, 'nbytes'):
+            return True  # Array view: the memory belongs to another object
+        if isinstance(value, dict):
+            items = value.values()
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            items = value
+        else:
+            return False
+        return any(id(item) in bound_ids for item in items)
+
+    # ------------------------------------------------------------------
+    # Before a cell
+    # ------------------------------------------------------------------
+
+    def resolve(self, code: types.CodeType, namespace: Dict[str, Any]) -> int:
+        """
+        Record the names a cell uses and restore the moved-out ones among
+        them. Returns the number of restored variables.
+        """
+        self._cell += 1
+        names = used_names(code, namespace, self.evicted)
+
+        for name in names:
+            self.last_used[name] = self._cell
+
+        keys = {name: self.evicted.pop(name) for name in names & self.evicted.keys()}
+        if not keys:
+            return 0
+
+        values = self.cache.get_many(key for name, key in keys.items() if name not in namespace)
+        restored = 0
+        for name, key in keys.items():
+            if name in namespace:
+                continue
+            if key not in values:
+                logger.warning(f"Evicted variable '{name}' could not be restored")
+                continue
+            namespace[name] = values[key]
+            restored += 1
+        values = None
+        self.cache.delete_many(keys.values())
+
+        self._stats['restores'] += restored
+        return restored
+
+    # ------------------------------------------------------------------
+    # After a cell
+    # ------------------------------------------------------------------
+
+    def maybe_evict(self, namespace: Dict[str, Any], rss_mb: float) -> Optional[Dict[str, Any]]:
+        """Move cold variables out if RSS is over budget."""
+        if not self.budget_mb or rss_mb <= self.budget_mb:
+            return None
+        return self.evict(namespace, rss_mb - self.budget_mb * self.target_ratio)
+
+    def evict(self, namespace: Dict[str, Any], need_mb: float) -> Dict[str, Any]:
+        """Move out least recently used variables until ``need_mb`` is freed."""
+        start = time.perf_counter()
+
+        # Forget usage of names that no longer exist
+        for name in [n for n in self.last_used if n not in namespace and n not in self.evicted]:
+            del self.last_used[name]
+
+        candidates = sorted(
+            (self.last_used.get(name, 0), name)
+            for name, value in namespace.items()
+            if not name.startswith('_')
+            and name not in self.exclude
+            and not isinstance(value, _UNEVICTABLE_TYPES)
+        )
+
+        bound_ids = {id(value) for value in namespace.values()}
+
+        # name -> estimated size (MB) of the variables to move out
+        chosen: Dict[str, float] = {}
+        planned_mb = 0.0
+        for last_used, name in candidates:
+            if planned_mb >= need_mb:
+                break
+            # Never move what the cell that just ran used
+            if last_used >= self._cell:
+                continue
+
+            value = namespace[name]
+            if (sys.getrefcount(value) > _BASE_REFCOUNT or
+                    self._shares_memory(value, bound_ids)):
+                continue
+
+            size_mb = estimate_size(value) / (1024 * 1024)
+            if size_mb < self.min_size_mb:
+                continue
+
+            chosen[name] = size_mb
+            planned_mb += size_mb
+        value = None
+
+        # One batch write for all of them
+        stored = set(self.cache.put_many(
+            {self._key(name): namespace[name] for name in chosen},
+            min_tier=CacheTier.L2_SQLITE
+        ))
+
+        evicted = []
+        freed_mb = 0.0
+        for name, size_mb in chosen.items():
+            key = self._key(name)
+            if key in stored:
+                del namespace[name]
+                self.evicted[name] = key
+                evicted.append(name)
+                freed_mb += size_mb
+
+        if evicted:
+            gc.collect()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._stats['evictions'] += len(evicted)
+        self._stats['freed_mb'] += freed_mb
+        self._stats['last_duration_ms'] = round(elapsed_ms, 2)
+
+        if evicted:
+            logger.info(f"Evicted {len(evicted)} variables ({freed_mb:.1f}MB): {evicted}")
+        return {
+            'evicted': evicted,
+            'freed_mb': round(freed_mb, 2),
+            'duration_ms': round(elapsed_ms, 2)
+        }
+
+    def recover(self, namespace: Dict[str, Any]) -> List[str]:
+        """
+        Take over variables a previous process with the same ``owner``
+        moved out (the cache index survives restarts) so they are restored
+        on first use. Copies of names that are bound again are dropped;
+        other owners' variables are left alone. Returns the taken names.
+        """
+        prefix = self._key('')
+        recovered = []
+        for key in self.cache.keys(prefix):
+            name = key[len(prefix):]
+            if not name.isidentifier():
+                continue  # Owner whose id extends this one's ("a" vs "a:b")
+            if name in namespace or name in self.exclude:
+                self.cache.delete(key)
+            else:
+                self.evicted[name] = key
+                recovered.append(name)
+        return recovered
+
+    def discard(self, name: str) -> bool:
+        """Drop a moved-out variable without restoring it."""
+        key = self.evicted.pop(name, None)
+        if key is None:
+            return False
+        self.cache.delete(key)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get eviction statistics."""
+        return {
+            **self._stats,
+            'freed_mb': round(self._stats['freed_mb'], 2),
+            'budget_mb': self.budget_mb,
+            'evicted_now': sorted(self.evicted)
+        }
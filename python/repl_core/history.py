@@ -0,0 +1,182 @@
+"""
+Fixed-size execution history with latency and memory percentiles.
+"""
+
+import sys
+import time
+import threading
+from array import array
+from typing import Any, Dict, List, Optional
+
+
+class ExecutionHistory:
+    """
+    Ring buffer of the last ``capacity`` executions.
+
+    Numeric fields live in preallocated ``array`` columns (8 bytes per
+    value instead of a dict and boxed floats per record), labels such as
+    execution modes or agent ids are interned and stored as indices into
+    a small table. A label leaves the table when no retained record uses
+    it, so the table never holds more than ``capacity`` labels. Memory is
+    constant once the buffer is full; the oldest record is overwritten by
+    the newest.
+    """
+
+    def __init__(self, capacity: int = 1000, preview_chars: int = 100):
+        self.capacity = capacity
+        self.preview_chars = preview_chars
+
+        self._count = array('q', bytes(8 * capacity))
+        self._timestamp = array('d', bytes(8 * capacity))
+        self._elapsed_ms = array('d', bytes(8 * capacity))
+        self._memory_mb = array('d', bytes(8 * capacity))
+        self._memory_delta_mb = array('d', bytes(8 * capacity))
+        self._success = array('b', bytes(capacity))
+        # Live labels never outnumber the slots, so indices fit the slot count
+        self._label = array('H' if capacity <= 0x10000 else 'I', [0]) * capacity
+        self._preview: List[Optional[str]] = [None] * capacity
+        self._reset_labels()
+
+        # Records ever added; the next slot is total % capacity
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def _reset_labels(self):
+        # label -> index into self._labels
+        self._label_index: Dict[str, int] = {}
+        self._labels: List[Optional[str]] = []
+        # Retained records per label index, and indices free for reuse
+        self._label_refs: List[int] = []
+        self._free_labels: List[int] = []
+
+    def _intern(self, label: str) -> int:
+        index = self._label_index.get(label)
+        if index is None:
+            label = sys.intern(label)
+            if self._free_labels:
+                index = self._free_labels.pop()
+                self._labels[index] = label
+            else:
+                index = len(self._labels)
+                self._labels.append(label)
+                self._label_refs.append(0)
+            self._label_index[label] = index
+        self._label_refs[index] += 1
+        return index
+
+    def _release(self, index: int):
+        self._label_refs[index] -= 1
+        if not self._label_refs[index]:
+            del self._label_index[self._labels[index]]
+            self._labels[index] = None
+            self._free_labels.append(index)
+
+    def record(
+        self,
+        elapsed_ms: float,
+        memory_mb: float = 0.0,
+        memory_delta_mb: float = 0.0,
+        success: bool = True,
+        label: str = '',
+        preview: Optional[str] = None,
+        count: Optional[int] = None
+    ):
+        """Add one execution, overwriting the oldest when full."""
+        with self._lock:
+            slot = self.total % self.capacity
+            if self.total >= self.capacity:
+                self._release(self._label[slot])
+            self.total += 1
+            self._count[slot] = self.total if count is None else count
+            self._timestamp[slot] = time.time()
+            self._elapsed_ms[slot] = elapsed_ms
+            self._memory_mb[slot] = memory_mb or 0.0
+            self._memory_delta_mb[slot] = memory_delta_mb or 0.0
+            self._success[slot] = 1 if success else 0
+            self._label[slot] = self._intern(label)
+            self._preview[slot] = preview[:self.preview_chars] if preview else None
+
+    def _slots(self) -> range:
+        """Slots of the retained records, oldest first (as indices modulo capacity)."""
+        start = self.total - len(self)
+        return range(start, self.total)
+
+    def records(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retained records as dicts, oldest first (only the ``last`` n if given)."""
+        with self._lock:
+            slots = self._slots()
+            if last is not None:
+                slots = slots[-last:] if last > 0 else slots[:0]
+            result = []
+            for i in slots:
+                slot = i % self.capacity
+                result.append({
+                    'count': self._count[slot],
+                    'timestamp': self._timestamp[slot],
+                    'label': self._labels[self._label[slot]],
+                    'success': bool(self._success[slot]),
+                    'elapsed_ms': self._elapsed_ms[slot],
+                    'memory_mb': self._memory_mb[slot],
+                    'memory_delta_mb': self._memory_delta_mb[slot],
+                    'preview': self._preview[slot]
+                })
+            return result
+
+    def labels(self) -> List[str]:
+        """Labels of the retained records, oldest first."""
+        with self._lock:
+            return [self._labels[self._label[i % self.capacity]] for i in self._slots()]
+
+    def clear(self):
+        """Forget all records."""
+        with self._lock:
+            self.total = 0
+            self._preview = [None] * self.capacity
+            self._reset_labels()
+
+    @staticmethod
+    def _percentiles(values: List[float]) -> Dict[str, float]:
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0, 'max': 0.0}
+        values.sort()
+        n = len(values)
+
+        def rank(p: float) -> float:
+            # Nearest-rank percentile
+            return values[min(n - 1, max(0, int(p * n + 0.5) - 1))]
+
+        return {
+            'p50': round(rank(0.50), 2),
+            'p95': round(rank(0.95), 2),
+            'p99': round(rank(0.99), 2),
+            'mean': round(sum(values) / n, 2),
+            'max': round(values[-1], 2)
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency and memory-delta percentiles over the retained records."""
+        with self._lock:
+            slots = [i % self.capacity for i in self._slots()]
+            elapsed = [self._elapsed_ms[s] for s in slots]
+            deltas = [self._memory_delta_mb[s] for s in slots]
+            successes = sum(self._success[s] for s in slots)
+
+            by_label: Dict[str, List[float]] = {}
+            for s in slots:
+                by_label.setdefault(self._labels[self._label[s]], []).append(self._elapsed_ms[s])
+
+        return {
+            'recorded': self.total,
+            'retained': len(slots),
+            'capacity': self.capacity,
+            'success_rate': round(successes / len(slots), 4) if slots else 0.0,
+            'elapsed_ms': self._percentiles(elapsed),
+            'memory_delta_mb': self._percentiles(deltas),
+            'by_label': {
+                label: {'count': len(values), **self._percentiles(values)}
+                for label, values in by_label.items()
+            }
+        }
@@ -0,0 +1,208 @@
+"""
+Cancellation and timeouts for running cells.
+"""
+
+import time
+import signal
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+try:
+    import ctypes
+    _SetAsyncExc = ctypes.pythonapi.PyThreadState_SetAsyncExc
+except (ImportError, AttributeError):
+    _SetAsyncExc = None
+
+logger = logging.getLogger(__name__)
+
+
+def _set_async_exc(thread_id: int, exc: Optional[type]):
+    # exc=None passes NULL, which clears a pending exception
+    _SetAsyncExc(ctypes.c_ulong(thread_id), ctypes.py_object(exc) if exc is not None else None)
+
+
+class CellInterrupter:
+    """
+    Stops the cell running on one thread by raising ``KeyboardInterrupt``
+    in it, so the namespace survives with whatever the cell assigned
+    before it was stopped.
+
+    On the main thread a SIGINT is sent to it with ``pthread_kill``, which
+    also wakes blocking calls such as ``time.sleep`` or socket reads. The
+    SIGINT handler only raises for interrupts aimed at a cell that is still
+    running; late ones are dropped and other SIGINTs go to the previous
+    handler. On other threads ``PyThreadState_SetAsyncExc`` is used, which
+    takes effect at the next bytecode.
+
+    A cell that swallows the interrupt or is stuck in C code is interrupted
+    again every ``retry_interval`` seconds; after ``grace`` seconds
+    ``on_stuck(reason)`` is called (for example to save the namespace and
+    let the process be restarted).
+    """
+
+    def __init__(
+        self,
+        grace: float = 10.0,
+        retry_interval: float = 1.0,
+        on_stuck: Optional[Callable[[str], None]] = None
+    ):
+        self.grace = grace
+        self.retry_interval = retry_interval
+        self.on_stuck = on_stuck
+
+        # RLock: the SIGINT handler runs on the main thread, possibly while
+        # that thread holds the lock in running()
+        self._lock = threading.RLock()
+        self._thread_id: Optional[int] = None
+        self._token: Optional[Hashable] = None
+        self._run = 0
+        self._reason: Optional[str] = None
+        self._own_signals = 0
+        self._async_sent = False
+        self._previous_handler: Any = None
+
+        self.last_reason: Optional[str] = None
+        self._stats = {'interrupts': 0, 'timeouts': 0, 'retries': 0, 'stuck': 0}
+
+    # ------------------------------------------------------------------
+    # Running side
+    # ------------------------------------------------------------------
+
+    def _install_handler(self):
+        if self._previous_handler is not None or threading.current_thread() is not threading.main_thread():
+            return
+        if not hasattr(signal, 'pthread_kill'):
+            return
+        current = signal.getsignal(signal.SIGINT)
+        if current == self._on_sigint:
+            return
+        self._previous_handler = current
+        signal.signal(signal.SIGINT, self._on_sigint)
+
+    def _on_sigint(self, signum: int, frame: Any):
+        with self._lock:
+            own = self._own_signals > 0
+            if own:
+                self._own_signals -= 1
+            reason = self._reason if self._thread_id == threading.get_ident() else None
+        if own:
+            if reason is not None:
+                raise KeyboardInterrupt(f"cell {reason}")
+            return  # The cell finished before the signal arrived
+        previous = self._previous_handler
+        if callable(previous):
+            previous(signum, frame)
+        elif previous != signal.SIG_IGN:
+            raise KeyboardInterrupt
+
+    @contextmanager
+    def running(self, timeout: Optional[float] = None, token: Optional[Hashable] = None) -> Iterator['CellInterrupter']:
+        """Mark the current thread as running a cell that may be interrupted."""
+        self._install_handler()
+        with self._lock:
+            self._run += 1
+            self._thread_id = threading.get_ident()
+            self._token = token
+            self._reason = None
+            self._async_sent = False
+            run = self._run
+
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, self._on_timeout, args=(run, timeout))
+            timer.daemon = True
+            timer.start()
+        try:
+            yield self
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._lock:
+                self.last_reason = self._reason
+                self._thread_id = None
+                self._token = None
+                self._reason = None
+                if self._async_sent:
+                    # Drop an interrupt that has not been raised yet
+                    _set_async_exc(threading.get_ident(), None)
+
+    @property
+    def busy(self) -> bool:
+        return self._thread_id is not None
+
+    @property
+    def token(self) -> Optional[Hashable]:
+        return self._token
+
+    # ------------------------------------------------------------------
+    # Interrupting side
+    # ------------------------------------------------------------------
+
+    def _on_timeout(self, run: int, timeout: float):
+        if self._interrupt(f"timed out after {timeout:g}s", run=run):
+            self._stats['timeouts'] += 1
+
+    def interrupt(self, reason: str = 'cancelled', token: Optional[Hashable] = None) -> bool:
+        """
+        Interrupt the running cell (only if its token matches, when given).
+        Returns False if no matching cell is running.
+        """
+        return self._interrupt(reason, token=token)
+
+    def _interrupt(self, reason: str, token: Optional[Hashable] = None, run: Optional[int] = None) -> bool:
+        with self._lock:
+            if self._thread_id is None:
+                return False
+            if token is not None and token != self._token:
+                return False
+            if run is not None and run != self._run:
+                return False
+            first = self._reason is None
+            if first:
+                self._reason = reason
+            self._send()
+            run = self._run
+        self._stats['interrupts'] += 1
+
+        if first:
+            threading.Thread(target=self._watch, args=(run,), name='cell-interrupt-watchdog',
+                             daemon=True).start()
+        return True
+
+    def _send(self):
+        # Called with the lock held
+        thread_id = self._thread_id
+        if (thread_id == threading.main_thread().ident and
+                signal.getsignal(signal.SIGINT) == self._on_sigint):
+            self._own_signals += 1
+            signal.pthread_kill(thread_id, signal.SIGINT)
+        elif _SetAsyncExc is not None:
+            self._async_sent = True
+            _set_async_exc(thread_id, KeyboardInterrupt)
+        else:
+            logger.warning("Cannot interrupt a cell on this platform")
+
+    def _watch(self, run: int):
+        """Re-send the interrupt until the cell stops; give up after ``grace``."""
+        started = time.monotonic()
+        while True:
+            time.sleep(self.retry_interval)
+            with self._lock:
+                if self._run != run or self._thread_id is None:
+                    return
+                if self.grace and time.monotonic() - started >= self.grace:
+                    reason = self._reason
+                    break
+                self._stats['retries'] += 1
+                self._send()
+
+        self._stats['stuck'] += 1
+        logger.warning(f"Cell did not stop {self.grace:g}s after being {reason}")
+        if self.on_stuck is not None:
+            self.on_stuck(reason)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get interrupt statistics."""
+        return {**self._stats, 'busy': self.busy, 'last_reason': self.last_reason}
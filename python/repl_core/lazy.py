@@ -0,0 +1,852 @@
+"""
+Deferred computation DAG for the LAZY execution mode.
+
+Operations on ``LazyFrame``/``LazyStream`` handles only record nodes.
+Work happens when a sink is reached (``collect``, ``to_csv``, ``print``,
+...): the chain of nodes behind that sink is optimized and run chunk by
+chunk, so intermediates that are created and never used cost nothing.
+"""
+
+import ast
+import operator
+import logging
+from dataclasses import dataclass, field, replace
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+)
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+_COMPARISONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# Aggregations that can be computed per chunk and combined afterwards
+_PARTIAL_AGGREGATIONS = {'sum': 'sum', 'min': 'min', 'max': 'max', 'count': 'sum', 'size': 'sum'}
+
+
+# ----------------------------------------------------------------------
+# Column expressions
+# ----------------------------------------------------------------------
+
+class Expr:
+    """
+    A column expression that knows which columns it reads.
+
+    Built with ``col('a') > 5`` and combined with ``&``, ``|`` and ``~``.
+    ``columns`` is None for opaque expressions (plain callables), which
+    block optimizations that need to know the columns involved.
+    """
+
+    __slots__ = ('_fn', 'columns', 'text', 'name', 'terms')
+
+    def __init__(
+        self,
+        fn: Callable[[Any], Any],
+        columns: Optional[Iterable[str]],
+        text: str,
+        name: Optional[str] = None,
+        terms: Optional[Tuple[Tuple[str, str, Any], ...]] = None
+    ):
+        self._fn = fn
+        self.columns = frozenset(columns) if columns is not None else None
+        self.text = text
+        # Column name for bare column references
+        self.name = name
+        # (column, op, literal) conjunction, usable as a Parquet filter
+        self.terms = terms
+
+    def evaluate(self, frame: Any) -> Any:
+        return self._fn(frame)
+
+    def __repr__(self) -> str:
+        return self.text
+
+    def __bool__(self):
+        raise TypeError("Use &, | and ~ to combine lazy expressions, not and/or/not")
+
+    @staticmethod
+    def _union(*exprs: 'Expr') -> Optional[FrozenSet[str]]:
+        columns = frozenset()
+        for expr in exprs:
+            if expr.columns is None:
+                return None
+            columns |= expr.columns
+        return columns
+
+    def _binary(self, other: Any, op: Callable, symbol: str, reflected: bool = False) -> 'Expr':
+        other_expr = _as_expr(other)
+        left, right = (other_expr, self) if reflected else (self, other_expr)
+        terms = None
+        if symbol in _COMPARISONS and not reflected and self.name and not isinstance(other, Expr):
+            terms = ((self.name, symbol, other),)
+        return Expr(
+            lambda frame: op(left.evaluate(frame), right.evaluate(frame)),
+            self._union(left, right),
+            f"({left.text} {symbol} {right.text})",
+            terms=terms
+        )
+
+    def __eq__(self, other): return self._binary(other, operator.eq, '==')
+    def __ne__(self, other): return self._binary(other, operator.ne, '!=')
+    def __lt__(self, other): return self._binary(other, operator.lt, '<')
+    def __le__(self, other): return self._binary(other, operator.le, '<=')
+    def __gt__(self, other): return self._binary(other, operator.gt, '>')
+    def __ge__(self, other): return self._binary(other, operator.ge, '>=')
+    def __add__(self, other): return self._binary(other, operator.add, '+')
+    def __sub__(self, other): return self._binary(other, operator.sub, '-')
+    def __mul__(self, other): return self._binary(other, operator.mul, '*')
+    def __truediv__(self, other): return self._binary(other, operator.truediv, '/')
+    def __floordiv__(self, other): return self._binary(other, operator.floordiv, '//')
+    def __mod__(self, other): return self._binary(other, operator.mod, '%')
+    def __pow__(self, other): return self._binary(other, operator.pow, '**')
+    def __radd__(self, other): return self._binary(other, operator.add, '+', reflected=True)
+    def __rsub__(self, other): return self._binary(other, operator.sub, '-', reflected=True)
+    def __rmul__(self, other): return self._binary(other, operator.mul, '*', reflected=True)
+    def __rtruediv__(self, other): return self._binary(other, operator.truediv, '/', reflected=True)
+
+    __hash__ = None
+
+    def __and__(self, other: 'Expr') -> 'Expr':
+        other = _as_expr(other)
+        combined = self._binary(other, operator.and_, '&')
+        if self.terms is not None and other.terms is not None:
+            combined.terms = self.terms + other.terms
+        return combined
+
+    def __or__(self, other: 'Expr') -> 'Expr':
+        return self._binary(other, operator.or_, '|')
+
+    def __invert__(self) -> 'Expr':
+        return Expr(lambda frame: ~self.evaluate(frame), self.columns, f"~{self.text}")
+
+    def __neg__(self) -> 'Expr':
+        return Expr(lambda frame: -self.evaluate(frame), self.columns, f"-{self.text}")
+
+    def isin(self, values: Iterable[Any]) -> 'Expr':
+        values = list(values)
+        return Expr(
+            lambda frame: self.evaluate(frame).isin(values),
+            self.columns,
+            f"{self.text}.isin({values!r})",
+            terms=((self.name, 'in', values),) if self.name else None
+        )
+
+    def isnull(self) -> 'Expr':
+        return Expr(lambda frame: self.evaluate(frame).isna(), self.columns, f"{self.text}.isnull()")
+
+    def notnull(self) -> 'Expr':
+        return Expr(lambda frame: self.evaluate(frame).notna(), self.columns, f"{self.text}.notnull()")
+
+
+def col(name: str) -> Expr:
+    """Reference a column in a lazy expression."""
+    return Expr(lambda frame: frame[name], (name,), repr(name), name=name)
+
+
+def lit(value: Any) -> Expr:
+    """A constant in a lazy expression."""
+    return Expr(lambda frame: value, (), repr(value))
+
+
+def _as_expr(value: Any) -> Expr:
+    return value if isinstance(value, Expr) else lit(value)
+
+
+def _query_expr(text: str) -> Expr:
+    """An expression from a ``DataFrame.eval`` string such as ``"a > 5 and b == 'x'"``."""
+    tree = ast.parse(text, mode='eval')
+    columns = {node.id for node in ast.walk(tree)
+               if isinstance(node, ast.Name) and node.id not in ('True', 'False', 'None')}
+    return Expr(lambda frame: frame.eval(text), columns, text)
+
+
+def _opaque_expr(func: Callable[[Any], Any]) -> Expr:
+    return Expr(func, None, getattr(func, '__name__', 'func'))
+
+
+def _to_expr(value: Any) -> Expr:
+    if isinstance(value, Expr):
+        return value
+    if isinstance(value, str):
+        return _query_expr(value)
+    if callable(value):
+        return _opaque_expr(value)
+    return lit(value)
+
+
+# ----------------------------------------------------------------------
+# DAG
+# ----------------------------------------------------------------------
+
+# Operations applied to each chunk independently
+_ROW_WISE = frozenset({'filter', 'select', 'assign', 'map'})
+
+
+@dataclass(eq=False)
+class Node:
+    """One recorded operation. Handles derived from the same node share it."""
+    op: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    input: Optional['Node'] = None
+
+    def chain(self) -> List['Node']:
+        """Copies of the nodes from the source to this node."""
+        nodes = []
+        node = self
+        while node is not None:
+            nodes.append(replace(node, params=dict(node.params), input=None))
+            node = node.input
+        nodes.reverse()
+        return nodes
+
+    def describe(self) -> str:
+        params = self.params
+        if self.op == 'source':
+            target = params.get('path') or params['kind']
+            extras = [f"{key}={params[key]!r}" for key in ('columns', 'filters', 'nrows') if params.get(key)]
+            return f"scan_{params['kind']}({', '.join([repr(target)] + extras)})"
+        if self.op == 'filter':
+            return f"filter({params['expr']!r})"
+        if self.op == 'select':
+            return f"select({', '.join(map(repr, params['columns']))})"
+        if self.op == 'assign':
+            return f"assign({', '.join(f'{k}={v!r}' for k, v in params['columns'].items())})"
+        if self.op == 'map':
+            return f"map({' . '.join(getattr(f, '__name__', 'func') for f in params['funcs'])})"
+        if self.op == 'head':
+            return f"head({params['n']})"
+        if self.op == 'groupby':
+            return f"groupby({params['keys']!r}).{params['how']}({params['columns'] or ''})"
+        if self.op == 'sort':
+            return f"sort({params['by']!r})"
+        return self.op
+
+
+# ----------------------------------------------------------------------
+# Optimizer
+# ----------------------------------------------------------------------
+
+def _filter_commutes(expr: Expr, node: Node) -> bool:
+    """Whether a filter on ``expr`` may run before ``node`` with the same result."""
+    if node.op in ('select', 'sort'):
+        return True
+    if expr.columns is None:
+        return False
+    if node.op == 'assign':
+        return not (expr.columns & node.params['columns'].keys())
+    if node.op == 'groupby':
+        # Filtering on group keys removes whole groups either way
+        return expr.columns <= set(node.params['keys'])
+    return False
+
+
+def push_down_filters(nodes: List[Node]) -> List[Node]:
+    """Move filters towards the source and merge adjacent ones."""
+    nodes = list(nodes)
+    i = 1
+    while i < len(nodes):
+        node = nodes[i]
+        if node.op == 'filter':
+            j = i
+            while j > 1 and _filter_commutes(node.params['expr'], nodes[j - 1]):
+                nodes[j - 1], nodes[j] = nodes[j], nodes[j - 1]
+                j -= 1
+            if j > 1 and nodes[j - 1].op == 'filter':
+                previous = nodes[j - 1]
+                previous.params['expr'] = previous.params['expr'] & node.params['expr']
+                del nodes[j]
+                continue
+        i += 1
+    return nodes
+
+
+def fuse(nodes: List[Node]) -> List[Node]:
+    """Merge adjacent maps, assigns and selects into single stages."""
+    fused = []
+    for node in nodes:
+        previous = fused[-1] if fused else None
+        if previous is not None and previous.op == node.op:
+            if node.op == 'map':
+                previous.params['funcs'] = previous.params['funcs'] + node.params['funcs']
+                continue
+            if node.op == 'assign' and not (previous.params['columns'].keys() & node.params['columns'].keys()):
+                # Assigned in order, so later columns may use earlier ones
+                previous.params['columns'] = {**previous.params['columns'], **node.params['columns']}
+                continue
+            if node.op == 'select':
+                previous.params['columns'] = node.params['columns']
+                continue
+        fused.append(node)
+    return fused
+
+
+def prune_columns(nodes: List[Node]) -> List[Node]:
+    """
+    Propagate the columns each step needs back to the source: unused
+    assignments are dropped and the source reads only needed columns.
+    """
+    required: Optional[set] = None  # None: every column
+    kept = []
+    for node in reversed(nodes):
+        params = node.params
+        if node.op == 'select':
+            required = set(params['columns'])
+        elif node.op == 'filter':
+            columns = params['expr'].columns
+            required = None if required is None or columns is None else required | columns
+        elif node.op == 'assign':
+            if required is not None:
+                # Columns are assigned in order and a fused stage may read
+                # columns it assigned earlier, so walk it backwards too
+                live = []
+                for name, expr in reversed(list(params['columns'].items())):
+                    if required is not None and name not in required:
+                        continue
+                    live.append((name, expr))
+                    if required is not None:
+                        required = required - {name}
+                        required = None if expr.columns is None else required | expr.columns
+                if not live:
+                    continue
+                params['columns'] = dict(reversed(live))
+        elif node.op == 'map':
+            required = None
+        elif node.op == 'sort':
+            if required is not None:
+                required |= set(params['by'])
+        elif node.op == 'groupby':
+            keys = set(params['keys'])
+            if params['columns'] is not None:
+                required = keys | set(params['columns'])
+            elif params['how'] == 'size':
+                required = keys
+            elif isinstance(params['spec'], dict):
+                required = keys | set(params['spec'])
+            elif required is not None:
+                required = keys | required
+        elif node.op == 'source' and required is not None and required:
+            params['columns'] = sorted(required)
+        kept.append(node)
+    kept.reverse()
+    return kept
+
+
+def push_down_source(nodes: List[Node]) -> List[Node]:
+    """Hand filters and row limits directly behind the source to the reader."""
+    source = nodes[0]
+    i = 1
+    while i < len(nodes) and nodes[i].op == 'select':
+        i += 1
+    if i < len(nodes):
+        node = nodes[i]
+        if node.op == 'head' and source.params['kind'] == 'csv':
+            source.params['nrows'] = node.params['n']
+        elif (node.op == 'filter' and source.params['kind'] == 'parquet' and
+                node.params['expr'].terms is not None):
+            # The filter stays: the reader may only skip row groups
+            source.params['filters'] = node.params['expr'].terms
+    return nodes
+
+
+def optimize(nodes: List[Node]) -> List[Node]:
+    """Rewrite a chain of nodes into an equivalent, cheaper one."""
+    nodes = push_down_filters(nodes)
+    nodes = fuse(nodes)
+    nodes = prune_columns(nodes)
+    return push_down_source(nodes)
+
+
+# ----------------------------------------------------------------------
+# Execution
+# ----------------------------------------------------------------------
+
+def _parquet_filter(terms: Sequence[Tuple[str, str, Any]]):
+    import pyarrow.dataset as pads
+
+    expression = None
+    for name, op, value in terms:
+        column = pads.field(name)
+        term = column.isin(value) if op == 'in' else _COMPARISONS[op](column, value)
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def _scan(source: Node) -> Iterator[Any]:
+    params = source.params
+    kind = params['kind']
+    chunk_rows = params.get('chunk_rows', DEFAULT_CHUNK_ROWS)
+
+    if kind == 'csv':
+        import pandas as pd
+
+        options = dict(params.get('options', {}))
+        if params.get('columns'):
+            options['usecols'] = params['columns']
+        if params.get('nrows') is not None:
+            options['nrows'] = params['nrows']
+        with pd.read_csv(params['path'], chunksize=chunk_rows, **options) as reader:
+            yield from reader
+
+    elif kind == 'parquet':
+        import pyarrow.dataset as pads
+
+        dataset = pads.dataset(params['path'], format='parquet')
+        batches = dataset.to_batches(
+            columns=params.get('columns'),
+            filter=_parquet_filter(params['filters']) if params.get('filters') else None,
+            batch_size=chunk_rows
+        )
+        for batch in batches:
+            yield batch.to_pandas()
+
+    elif kind == 'frame':
+        frame = params['frame']
+        if params.get('columns'):
+            frame = frame[params['columns']]
+        yield frame
+
+    elif kind == 'chunks':
+        for chunk in params['chunks']():
+            if params.get('columns'):
+                chunk = chunk[params['columns']]
+            yield chunk
+
+    else:
+        raise ValueError(f"Unknown lazy source: {kind}")
+
+
+def _apply(chunk: Any, node: Node) -> Any:
+    params = node.params
+    if node.op == 'filter':
+        return chunk[params['expr'].evaluate(chunk)]
+    if node.op == 'select':
+        return chunk[list(params['columns'])]
+    if node.op == 'assign':
+        chunk = chunk.copy(deep=False)
+        for name, expr in params['columns'].items():
+            chunk[name] = expr.evaluate(chunk)
+        return chunk
+    if node.op == 'map':
+        for func in params['funcs']:
+            chunk = func(chunk)
+        return chunk
+    raise ValueError(f"Not a row-wise operation: {node.op}")
+
+
+def _pipeline(chunks: Iterator[Any], stages: List[Node]) -> Iterator[Any]:
+    if not stages:
+        return chunks
+    return (_run_stages(chunk, stages) for chunk in chunks)
+
+
+def _run_stages(chunk: Any, stages: List[Node]) -> Any:
+    for stage in stages:
+        chunk = _apply(chunk, stage)
+    return chunk
+
+
+def _concat(chunks: Iterable[Any]) -> Any:
+    import pandas as pd
+
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames)
+
+
+def _head(chunks: Iterator[Any], node: Node) -> Iterator[Any]:
+    remaining = node.params['n']
+    for chunk in chunks:
+        if remaining <= 0:
+            break
+        chunk = chunk.iloc[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _aggregate(frame: Any, params: Dict[str, Any], how: Any) -> Any:
+    grouped = frame.groupby(params['keys'], as_index=False, sort=True)
+    if params['columns'] is not None:
+        grouped = grouped[list(params['columns'])]
+    if how == 'size':
+        return grouped.size()
+    return grouped.agg(how)
+
+
+def _groupby(chunks: Iterator[Any], node: Node) -> Iterator[Any]:
+    params = node.params
+    how = params['spec']
+    combine = _PARTIAL_AGGREGATIONS.get(how) if isinstance(how, str) else None
+
+    if combine is None:
+        yield _aggregate(_concat(chunks), params, how)
+        return
+
+    # Aggregate each chunk, then combine the much smaller partial results
+    partials = [_aggregate(chunk, params, how) for chunk in chunks]
+    if len(partials) == 1:
+        yield partials[0]
+        return
+    merged = _concat(partials)
+    yield merged.groupby(params['keys'], as_index=False, sort=True).agg(combine)
+
+
+def _sort(chunks: Iterator[Any], node: Node) -> Iterator[Any]:
+    yield _concat(chunks).sort_values(node.params['by'], ascending=node.params['ascending'])
+
+
+_BLOCKING = {
+    'head': _head,
+    'groupby': _groupby,
+    'sort': _sort,
+}
+
+
+def execute_plan(nodes: List[Node]) -> Iterator[Any]:
+    """Run an optimized chain, yielding result chunks."""
+    chunks = _scan(nodes[0])
+    stages: List[Node] = []
+    for node in nodes[1:]:
+        if node.op in _ROW_WISE:
+            stages.append(node)
+            continue
+        chunks = _BLOCKING[node.op](_pipeline(chunks, stages), node)
+        stages = []
+    return _pipeline(chunks, stages)
+
+
+# ----------------------------------------------------------------------
+# Handles
+# ----------------------------------------------------------------------
+
+class LazyFrame:
+    """
+    Deferred DataFrame: operations build a DAG that runs at a sink.
+
+    Row-wise steps (filter, select, assign, map) run per chunk of the
+    source; head, groupby and sort combine chunks. Before running, the
+    plan behind the sink is optimized:
+
+    - filters move towards the source (past selects, sorts, unrelated
+      assigns and groupbys on their keys) and adjacent ones are merged
+    - adjacent maps and assigns are fused into one pass per chunk
+    - only columns needed downstream are read; unused assigns are dropped
+    - simple filters become Parquet row-group filters, leading heads
+      become ``nrows`` for CSV
+
+    Handles are immutable, so an abandoned branch is never computed.
+    """
+
+    def __init__(self, node: Node):
+        self._node = node
+
+    # Sources ----------------------------------------------------------
+
+    @classmethod
+    def scan_csv(cls, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, **options) -> 'LazyFrame':
+        """Deferred ``pd.read_csv``, read in chunks of ``chunk_rows``."""
+        return cls(Node('source', {'kind': 'csv', 'path': path,
+                                   'chunk_rows': chunk_rows, 'options': options}))
+
+    @classmethod
+    def scan_parquet(cls, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> 'LazyFrame':
+        """Deferred Parquet read (file or directory) in batches of ``chunk_rows``."""
+        return cls(Node('source', {'kind': 'parquet', 'path': path, 'chunk_rows': chunk_rows}))
+
+    @classmethod
+    def from_pandas(cls, frame: Any) -> 'LazyFrame':
+        """Wrap an in-memory DataFrame."""
+        return cls(Node('source', {'kind': 'frame', 'frame': frame}))
+
+    @classmethod
+    def from_chunks(cls, chunks: Callable[[], Iterable[Any]]) -> 'LazyFrame':
+        """Wrap a function returning an iterable of DataFrame chunks."""
+        return cls(Node('source', {'kind': 'chunks', 'chunks': chunks}))
+
+    # Operations -------------------------------------------------------
+
+    def _then(self, op: str, **params) -> 'LazyFrame':
+        return LazyFrame(Node(op, params, self._node))
+
+    def filter(self, predicate: Union[Expr, str, Callable[[Any], Any]]) -> 'LazyFrame':
+        """Keep rows matching an expression, an eval string or a ``frame -> mask`` function."""
+        return self._then('filter', expr=_to_expr(predicate))
+
+    def select(self, *columns: str) -> 'LazyFrame':
+        """Keep only ``columns``."""
+        if len(columns) == 1 and isinstance(columns[0], (list, tuple)):
+            columns = tuple(columns[0])
+        return self._then('select', columns=tuple(columns))
+
+    def assign(self, **columns: Any) -> 'LazyFrame':
+        """Add or replace columns from expressions, ``frame -> values`` functions or constants."""
+        return self._then('assign', columns={name: _to_expr(value) if not isinstance(value, str) else lit(value)
+                                             for name, value in columns.items()})
+
+    def map(self, func: Callable[[Any], Any]) -> 'LazyFrame':
+        """Apply ``func(chunk) -> chunk`` to each chunk."""
+        return self._then('map', funcs=(func,))
+
+    def head(self, n: int = 5) -> 'LazyFrame':
+        """First ``n`` rows; reading stops once they are produced."""
+        return self._then('head', n=n)
+
+    def sort_values(self, by: Union[str, Sequence[str]], ascending: bool = True) -> 'LazyFrame':
+        """Sort by columns (combines all chunks)."""
+        return self._then('sort', by=[by] if isinstance(by, str) else list(by), ascending=ascending)
+
+    def groupby(self, keys: Union[str, Sequence[str]]) -> 'LazyGroupBy':
+        """Group by key columns; keys stay columns of the result."""
+        return LazyGroupBy(self, [keys] if isinstance(keys, str) else list(keys))
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            return col(key)
+        if isinstance(key, Expr):
+            return self.filter(key)
+        return self.select(*key)
+
+    # Sinks ------------------------------------------------------------
+
+    def plan(self) -> List[Node]:
+        """The optimized chain that a sink would run."""
+        return optimize(self._node.chain())
+
+    def explain(self) -> str:
+        """Describe the recorded and the optimized plan."""
+        recorded = ' -> '.join(node.describe() for node in self._node.chain())
+        optimized = ' -> '.join(node.describe() for node in self.plan())
+        return f"recorded:  {recorded}\noptimized: {optimized}"
+
+    def iter_chunks(self) -> Iterator[Any]:
+        """Run the plan and yield result chunks."""
+        return execute_plan(self.plan())
+
+    def collect(self) -> Any:
+        """Run the plan and return a pandas DataFrame."""
+        return _concat(self.iter_chunks())
+
+    def count(self) -> int:
+        """Number of rows of the result."""
+        return sum(len(chunk) for chunk in self.iter_chunks())
+
+    def to_csv(self, path: str, **kwargs) -> str:
+        """Run the plan and write chunks to a CSV file as they are produced."""
+        header = kwargs.pop('header', True)
+        mode = 'w'
+        for chunk in self.iter_chunks():
+            chunk.to_csv(path, mode=mode, header=header, **kwargs)
+            mode, header = 'a', False
+        if mode == 'w':
+            _concat([]).to_csv(path, **kwargs)
+        return path
+
+    def to_parquet(self, path: str) -> str:
+        """Run the plan and write chunks to a Parquet file as they are produced."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in self.iter_chunks():
+                table = pa.Table.from_pandas(chunk, preserve_index=False,
+                                             schema=writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            _concat([]).to_parquet(path)
+        return path
+
+    def __str__(self) -> str:
+        # print() is a sink
+        return str(self.collect())
+
+    def __repr__(self) -> str:
+        steps = ' -> '.join(node.describe() for node in self._node.chain())
+        return f"<LazyFrame {steps}>"
+
+
+class LazyGroupBy:
+    """Deferred groupby; an aggregation returns a new ``LazyFrame``."""
+
+    def __init__(self, frame: LazyFrame, keys: List[str], columns: Optional[Tuple[str, ...]] = None):
+        self._frame = frame
+        self._keys = keys
+        self._columns = columns
+
+    def __getitem__(self, columns: Union[str, Sequence[str]]) -> 'LazyGroupBy':
+        columns = (columns,) if isinstance(columns, str) else tuple(columns)
+        return LazyGroupBy(self._frame, self._keys, columns)
+
+    def agg(self, spec: Any) -> LazyFrame:
+        """Aggregate with a pandas ``agg`` spec (name, function or ``{column: how}``)."""
+        how = spec if isinstance(spec, str) else 'agg'
+        return self._frame._then('groupby', keys=self._keys, columns=self._columns, spec=spec, how=how)
+
+    def sum(self) -> LazyFrame:
+        return self.agg('sum')
+
+    def mean(self) -> LazyFrame:
+        return self.agg('mean')
+
+    def min(self) -> LazyFrame:
+        return self.agg('min')
+
+    def max(self) -> LazyFrame:
+        return self.agg('max')
+
+    def count(self) -> LazyFrame:
+        return self.agg('count')
+
+    def size(self) -> LazyFrame:
+        return self.agg('size')
+
+
+class LazyStream:
+    """
+    Deferred item stream (``DataStream``-like).
+
+    Adjacent maps are composed into one function, steps run as chained
+    iterators without intermediate lists, and ``skip``/``take`` are moved
+    ahead of maps so skipped items are never mapped. A ``DataStream``
+    source can only be consumed by one sink.
+    """
+
+    def __init__(self, node: Node):
+        self._node = node
+
+    @classmethod
+    def from_iterable(cls, iterable: Any) -> 'LazyStream':
+        """Wrap an iterable, a ``DataStream`` or a function returning an iterable."""
+        if callable(iterable) and not hasattr(iterable, '__iter__'):
+            items = iterable
+        elif hasattr(iterable, '_iterate'):
+            items = iterable._iterate
+        else:
+            items = lambda: iter(iterable)
+        return cls(Node('source', {'kind': 'items', 'items': items}))
+
+    def _then(self, op: str, **params) -> 'LazyStream':
+        return LazyStream(Node(op, params, self._node))
+
+    def map(self, func: Callable[[Any], Any]) -> 'LazyStream':
+        return self._then('map', funcs=(func,))
+
+    def filter(self, predicate: Callable[[Any], bool]) -> 'LazyStream':
+        return self._then('filter', predicate=predicate)
+
+    def take(self, n: int) -> 'LazyStream':
+        return self._then('take', n=n)
+
+    def skip(self, n: int) -> 'LazyStream':
+        return self._then('skip', n=n)
+
+    def batch(self, size: int) -> 'LazyStream':
+        return self._then('batch', size=size)
+
+    def plan(self) -> List[Node]:
+        """The optimized chain that a sink would run."""
+        nodes = self._node.chain()
+        # take/skip commute with map: count items before mapping them
+        for i in range(1, len(nodes)):
+            j = i
+            while j > 1 and nodes[j].op in ('take', 'skip') and nodes[j - 1].op == 'map':
+                nodes[j - 1], nodes[j] = nodes[j], nodes[j - 1]
+                j -= 1
+        return fuse(nodes)
+
+    def __iter__(self) -> Iterator[Any]:
+        nodes = self.plan()
+        items = iter(nodes[0].params['items']())
+        for node in nodes[1:]:
+            items = _STREAM_STEPS[node.op](items, node.params)
+        return items
+
+    def collect(self, max_items: Optional[int] = None) -> List[Any]:
+        stream = self.take(max_items) if max_items else self
+        return list(stream)
+
+    def to_pandas(self, max_rows: Optional[int] = None) -> Any:
+        import pandas as pd
+        return pd.DataFrame(self.collect(max_rows))
+
+    def save_to_file(self, filepath: str, format: str = 'json') -> bool:
+        from .streaming.data_stream import DataStream
+        return DataStream(iter(self)).save_to_file(filepath, format)
+
+    def __str__(self) -> str:
+        return str(self.collect())
+
+    def __repr__(self) -> str:
+        steps = ' -> '.join(node.op for node in self._node.chain()[1:])
+        return f"<LazyStream {steps or 'source'}>"
+
+
+def _stream_map(items: Iterator[Any], params: Dict[str, Any]) -> Iterator[Any]:
+    funcs = params['funcs']
+    if len(funcs) == 1:
+        return map(funcs[0], items)
+
+    def fused(item):
+        for func in funcs:
+            item = func(item)
+        return item
+    return map(fused, items)
+
+
+def _stream_batch(items: Iterator[Any], params: Dict[str, Any]) -> Iterator[Any]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= params['size']:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _stream_skip(items: Iterator[Any], params: Dict[str, Any]) -> Iterator[Any]:
+    import itertools
+    return itertools.islice(items, params['n'], None)
+
+
+def _stream_take(items: Iterator[Any], params: Dict[str, Any]) -> Iterator[Any]:
+    import itertools
+    return itertools.islice(items, params['n'])
+
+
+_STREAM_STEPS = {
+    'map': _stream_map,
+    'filter': lambda items, params: filter(params['predicate'], items),
+    'take': _stream_take,
+    'skip': _stream_skip,
+    'batch': _stream_batch,
+}
+
+
+def lazy(data: Any) -> Union[LazyFrame, LazyStream]:
+    """Start a lazy plan from a DataFrame, a DataStream or any iterable."""
+    if isinstance(data, (LazyFrame, LazyStream)):
+        return data
+    if type(data).__module__.startswith('pandas') and hasattr(data, 'columns'):
+        return LazyFrame.from_pandas(data)
+    return LazyStream.from_iterable(data)
+
+
+scan_csv = LazyFrame.scan_csv
+scan_parquet = LazyFrame.scan_parquet
@@ -0,0 +1,501 @@
+"""
+Content-addressed memoization of REPL cells.
+"""
+
+import io
+import os
+import ast
+import sys
+import time
+import types
+import pickle
+import marshal
+import hashlib
+import builtins
+import logging
+import importlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Set, Tuple
+
+from .cache.tiered_cache import CacheTier, TieredCache
+from .classifier import analyze_cell
+from .namespace import used_names, _own_functions
+
+logger = logging.getLogger(__name__)
+
+
+# Opt-in marker on the first line of a cell
+CACHED_CELL_MARKER = "@cached_cell"
+
+# Statements after which a top-level name is bound for the rest of the cell
+_BINDING_STATEMENTS = (
+    ast.Assign,
+    ast.AnnAssign,
+    ast.Import,
+    ast.ImportFrom,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+)
+
+# Files read while importing code are not inputs of the cell
+_CODE_SUFFIXES = ('.py', '.pyc', '.so', '.pyd', '.pth')
+_LIBRARY_PREFIXES = tuple({
+    os.path.abspath(p) for p in (sys.prefix, sys.base_prefix, sys.exec_prefix) if p
+})
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+
+def strip_marker(code: str) -> Tuple[str, bool]:
+    """
+    Detect the ``@cached_cell`` opt-in on the first non-blank line.
+
+    Both ``@cached_cell`` and ``# @cached_cell`` are accepted; the bare
+    form is turned into a comment so the cell still compiles with the
+    same line numbers.
+    """
+    lines = code.splitlines(keepends=True)
+    for i, line in enumerate(lines):
+        marker = line.strip()
+        if not marker:
+            continue
+        if marker == CACHED_CELL_MARKER:
+            lines[i] = '#' + line
+            return ''.join(lines), True
+        if marker.startswith('#') and marker[1:].strip() == CACHED_CELL_MARKER:
+            return code, True
+        break
+    return code, False
+
+
+# ----------------------------------------------------------------------
+# Cell analysis
+# ----------------------------------------------------------------------
+
+def _bound_names(stmt: ast.stmt) -> Set[str]:
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {stmt.name}
+    if isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return {(alias.asname or alias.name).split('.')[0]
+                for alias in stmt.names if alias.name != '*'}
+    if isinstance(stmt, ast.AnnAssign) and stmt.value is None:
+        return set()
+    targets = stmt.targets if isinstance(stmt, ast.Assign) else [stmt.target]
+    return {node.id for target in targets for node in ast.walk(target)
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)}
+
+
+def cell_reads(tree: ast.Module) -> FrozenSet[str]:
+    """
+    Names a cell may read before binding them itself.
+
+    A name assigned by a top-level statement is not an input of the
+    statements after it; names inside functions, branches and loops are
+    always counted (an over-approximation, never an omission).
+    """
+    assigned: Set[str] = set()
+    reads: Set[str] = set()
+    for stmt in tree.body:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Name):
+                if not isinstance(node.ctx, ast.Store) and node.id not in assigned:
+                    reads.add(node.id)
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                if node.target.id not in assigned:
+                    reads.add(node.target.id)
+        if isinstance(stmt, _BINDING_STATEMENTS):
+            assigned |= _bound_names(stmt)
+    return frozenset(reads)
+
+
+# ----------------------------------------------------------------------
+# Fingerprints
+# ----------------------------------------------------------------------
+
+def _qualified_name(obj: Any) -> str:
+    return f"{getattr(obj, '__module__', None)}.{getattr(obj, '__qualname__', type(obj).__qualname__)}"
+
+
+def _code_digest(code: types.CodeType) -> bytes:
+    return hashlib.blake2b(marshal.dumps(code), digest_size=16).digest()
+
+
+class _FingerprintPickler(pickle.Pickler):
+    """Pickles values for hashing; modules and session functions by reference."""
+
+    def __init__(self, file, namespace: Mapping[str, Any], buffers: list):
+        super().__init__(file, protocol=5, buffer_callback=buffers.append)
+        self.namespace = namespace
+
+    def persistent_id(self, obj: Any):
+        if isinstance(obj, types.ModuleType):
+            return ('module', obj.__name__)
+        if isinstance(obj, (types.FunctionType, type)):
+            codes = list(_own_functions(obj, self.namespace))
+            if codes:
+                return ('code', obj.__qualname__, tuple(_code_digest(c) for c in codes))
+        return None
+
+
+class _ModulePickler(pickle.Pickler):
+    """Pickles cell results with module bindings recorded by name."""
+
+    def persistent_id(self, obj: Any):
+        if isinstance(obj, types.ModuleType):
+            return obj.__name__
+        return None
+
+
+class _ModuleUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid: Any):
+        return importlib.import_module(pid)
+
+
+def fingerprint(value: Any, namespace: Mapping[str, Any]) -> Optional[bytes]:
+    """
+    Content digest of a value, or None if it cannot be fingerprinted.
+
+    Scalars and strings are hashed directly, modules and imported
+    callables by name, functions and classes defined in ``namespace`` by
+    their code; anything else by its pickle, with array buffers hashed
+    in place (protocol 5 out-of-band buffers, no copy).
+    """
+    try:
+        return _fingerprint(value, namespace)
+    except Exception:
+        return None
+
+
+def _fingerprint(value: Any, namespace: Mapping[str, Any]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(_qualified_name(type(value)).encode())
+
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        h.update(repr(value).encode())
+    elif isinstance(value, str):
+        h.update(value.encode('utf-8', 'surrogatepass'))
+    elif isinstance(value, (bytes, bytearray)):
+        h.update(value)
+    elif isinstance(value, types.ModuleType):
+        h.update(value.__name__.encode())
+    elif isinstance(value, (types.FunctionType, type)) and any(_own_functions(value, namespace)):
+        h.update(value.__qualname__.encode())
+        for code in _own_functions(value, namespace):
+            h.update(_code_digest(code))
+        if isinstance(value, types.FunctionType):
+            state = (value.__defaults__, value.__kwdefaults__,
+                     tuple(cell.cell_contents for cell in value.__closure__ or ()))
+            h.update(_fingerprint(state, namespace))
+    elif isinstance(value, (types.FunctionType, types.BuiltinFunctionType, type)):
+        h.update(_qualified_name(value).encode())
+    elif isinstance(value, types.MethodType):
+        # Session helpers bound to a long-lived object
+        h.update(_qualified_name(value.__func__).encode())
+        h.update(str(id(value.__self__)).encode())
+    else:
+        buffers = []
+        data = io.BytesIO()
+        _FingerprintPickler(data, namespace, buffers).dump(value)
+        h.update(data.getbuffer())
+        for buffer in buffers:
+            h.update(buffer.raw())
+
+    return h.digest()
+
+
+def _file_signature(paths: Iterable[str]) -> Tuple:
+    signature = []
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_size, st.st_mtime_ns))
+        except (OSError, ValueError):
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+# ----------------------------------------------------------------------
+# File access recording
+# ----------------------------------------------------------------------
+
+class _FileRecorder:
+    """Files opened by the thread running a cell, split into reads and writes."""
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.read: Set[str] = set()
+        self.written: Set[str] = set()
+
+    def record(self, path: Any, mode: Any, flags: Any):
+        if isinstance(path, int):
+            return
+        try:
+            path = os.path.abspath(os.fsdecode(path))
+        except (TypeError, ValueError):
+            return
+        if isinstance(mode, str):
+            writing = any(c in mode for c in 'wax+')
+        else:
+            writing = bool((flags or 0) & _WRITE_FLAGS)
+        if writing:
+            self.written.add(path)
+        elif not path.endswith(_CODE_SUFFIXES) and not path.startswith(_LIBRARY_PREFIXES):
+            self.read.add(path)
+
+
+_recorders: list = []
+_hook_lock = threading.Lock()
+_hook_installed = False
+
+
+def _audit_hook(event: str, args: tuple):
+    if _recorders and event == 'open':
+        # Opens from other threads (background tasks, the server) are not the cell's
+        thread = threading.get_ident()
+        for recorder in list(_recorders):
+            if recorder.thread == thread:
+                recorder.record(*args[:3])
+
+
+def _install_audit_hook():
+    # Audit hooks cannot be removed, so a single one serves all recorders and
+    # it is only added once a memoized cell actually runs
+    global _hook_installed
+    with _hook_lock:
+        if not _hook_installed:
+            sys.addaudithook(_audit_hook)
+            _hook_installed = True
+
+
+# ----------------------------------------------------------------------
+# Memoizer
+# ----------------------------------------------------------------------
+
+class MemoCall:
+    """One memoized execution of a cell: a cache hit to replay or a run to record."""
+
+    def __init__(
+        self,
+        memo: "CellMemoizer",
+        key: Optional[str] = None,
+        inputs: Optional[Dict[str, bytes]] = None,
+        paths: FrozenSet[str] = frozenset(),
+        entry: Optional[Dict[str, Any]] = None,
+        reason: Optional[str] = None
+    ):
+        self.memo = memo
+        self.key = key
+        self.inputs = inputs or {}
+        self.paths = paths
+        self.entry = entry
+        self.reason = reason
+        self.stored = False
+
+        self._bindings: Dict[str, int] = {}
+        self._recorder: Optional[_FileRecorder] = None
+        self._started = 0.0
+
+    @property
+    def hit(self) -> bool:
+        return self.entry is not None
+
+    @property
+    def active(self) -> bool:
+        return self.key is not None
+
+    def replay(self, namespace: Dict[str, Any]) -> Tuple[str, str]:
+        """Apply the cached namespace writes and return the cached (stdout, stderr)."""
+        entry = self.entry
+        if entry['writes']:
+            namespace.update(_ModuleUnpickler(io.BytesIO(entry['writes'])).load())
+        for name in entry['deleted']:
+            namespace.pop(name, None)
+        return entry['stdout'], entry['stderr']
+
+    @contextmanager
+    def recording(self, namespace: Mapping[str, Any]):
+        """Track bindings and opened files while the cell runs."""
+        _install_audit_hook()
+        self._bindings = {name: id(value) for name, value in namespace.items()}
+        self._recorder = _FileRecorder()
+        self._started = time.perf_counter()
+        _recorders.append(self._recorder)
+        try:
+            yield self
+        finally:
+            _recorders.remove(self._recorder)
+
+    def store(self, namespace: Mapping[str, Any], stdout: str, stderr: str = '') -> bool:
+        """Cache the result of a successful run, unless it cannot be replayed."""
+        if not self.active or self.hit or self._recorder is None:
+            return False
+
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        self.reason = self._unreplayable(namespace)
+        if self.reason is None:
+            self.reason = self.memo._store(
+                self.key, namespace, self._bindings, stdout, stderr,
+                self.paths | self._recorder.read, elapsed_ms
+            )
+            self.stored = self.reason is None
+        if self.reason:
+            self.memo._stats['skipped'] += 1
+            logger.debug(f"Cell not memoized: {self.reason}")
+        return self.stored
+
+    def _unreplayable(self, namespace: Mapping[str, Any]) -> Optional[str]:
+        if self._recorder.written:
+            return 'cell writes files'
+        for name, digest in self.inputs.items():
+            value = namespace.get(name)
+            # Rebound inputs are replayed as writes; same objects must be unchanged
+            if self._bindings.get(name) == id(value) and fingerprint(value, namespace) != digest:
+                return f"cell modifies '{name}' in place"
+        return None
+
+    def info(self) -> Dict[str, Any]:
+        """Summary for execution results."""
+        info = {'hit': self.hit, 'stored': self.stored}
+        if self.hit:
+            info['saved_ms'] = round(self.entry['elapsed_ms'], 2)
+        if self.reason:
+            info['reason'] = self.reason
+        return info
+
+
+class CellMemoizer:
+    """
+    Caches cell results by content.
+
+    The key is a hash of the cell source and the fingerprints of the
+    namespace values it reads (following functions defined in the
+    session). Files the cell reads, found statically and by auditing
+    ``open`` calls while it runs, are checked by size and mtime before a
+    cached result is used. A hit replays the recorded stdout/stderr and
+    namespace writes instead of running the cell.
+
+    Runs that write files, modify an input in place, fail, or produce
+    unpicklable results are not cached.
+    """
+
+    KEY_PREFIX = "cell:"
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        max_entry_mb: float = 256.0,
+        max_analyses: int = 512
+    ):
+        self.cache = cache
+        self.max_entry_bytes = max_entry_mb * 1024 * 1024
+        self.max_analyses = max_analyses
+
+        # source hash -> (names read, static file paths)
+        self._analyses: "OrderedDict[bytes, Tuple[FrozenSet[str], FrozenSet[str]]]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'stored': 0, 'skipped': 0, 'saved_ms': 0.0}
+
+    def _analyze(self, source_hash: bytes, code: str) -> Optional[Tuple[FrozenSet[str], FrozenSet[str]]]:
+        analysis = self._analyses.get(source_hash)
+        if analysis is not None:
+            self._analyses.move_to_end(source_hash)
+            return analysis
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return None
+        analysis = (cell_reads(tree), analyze_cell(code).paths)
+        self._analyses[source_hash] = analysis
+        while len(self._analyses) > self.max_analyses:
+            self._analyses.popitem(last=False)
+        return analysis
+
+    def prepare(self, code: str, code_obj: types.CodeType, namespace: Mapping[str, Any]) -> MemoCall:
+        """Compute the cell's key and look up a cached result."""
+        source_hash = hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        analysis = self._analyze(source_hash, code)
+        if analysis is None:
+            return MemoCall(self, reason='syntax error')
+        reads, paths = analysis
+
+        names = {name for name in reads if name in namespace and not name.startswith('__')}
+        for name in list(names):
+            for function_code in _own_functions(namespace[name], namespace):
+                names |= used_names(function_code, namespace)
+
+        h = hashlib.blake2b(source_hash, digest_size=20)
+        inputs = {}
+        for name in sorted(names):
+            digest = fingerprint(namespace[name], namespace)
+            if digest is None:
+                return MemoCall(self, reason=f"input '{name}' cannot be fingerprinted")
+            inputs[name] = digest
+            h.update(name.encode() + b'\0' + digest)
+        # Unbound names change the result once they are defined
+        for name in sorted(reads - names):
+            if name not in namespace and not hasattr(builtins, name):
+                h.update(name.encode() + b'\0unbound')
+
+        key = self.KEY_PREFIX + h.hexdigest()
+        entry = self.cache.get(key)
+        if entry is not None and _file_signature(p for p, _, _ in entry['files']) != entry['files']:
+            self.cache.delete(key)
+            entry = None
+
+        if entry is None:
+            self._stats['misses'] += 1
+        else:
+            self._stats['hits'] += 1
+            self._stats['saved_ms'] += entry['elapsed_ms']
+        return MemoCall(self, key, inputs, paths, entry)
+
+    def _store(
+        self,
+        key: str,
+        namespace: Mapping[str, Any],
+        bindings: Mapping[str, int],
+        stdout: str,
+        stderr: str,
+        paths: Iterable[str],
+        elapsed_ms: float
+    ) -> Optional[str]:
+        """Cache a cell result; returns why it was not stored, or None."""
+        writes = {name: value for name, value in namespace.items()
+                  if not name.startswith('__') and bindings.get(name) != id(value)}
+        deleted = tuple(name for name in bindings if name not in namespace)
+
+        payload = b''
+        if writes:
+            data = io.BytesIO()
+            try:
+                _ModulePickler(data, protocol=pickle.HIGHEST_PROTOCOL).dump(writes)
+            except Exception as e:
+                return f"results cannot be pickled ({type(e).__name__})"
+            payload = data.getvalue()
+            if len(payload) > self.max_entry_bytes:
+                return 'results too large'
+
+        entry = {
+            'writes': payload,
+            'deleted': deleted,
+            'stdout': stdout,
+            'stderr': stderr,
+            'files': _file_signature(paths),
+            'elapsed_ms': elapsed_ms
+        }
+        # Straight to SQLite: entries put in memory are not kept across restarts
+        if not self.cache.put(key, entry, min_tier=CacheTier.L2_SQLITE):
+            return 'cache rejected the entry'
+        self._stats['stored'] += 1
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memoization statistics."""
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'saved_ms': round(self._stats['saved_ms'], 2),
+            'hit_rate': self._stats['hits'] / lookups if lookups else 0.0
+        }
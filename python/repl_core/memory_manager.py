@@ -7,11 +7,13 @@ import sys
 import weakref
 import warnings
 from typing import Dict, Any, Optional, Tuple, List
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 import time
 import logging
 
+from .sizing import estimate_size
+
 try:
     import psutil
     PSUTIL_AVAILABLE = True
@@ -61,6 +63,11 @@ class MemoryManager:
     - Memory-mapped variable storage
     - Spill-to-disk for large objects
     - Memory pressure detection
+    
+    If ``sampler`` is set (an object with ``latest()`` returning a sample
+    with ``timestamp``, ``rss_mb``, ``vms_mb``, ``available_mb`` and
+    ``total_mb``), stats are read from its most recent sample instead of
+    querying psutil on every call.
     """
     
     def __init__(
@@ -68,17 +75,19 @@ class MemoryManager:
         memory_limit_mb: float = 1000.0,
         gc_threshold_mb: float = 500.0,
         spill_threshold_mb: float = 800.0,
-        cache_dir: str = ".repl_cache"
+        cache_dir: str = ".repl_cache",
+        sampler: Any = None
     ):
         self.memory_limit_mb = memory_limit_mb
         self.gc_threshold_mb = gc_threshold_mb
         self.spill_threshold_mb = spill_threshold_mb
         self.cache_dir = cache_dir
+        self.sampler = sampler
         
         # Tracking
         self._last_gc_time = time.time()
         self._gc_interval = 30  # seconds
-        self._memory_history: List[MemoryStats] = []
+        self._memory_history: deque = deque(maxlen=100)
         self._spilled_objects: Dict[str, str] = {}  # name -> file path
         self._weak_refs: Dict[str, weakref.ref] = {}
         
@@ -91,6 +100,21 @@ class MemoryManager:
         
     def get_memory_stats(self) -> MemoryStats:
         """Get current memory statistics."""
+        gc_stats = {
+            f"gen{i}": count for i, count in enumerate(gc.get_count())
+        }
+        
+        if self.sampler is not None:
+            sample = self.sampler.latest()
+            return MemoryStats(
+                rss_mb=sample.rss_mb,
+                vms_mb=sample.vms_mb,
+                percent=sample.rss_mb / sample.total_mb * 100 if sample.total_mb else 0.0,
+                available_mb=sample.available_mb,
+                gc_stats=gc_stats,
+                timestamp=sample.timestamp
+            )
+        
         if PSUTIL_AVAILABLE:
             process = psutil.Process()
             mem_info = process.memory_info()
@@ -107,11 +131,6 @@ class MemoryManager:
             mem_percent = 0.0
             available = 0.0
         
-        gc_stats = {
-            f"gen{i}": gc.get_count()[i] 
-            for i in range(gc.get_count().__len__())
-        }
-        
         return MemoryStats(
             rss_mb=mem_info.rss / (1024 * 1024),
             vms_mb=mem_info.vms / (1024 * 1024) if hasattr(mem_info, 'vms') else 0,
@@ -127,11 +146,7 @@ class MemoryManager:
         Returns (is_under_pressure, stats).
         """
         stats = self.get_memory_stats()
-        self._memory_history.append(stats)
-        
-        # Keep only last 100 measurements
-        if len(self._memory_history) > 100:
-            self._memory_history.pop(0)
+        self._memory_history.append(stats)  # Keeps the last 100 measurements
         
         is_under_pressure = (
             stats.rss_mb > self.spill_threshold_mb or
@@ -179,24 +194,22 @@ class MemoryManager:
         return False
     
     def estimate_object_size(self, obj: Any) -> int:
-        """Estimate object size in bytes."""
-        if NUMPY_AVAILABLE and isinstance(obj, np.ndarray):
-            return obj.nbytes
-        
-        if hasattr(obj, '__sizeof__'):
-            return sys.getsizeof(obj)
-        
-        # Rough estimation for complex objects
-        try:
-            import pickle
-            return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
-        except:
-            return 0
+        """Estimate object size in bytes, including referenced objects."""
+        return estimate_size(obj)
     
-    def should_spill(self, obj: Any, name: str = None) -> bool:
-        """Determine if object should be spilled to disk."""
+    def should_spill(
+        self,
+        obj: Any,
+        name: str = None,
+        stats: Optional[MemoryStats] = None
+    ) -> bool:
+        """
+        Determine if object should be spilled to disk.
+        Pass ``stats`` to reuse one reading when checking many objects.
+        """
         obj_size_mb = self.estimate_object_size(obj) / (1024 * 1024)
-        stats = self.get_memory_stats()
+        if stats is None:
+            stats = self.get_memory_stats()
         
         return (
             obj_size_mb > 50 or  # Large object
@@ -204,52 +217,109 @@ class MemoryManager:
             stats.is_warning
         )
     
+    def can_memory_map(self, obj: Any) -> bool:
+        """
+        Whether ``obj`` can be spilled in a format that reloads as a memory
+        map (numpy arrays without object dtype, DataFrames, Arrow tables).
+        """
+        if NUMPY_AVAILABLE and isinstance(obj, np.ndarray):
+            return not obj.dtype.hasobject
+        return self._arrow_kind(obj) is not None
+    
+    @staticmethod
+    def _arrow_kind(obj: Any) -> Optional[str]:
+        module = type(obj).__module__ or ''
+        name = type(obj).__name__
+        if module.startswith('pandas') and name == 'DataFrame':
+            return 'pandas'
+        if module.startswith('pyarrow') and name in ('Table', 'RecordBatch'):
+            return 'arrow'
+        return None
+    
     def spill_to_disk(self, obj: Any, name: str) -> Optional[str]:
         """
         Spill large object to disk.
         Returns file path if successful.
+        
+        numpy arrays are written as ``.npy`` and DataFrames/Arrow tables as
+        uncompressed Arrow IPC (Feather v2) files, so that ``load_from_disk``
+        can map them instead of reading them. Other objects are pickled.
         """
         import pickle
         import os
-        import hashlib
+        import uuid
         
-        # Generate unique filename
-        obj_hash = hashlib.md5(name.encode()).hexdigest()[:8]
-        filepath = os.path.join(
+        # Unique per spill so that an older spill of the same name can be
+        # released without touching the new file
+        stem = os.path.join(
             self.cache_dir,
-            f"spill_{name}_{obj_hash}.pkl"
+            f"spill_{name}_{uuid.uuid4().hex[:8]}"
         )
+        filepath = None
         
         try:
-            with open(filepath, 'wb') as f:
-                pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if NUMPY_AVAILABLE and isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+                filepath = stem + ".npy"
+                np.save(filepath, obj, allow_pickle=False)
+            elif self._arrow_kind(obj) is not None:
+                filepath = stem + ".arrow"
+                self._write_arrow(obj, filepath)
+            else:
+                filepath = stem + ".pkl"
+                with open(filepath, 'wb') as f:
+                    pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
             
             self._spilled_objects[name] = filepath
             logger.info(f"Spilled {name} to disk: {filepath}")
             
-            # Create weak reference to track when object is deleted
-            if hasattr(obj, '__weakref__'):
-                self._weak_refs[name] = weakref.ref(obj, 
-                    lambda ref, n=name: self._on_object_deleted(n))
-            
             return filepath
             
         except Exception as e:
             logger.error(f"Failed to spill {name}: {e}")
+            if filepath:
+                self.release_spill_file(filepath)
             return None
     
+    def _write_arrow(self, obj: Any, filepath: str):
+        """Write a DataFrame or Arrow table as an uncompressed Arrow IPC file."""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        
+        if self._arrow_kind(obj) == 'pandas':
+            # A RangeIndex is kept as metadata instead of an int64 column
+            table = pa.Table.from_pandas(obj, preserve_index=None)
+        elif isinstance(obj, pa.RecordBatch):
+            table = pa.Table.from_batches([obj])
+        else:
+            table = obj
+        
+        # Uncompressed so the buffers can be used straight from the mapping,
+        # and without splitting into record batches: columns that load as a
+        # single chunk convert to pandas without concatenating (copying) them
+        feather.write_feather(table, filepath, compression='uncompressed',
+                              chunksize=max(table.num_rows, 1))
+        
+        # Remember what to hand back on load
+        with open(filepath + ".kind", 'w') as f:
+            f.write(self._arrow_kind(obj))
+    
     def load_from_disk(self, name: str) -> Optional[Any]:
-        """Load spilled object from disk."""
+        """
+        Load spilled object from disk.
+        
+        ``.npy`` files come back as read-only ``np.memmap`` views and Arrow
+        files as tables backed by a memory map, so pages are read on demand
+        rather than up front. DataFrames are rebuilt from the mapped table
+        one block per column; columns without nulls that need no conversion
+        (numeric, strings) keep pointing into the mapping.
+        """
         if name not in self._spilled_objects:
             return None
         
         filepath = self._spilled_objects[name]
         
         try:
-            import pickle
-            with open(filepath, 'rb') as f:
-                obj = pickle.load(f)
-            
+            obj = self.load_spill_file(filepath)
             logger.info(f"Loaded {name} from disk: {filepath}")
             return obj
             
@@ -257,6 +327,74 @@ class MemoryManager:
             logger.error(f"Failed to load {name}: {e}")
             return None
     
+    def load_spill_file(self, filepath: str) -> Any:
+        """Load a file written by ``spill_to_disk``."""
+        if filepath.endswith(".npy"):
+            return np.load(filepath, mmap_mode='r', allow_pickle=False)
+        
+        if filepath.endswith(".arrow"):
+            import mmap
+            import pyarrow as pa
+            
+            with open(filepath + ".kind") as f:
+                kind = f.read().strip()
+            if kind != 'pandas':
+                with pa.memory_map(filepath, 'r') as source:
+                    return pa.ipc.open_file(source).read_all()
+            
+            # Private copy-on-write mapping: the frame can be modified in
+            # place without touching the file, and only written pages are
+            # copied into memory
+            with open(filepath, 'rb') as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            table = pa.ipc.open_file(pa.py_buffer(mapping)).read_all()
+            return self._frame_from_mapping(table, mapping)
+        
+        import pickle
+        with open(filepath, 'rb') as f:
+            return pickle.load(f)
+    
+    @staticmethod
+    def _frame_from_mapping(table: Any, mapping: Any) -> Any:
+        """
+        Convert a mapped Arrow table to a DataFrame without copying columns.
+        
+        ``to_pandas`` hands out zero-copy numpy columns as read-only; those
+        are re-viewed as writable arrays over the same (private) mapping.
+        """
+        import pandas as pd
+        
+        frame = table.to_pandas(split_blocks=True)
+        base = np.frombuffer(mapping, dtype=np.uint8)
+        columns = {}
+        for i in range(frame.shape[1]):
+            series = frame.iloc[:, i]
+            if not isinstance(series.dtype, np.dtype):
+                columns[i] = series.array
+                continue
+            values = series.to_numpy(copy=False)
+            offset = values.ctypes.data - base.ctypes.data
+            if (not values.flags.writeable and values.flags.c_contiguous and
+                    0 <= offset and offset + values.nbytes <= base.nbytes):
+                values = base[offset:offset + values.nbytes].view(values.dtype)
+            columns[i] = values
+        
+        result = pd.DataFrame(columns, index=frame.index, copy=False)
+        result.columns = frame.columns
+        return result
+    
+    def release_spill_file(self, filepath: str):
+        """Delete a spill file (and its sidecar) if it still exists."""
+        import os
+        for path in (filepath, filepath + ".kind"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        for name, path in list(self._spilled_objects.items()):
+            if path == filepath:
+                del self._spilled_objects[name]
+    
     def _on_object_deleted(self, name: str):
         """Callback when spilled object is deleted."""
         if name in self._spilled_objects:
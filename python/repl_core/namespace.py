@@ -0,0 +1,119 @@
+"""
+Namespace helpers for cell execution.
+
+Cells run with a plain ``dict`` as globals: any dict subclass disables
+CPython's global-lookup fast path and makes every global and builtin
+access several times slower. Name usage is therefore derived from the
+compiled code object instead of from lookup hooks.
+"""
+
+import types
+from functools import lru_cache
+from typing import Any, Container, Dict, FrozenSet, Hashable, Mapping, Optional, Set
+
+
+@lru_cache(maxsize=1024)
+def referenced_names(code: types.CodeType) -> FrozenSet[str]:
+    """
+    Names a code object (including nested functions, classes and
+    comprehensions) may load or store by name.
+
+    This is an over-approximation: ``co_names`` also lists attribute
+    names, so ``x.append`` contributes ``append``.
+    """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= referenced_names(const)
+    return frozenset(names)
+
+
+def _own_functions(value: Any, namespace: Mapping[str, Any]):
+    """Code of functions (or methods of a class) defined in ``namespace``."""
+    if isinstance(value, types.FunctionType):
+        if value.__globals__ is namespace:
+            yield value.__code__
+    elif isinstance(value, type):
+        for attr in vars(value).values():
+            func = getattr(attr, '__func__', attr)  # staticmethod/classmethod
+            if isinstance(func, types.FunctionType) and func.__globals__ is namespace:
+                yield func.__code__
+
+
+def used_names(
+    code: types.CodeType,
+    namespace: Mapping[str, Any],
+    known: Container[str] = (),
+    max_depth: int = 4
+) -> Set[str]:
+    """
+    Names a cell may read from ``namespace``, following the functions and
+    classes it refers to that were themselves defined in that namespace.
+
+    Names in ``known`` are reported even when they are not currently bound
+    (e.g. variables that were moved out and can be brought back).
+    """
+    names: Set[str] = set()
+    frontier = [code]
+    depth = 0
+    while frontier and depth <= max_depth:
+        next_frontier = []
+        for current in frontier:
+            for name in referenced_names(current):
+                if name in names:
+                    continue
+                if name in namespace:
+                    names.add(name)
+                    next_frontier.extend(_own_functions(namespace[name], namespace))
+                elif name in known:
+                    names.add(name)
+        frontier = next_frontier
+        depth += 1
+    return names
+
+
+# Containers whose length is part of the version token (len() is cheap
+# and cannot run user code for these exact types)
+_SIZED_TYPES = (list, dict, set, bytearray)
+
+
+def _version_token(value: Any) -> Hashable:
+    if type(value) in _SIZED_TYPES:
+        return (id(value), len(value))
+    return id(value)
+
+
+class NamespaceTracker:
+    """
+    Reports which names changed between two points in time.
+
+    After each cell, ``collect`` compares every binding against the token
+    recorded last time (object identity, plus length for builtin
+    containers). Names that were added or rebound are dirty. Objects
+    mutated in place keep their identity, so names the cell's code refers
+    to are reported as dirty as well.
+    """
+
+    def __init__(self, namespace: Optional[Mapping[str, Any]] = None):
+        self._tokens: Dict[str, Hashable] = {}
+        if namespace is not None:
+            self.collect(namespace)
+
+    def collect(
+        self,
+        namespace: Mapping[str, Any],
+        code: Optional[types.CodeType] = None
+    ) -> Set[str]:
+        """Return names changed since the last call and record the new state."""
+        previous = self._tokens
+        tokens = {name: _version_token(value) for name, value in namespace.items()}
+        self._tokens = tokens
+
+        dirty = {name for name, token in tokens.items() if previous.get(name) != token}
+        if code is not None:
+            dirty |= referenced_names(code) & tokens.keys()
+        return dirty
+
+    def reset(self):
+        """Forget the recorded state; the next collect reports every name."""
+        self._tokens = {}
@@ -0,0 +1,356 @@
+"""
+Output capture writers for cell execution.
+"""
+
+import io
+import os
+import uuid
+import atexit
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingCapture(io.TextIOBase):
+    """
+    Text stream that forwards output in chunks while a cell is running.
+
+    Writes are buffered and handed to ``emit`` once ``chunk_size``
+    characters are pending or ``interval`` seconds have passed since the
+    last flush. Only the last ``tail_size`` characters are retained, so
+    memory stays bounded no matter how much the cell prints.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str], None],
+        chunk_size: int = 8192,
+        interval: float = 0.1,
+        tail_size: int = 4096
+    ):
+        super().__init__()
+        self.emit = emit
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self.tail_size = tail_size
+
+        self._pending = []
+        self._pending_size = 0
+        self._tail = ""
+        self._lock = threading.RLock()
+        self._ticker = None
+        self._stopped = threading.Event()
+
+        # Totals
+        self.total_chars = 0
+        self.chunks_emitted = 0
+
+    def start(self) -> 'StreamingCapture':
+        """Start the time-based flusher."""
+        if self.interval and self.interval > 0 and self._ticker is None:
+            self._ticker = threading.Thread(
+                target=self._tick,
+                name="output-stream-flusher",
+                daemon=True
+            )
+            self._ticker.start()
+        return self
+
+    def _tick(self):
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                self._flush_pending()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+
+        with self._lock:
+            self._pending.append(text)
+            self._pending_size += len(text)
+            self.total_chars += len(text)
+
+            self._tail = (self._tail + text)[-self.tail_size:]
+
+            # Size-based flush here; time-based flushes come from the ticker
+            # so that the pieces of a single print() are not split up.
+            if self._pending_size >= self.chunk_size or not self._ticker:
+                self._flush_pending()
+
+        return len(text)
+
+    def _flush_pending(self):
+        """Emit everything pending as one chunk (caller holds the lock)."""
+        if not self._pending:
+            return
+
+        chunk = "".join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+
+        try:
+            self.emit(chunk)
+            self.chunks_emitted += 1
+        except Exception as e:
+            logger.error(f"Failed to emit output chunk: {e}")
+
+    def flush(self):
+        with self._lock:
+            self._flush_pending()
+
+    def close(self):
+        """Stop the flusher and emit any remaining output."""
+        self._stopped.set()
+        if self._ticker is not None:
+            self._ticker.join(timeout=1.0)
+            self._ticker = None
+        self.flush()
+        super().close()
+
+    def getvalue(self) -> str:
+        """Return the retained tail of the output."""
+        with self._lock:
+            return self._tail
+
+    @property
+    def truncated(self) -> bool:
+        """Whether output beyond the retained tail was written."""
+        return self.total_chars > len(self._tail)
+
+    def get_totals(self) -> Dict[str, Any]:
+        """Get output totals."""
+        return {
+            'chars': self.total_chars,
+            'chunks': self.chunks_emitted,
+            'truncated': self.truncated
+        }
+
+
+class SpilledOutputStore:
+    """
+    Registry of spilled output files, addressable by handle.
+
+    Only the most recent ``max_files`` spills are kept on disk; older
+    files are deleted when new ones are registered.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None, max_files: int = 32):
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "repl_output")
+        self.max_files = max_files
+        self._files: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        atexit.register(self.clear)
+
+    def create(self):
+        """Create a new spill file. Returns (handle, text file object)."""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        handle = f"out_{uuid.uuid4().hex[:12]}"
+        path = os.path.join(self.spill_dir, f"{handle}.txt")
+        fileobj = open(path, 'w', encoding='utf-8', errors='replace', newline='')
+
+        with self._lock:
+            self._files[handle] = path
+            while len(self._files) > self.max_files:
+                _, old_path = self._files.popitem(last=False)
+                self._remove(old_path)
+
+        return handle, fileobj
+
+    def read(self, handle: str, offset: int = 0, length: int = 65536) -> Dict[str, Any]:
+        """
+        Read a page of spilled output.
+
+        ``offset`` and ``length`` are in bytes of the UTF-8 file; the page
+        is cut back to a character boundary and ``next_offset`` points at
+        the start of the following page.
+        """
+        with self._lock:
+            path = self._files.get(handle)
+
+        if path is None or not os.path.exists(path):
+            raise KeyError(f"Unknown output handle: {handle}")
+
+        size = os.path.getsize(path)
+        offset = max(0, min(int(offset), size))
+        length = max(0, int(length))
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+
+        # Do not split a multi-byte character at the end of the page
+        cut = len(data)
+        while cut > 0:
+            try:
+                text = data[:cut].decode('utf-8')
+                break
+            except UnicodeDecodeError as e:
+                if cut - e.start > 3:
+                    text = data[:cut].decode('utf-8', errors='replace')
+                    break
+                cut = e.start
+        else:
+            text = ""
+
+        next_offset = offset + cut
+        return {
+            'handle': handle,
+            'offset': offset,
+            'next_offset': next_offset,
+            'size': size,
+            'eof': next_offset >= size,
+            'data': text
+        }
+
+    def release(self, handle: str) -> bool:
+        """Delete a spilled output file."""
+        with self._lock:
+            path = self._files.pop(handle, None)
+        if path is None:
+            return False
+        self._remove(path)
+        return True
+
+    def clear(self):
+        """Delete all spilled output files."""
+        with self._lock:
+            paths = list(self._files.values())
+            self._files.clear()
+        for path in paths:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Shared store used by all capture buffers
+OUTPUT_STORE = SpilledOutputStore()
+
+
+def read_output(handle: str, offset: int = 0, length: int = 65536) -> Dict[str, Any]:
+    """Page through output that was spilled by a BoundedCapture."""
+    return OUTPUT_STORE.read(handle, offset, length)
+
+
+class BoundedCapture(io.TextIOBase):
+    """
+    Text stream with a memory cap.
+
+    Output is kept in memory until ``max_size`` characters have been
+    written. Past that, the full stream is spilled to a file in
+    ``OUTPUT_STORE`` and only the first ``head_size`` and last
+    ``tail_size`` characters stay in memory. ``getvalue()`` then returns
+    head and tail joined by a marker naming the spill handle.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024 * 1024,
+        head_size: int = 64 * 1024,
+        tail_size: int = 64 * 1024,
+        store: Optional[SpilledOutputStore] = None
+    ):
+        super().__init__()
+        self.max_size = max_size
+        # Head and tail together never exceed the cap
+        self.head_size = min(head_size, max_size // 2)
+        self.tail_size = min(tail_size, max_size // 2)
+        self.store = store or OUTPUT_STORE
+
+        self._buffer = io.StringIO()
+        self._head = ""
+        self._tail = ""
+        self._spill = None
+        self._lock = threading.Lock()
+
+        self.handle: Optional[str] = None
+        self.total_chars = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not text:
+            return 0
+
+        with self._lock:
+            self.total_chars += len(text)
+
+            if self._spill is None:
+                self._buffer.write(text)
+                if self.total_chars > self.max_size:
+                    self._start_spill()
+            else:
+                self._spill.write(text)
+                self._tail = (self._tail + text)[-self.tail_size:]
+
+        return len(text)
+
+    def _start_spill(self):
+        """Move buffered output to a spill file (caller holds the lock)."""
+        content = self._buffer.getvalue()
+        self._buffer = None
+
+        try:
+            self.handle, self._spill = self.store.create()
+            self._spill.write(content)
+        except OSError as e:
+            logger.error(f"Failed to spill output: {e}")
+            self.handle = None
+            self._spill = io.StringIO()  # Discard the middle of the stream
+
+        self._head = content[:self.head_size]
+        self._tail = content[-self.tail_size:] if self.tail_size else ""
+
+    def flush(self):
+        with self._lock:
+            if self._spill is not None and not self._spill.closed:
+                self._spill.flush()
+
+    def close(self):
+        super().close()
+        with self._lock:
+            if self._spill is not None and not self._spill.closed:
+                self._spill.close()
+
+    @property
+    def truncated(self) -> bool:
+        """Whether only head and tail are held in memory."""
+        return self._spill is not None
+
+    def getvalue(self) -> str:
+        """Return the captured output, or head + marker + tail if spilled."""
+        with self._lock:
+            if self._spill is None:
+                return self._buffer.getvalue()
+
+            # Tail must not overlap the head when only slightly over the cap
+            room = self.total_chars - len(self._head)
+            tail = self._tail[len(self._tail) - room:] if room < len(self._tail) else self._tail
+            omitted = self.total_chars - len(self._head) - len(tail)
+            where = f"read_output('{self.handle}')" if self.handle else "not saved"
+            marker = (
+                f"\n... [{omitted:,} characters omitted; "
+                f"full output ({self.total_chars:,} characters): {where}] ...\n"
+            )
+            return self._head + marker + tail
+
+    def get_totals(self) -> Dict[str, Any]:
+        """Get output totals."""
+        return {
+            'chars': self.total_chars,
+            'truncated': self.truncated,
+            'handle': self.handle
+        }
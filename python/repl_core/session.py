@@ -8,7 +8,10 @@ import json
 import time
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List, Union
+import types
+import weakref
+from functools import partial
+from typing import Dict, Any, Optional, List, Union, Callable
 from dataclasses import dataclass, asdict
 import io
 import traceback
@@ -18,6 +21,14 @@ from .base import BaseSession, ExecutionResult, ExecutionMode
 from .memory_manager import MemoryManager
 from .cache.tiered_cache import TieredCache
 from .streaming.data_stream import DataStream, StreamProcessor
+from .output_capture import BoundedCapture, read_output
+from .classifier import ExecutionModeClassifier
+from .namespace import NamespaceTracker
+from .memo import CellMemoizer, strip_marker
+from .lazy import LazyFrame, LazyStream, col, lazy
+from .distributed import DistributedExecutor, Combiner
+from .history import ExecutionHistory
+from .interrupt import CellInterrupter
 
 logger = logging.getLogger(__name__)
 
@@ -33,21 +44,31 @@ class EnhancedREPLSession(BaseSession):
     - Progressive output rendering
     - DataFrame/array lazy loading
     - Automatic spill-to-disk
+    - Bounded output capture with paging (read_output)
+    - Opt-in cell memoization (``@cached_cell`` or ``execute(memoize=True)``)
+    - Lazy DAG execution (``scan_csv``/``scan_parquet``/``lazy``), run and
+      optimized at sinks such as ``collect`` or ``print``
+    - Multi-process stream execution (``run_distributed``)
+    - Cell cancellation and timeouts (``cancel()``, ``execute(timeout=...)``)
     """
     
     def __init__(
         self,
         memory_limit_mb: float = 1000,
-        cache_dir: str = ".repl_cache",
+        cache_dir: Optional[str] = None,
         enable_streaming: bool = True,
         enable_caching: bool = True,
-        chunk_size: int = 10000
+        chunk_size: int = 10000,
+        output_limit: int = 1024 * 1024
     ):
+        # Pool workers each get their own directory through REPL_CACHE_DIR
+        cache_dir = cache_dir or os.environ.get('REPL_CACHE_DIR', '.repl_cache')
         self.memory_limit_mb = memory_limit_mb
         self.cache_dir = cache_dir
         self.enable_streaming = enable_streaming
         self.enable_caching = enable_caching
         self.chunk_size = chunk_size
+        self.output_limit = output_limit
         
         # Initialize components
         self.memory_manager = MemoryManager(
@@ -61,13 +82,28 @@ class EnhancedREPLSession(BaseSession):
         
         self.stream_processor = StreamProcessor(max_workers=4)
         
+        # Partitions stream sources across worker processes
+        self.distributed = DistributedExecutor()
+        
+        # AST-based execution mode decisions, cached by source hash
+        self.mode_classifier = ExecutionModeClassifier()
+        
+        # Stops the running cell on cancel() or timeout
+        self.interrupter = CellInterrupter()
+        
+        # Content-addressed cell results (opt-in per cell)
+        self.cell_memo = CellMemoizer(self.cache) if self.cache is not None else None
+        
         # Session namespace
         self.namespace = {}
         self._init_namespace()
         
+        # Names rebound or touched by the last cell (spill candidates)
+        self._tracker = NamespaceTracker(self.namespace)
+        
         # Execution tracking
         self.execution_count = 0
-        self.execution_history = []
+        self.execution_history = ExecutionHistory(capacity=1000)
         
         logger.info(
             f"Enhanced REPL initialized: memory_limit={memory_limit_mb}MB, "
@@ -82,18 +118,27 @@ class EnhancedREPLSession(BaseSession):
             '__name__': '__main__',
             '__builtins__': builtins,
             'DataStream': DataStream,
+            'scan_csv': LazyFrame.scan_csv,
+            'scan_parquet': LazyFrame.scan_parquet,
+            'lazy': lazy,
+            'col': col,
+            'run_distributed': self.distributed.run,
+            'Combiner': Combiner,
             'load_csv': self._create_csv_loader(),
             'load_json': self._create_json_loader(),
             'load_parquet': self._create_parquet_loader(),
             'memory_info': self.get_memory_report,
             'cache_info': self.get_cache_stats,
             'clear_cache': self.clear_cache,
-            'process_large': self._process_large_data
+            'process_large': self._process_large_data,
+            'read_output': read_output
         })
     
     def _create_csv_loader(self):
         """Create lazy CSV loader function."""
         def load_csv(filepath: str, streaming: bool = True, **kwargs):
+            if self.namespace.get('_lazy_mode'):
+                return LazyFrame.scan_csv(filepath, **kwargs)
             if streaming and self.enable_streaming:
                 return DataStream.from_csv(filepath, chunk_size=self.chunk_size)
             else:
@@ -110,7 +155,8 @@ class EnhancedREPLSession(BaseSession):
     def _create_json_loader(self):
         """Create lazy JSON loader function."""
         def load_json(filepath: str, streaming: bool = False):
-            if streaming and self.enable_streaming:
+            lazy_mode = self.namespace.get('_lazy_mode')
+            if (streaming and self.enable_streaming) or lazy_mode:
                 def json_generator():
                     with open(filepath, 'r') as f:
                         data = json.load(f)
@@ -120,6 +166,8 @@ class EnhancedREPLSession(BaseSession):
                         else:
                             yield data
                 
+                if lazy_mode:
+                    return LazyStream.from_iterable(json_generator)
                 return DataStream(json_generator())
             else:
                 with open(filepath, 'r') as f:
@@ -130,16 +178,13 @@ class EnhancedREPLSession(BaseSession):
     def _create_parquet_loader(self):
         """Create lazy Parquet loader function."""
         def load_parquet(filepath: str, streaming: bool = True):
+            if self.namespace.get('_lazy_mode'):
+                return LazyFrame.scan_parquet(filepath)
             try:
                 import pyarrow.parquet as pq
                 
                 if streaming and self.enable_streaming:
-                    def parquet_generator():
-                        parquet_file = pq.ParquetFile(filepath)
-                        for batch in parquet_file.iter_batches(batch_size=self.chunk_size):
-                            yield batch.to_pandas()
-                    
-                    return DataStream(parquet_generator())
+                    return DataStream.from_parquet(filepath, batch_size=self.chunk_size)
                 else:
                     return pq.read_table(filepath).to_pandas()
                     
@@ -194,8 +239,21 @@ class EnhancedREPLSession(BaseSession):
             else:
                 return data
     
-    def execute(self, code: str) -> ExecutionResult:
-        """Execute code with automatic optimization."""
+    def execute(self, code: str, memoize: Optional[bool] = None,
+                timeout: Optional[float] = None) -> ExecutionResult:
+        """
+        Execute code with automatic optimization.
+        
+        With ``memoize`` (or an ``@cached_cell`` first line) a cached result
+        for the same source and inputs is replayed instead of running the cell.
+        
+        With ``timeout`` (seconds) the cell is interrupted when it runs
+        longer, as with ``cancel()``; variables it assigned so far are kept.
+        """
+        code, marked = strip_marker(code)
+        if memoize is None:
+            memoize = marked
+        
         self.execution_count += 1
         start_time = time.perf_counter()
         
@@ -214,20 +272,51 @@ class EnhancedREPLSession(BaseSession):
             memory_usage_mb=stats.rss_mb
         )
         
+        code_obj = None
+        memo_call = None
+        stdout = None
         try:
             # Capture output
-            with self._capture_output() as (stdout, stderr):
-                # Execute code
-                if mode == ExecutionMode.STREAMING:
-                    exec_result = self._execute_streaming(code)
-                else:
-                    exec_result = self._execute_immediate(code)
+            with self._capture_output() as (stdout, stderr), self.interrupter.running(timeout=timeout):
+                code_obj = compile(code, '<string>', 'exec')
+                
+                if memoize and self.cell_memo is not None:
+                    memo_call = self.cell_memo.prepare(code, code_obj, self.namespace)
                 
-                result.result = exec_result
+                if memo_call is not None and memo_call.hit:
+                    # Same source and inputs: replay instead of running
+                    cached_stdout, cached_stderr = memo_call.replay(self.namespace)
+                    stdout.write(cached_stdout)
+                    stderr.write(cached_stderr)
+                    result.cached = True
+                elif memo_call is not None and memo_call.active:
+                    with memo_call.recording(self.namespace):
+                        result.result = self._execute_mode(mode, code_obj)
+                else:
+                    result.result = self._execute_mode(mode, code_obj)
             
             result.stdout = stdout.getvalue()
             result.stderr = stderr.getvalue()
             
+            if memo_call is not None:
+                if not (stdout.truncated or stderr.truncated):
+                    memo_call.store(self.namespace, result.stdout, result.stderr)
+                result.metadata = {'memo': memo_call.info()}
+            
+            if stdout.truncated or stderr.truncated:
+                result.metadata = result.metadata or {}
+                result.metadata['output'] = {
+                    'stdout': stdout.get_totals(),
+                    'stderr': stderr.get_totals()
+                }
+            
+        except KeyboardInterrupt as e:
+            result.success = False
+            result.stdout = stdout.getvalue() if stdout is not None else ''
+            result.stderr = f"KeyboardInterrupt: {e}\n" if str(e) else "KeyboardInterrupt\n"
+            result.metadata = result.metadata or {}
+            result.metadata['cancelled'] = self.interrupter.last_reason or 'interrupted'
+            
         except Exception as e:
             result.success = False
             result.stderr = f"Error: {type(e).__name__}: {str(e)}\n"
@@ -237,54 +326,50 @@ class EnhancedREPLSession(BaseSession):
         elapsed_ms = (time.perf_counter() - start_time) * 1000
         result.execution_time_ms = elapsed_ms
         
-        # Update history
-        self.execution_history.append({
-            'count': self.execution_count,
-            'code_preview': code[:100],
-            'success': result.success,
-            'mode': mode.value,
-            'elapsed_ms': elapsed_ms,
-            'memory_mb': result.memory_usage_mb
-        })
-        
-        # Trim history if too large
-        if len(self.execution_history) > 1000:
-            self.execution_history = self.execution_history[-500:]
+        # Update history (fixed-size ring buffer)
+        after_mb = self.memory_manager.get_memory_stats().rss_mb
+        self.execution_history.record(
+            elapsed_ms,
+            memory_mb=after_mb,
+            memory_delta_mb=after_mb - result.memory_usage_mb,
+            success=result.success,
+            label='memo' if result.cached else mode.value,
+            preview=code,
+            count=self.execution_count
+        )
         
-        # Check if we need to spill variables to disk
-        self._check_and_spill_variables()
+        # Check if we need to spill variables to disk (changed names only)
+        self._check_and_spill_variables(self._tracker.collect(self.namespace, code_obj))
         
         return result
     
+    def cancel(self, reason: str = 'cancelled') -> bool:
+        """
+        Interrupt the running cell with ``KeyboardInterrupt``.
+        
+        Can be called from any thread. Returns False if no cell is running.
+        """
+        return self.interrupter.interrupt(reason)
+    
     def _determine_execution_mode(self, code: str) -> ExecutionMode:
         """Determine optimal execution mode based on code analysis."""
-        # Simple heuristics - can be enhanced with AST analysis
-        streaming_keywords = ['DataStream', 'load_csv', 'load_parquet', 'process_large']
-        
-        for keyword in streaming_keywords:
-            if keyword in code:
-                return ExecutionMode.STREAMING
-        
-        # Check for large data operations
-        if any(op in code for op in ['read_csv', 'read_parquet', 'read_json']):
-            # Check file size if possible
-            import re
-            file_match = re.search(r'["\']([^"\']+\.(csv|parquet|json))["\']', code)
-            if file_match:
-                filepath = file_match.group(1)
-                if os.path.exists(filepath):
-                    size_mb = os.path.getsize(filepath) / (1024 * 1024)
-                    if size_mb > 100:
-                        return ExecutionMode.STREAMING
-        
-        return ExecutionMode.IMMEDIATE
-    
-    def _execute_immediate(self, code: str) -> Any:
+        return self.mode_classifier.classify(code)
+    
+    def _execute_mode(self, mode: ExecutionMode, code: Union[str, types.CodeType]) -> Any:
+        """Run code with the executor for ``mode``."""
+        if mode == ExecutionMode.STREAMING:
+            return self._execute_streaming(code)
+        if mode == ExecutionMode.LAZY:
+            return self._execute_lazy(code)
+        # DISTRIBUTED cells fan out inside run_distributed; the cell itself runs here
+        return self._execute_immediate(code)
+    
+    def _execute_immediate(self, code: Union[str, types.CodeType]) -> Any:
         """Execute code immediately in memory."""
         exec(code, self.namespace)
         return None
     
-    def _execute_streaming(self, code: str) -> Any:
+    def _execute_streaming(self, code: Union[str, types.CodeType]) -> Any:
         """Execute code with streaming optimizations."""
         # Inject streaming helpers into namespace
         self.namespace['_streaming_mode'] = True
@@ -296,30 +381,84 @@ class EnhancedREPLSession(BaseSession):
         
         return None
     
-    def _check_and_spill_variables(self):
-        """Check variables and spill large ones to disk."""
+    def _execute_lazy(self, code: Union[str, types.CodeType]) -> Any:
+        """Execute code with loaders returning deferred plans (see lazy.py)."""
+        self.namespace['_lazy_mode'] = True
+        
+        try:
+            exec(code, self.namespace)
+        finally:
+            self.namespace.pop('_lazy_mode', None)
+        
+        return None
+    
+    def _check_and_spill_variables(self, names: Optional[Any] = None):
+        """
+        Check variables and spill large ones to disk.
+        Only ``names`` are checked if given (e.g. the names a cell changed).
+        """
         if not self.enable_caching:
             return
         
-        for name, value in list(self.namespace.items()):
-            if name.startswith('_') or name in ['__builtins__', '__name__']:
+        if names is None:
+            names = list(self.namespace)
+        
+        candidates = []
+        for name in names:
+            if name.startswith('_') or name not in self.namespace:
                 continue
-            
-            if self.memory_manager.should_spill(value, name):
-                # Cache the variable
-                cache_key = f"var_{name}"
-                if self.cache.put(cache_key, value):
-                    # Replace with a lazy proxy
-                    self.namespace[name] = LazyVariable(cache_key, self.cache)
-                    logger.info(f"Spilled variable '{name}' to cache")
+            value = self.namespace[name]
+            if isinstance(value, LazyVariable):
+                continue
+            candidates.append((name, value))
+        
+        if not candidates:
+            return
+        
+        # One memory reading for the whole pass
+        stats = self.memory_manager.get_memory_stats()
+        
+        for name, value in candidates:
+            if self.memory_manager.should_spill(value, name, stats=stats):
+                self._spill_variable(name, value)
+    
+    def _spill_variable(self, name: str, value: Any) -> bool:
+        """
+        Replace a variable with a lazy proxy backed by disk.
+        
+        Arrays, DataFrames and Arrow tables are spilled to memory-mappable
+        files and come back as mapped views; everything else goes through
+        the tiered cache.
+        """
+        if self.memory_manager.can_memory_map(value):
+            filepath = self.memory_manager.spill_to_disk(value, name)
+            if filepath:
+                lazy = LazyVariable(
+                    f"spill_{name}",
+                    loader=partial(self.memory_manager.load_spill_file, filepath)
+                )
+                # The file lives as long as the proxy
+                weakref.finalize(lazy, self.memory_manager.release_spill_file, filepath)
+                self.namespace[name] = lazy
+                logger.info(f"Spilled variable '{name}' to {filepath}")
+                return True
+        
+        # Cache the variable
+        cache_key = f"var_{name}"
+        if self.cache.put(cache_key, value):
+            # Replace with a lazy proxy
+            self.namespace[name] = LazyVariable(cache_key, self.cache)
+            logger.info(f"Spilled variable '{name}' to cache")
+            return True
+        return False
     
     @contextmanager
     def _capture_output(self):
-        """Capture stdout and stderr."""
+        """Capture stdout and stderr with a memory cap (see BoundedCapture)."""
         old_stdout = sys.stdout
         old_stderr = sys.stderr
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
+        stdout_capture = BoundedCapture(max_size=self.output_limit)
+        stderr_capture = BoundedCapture(max_size=self.output_limit)
         
         try:
             sys.stdout = stdout_capture
@@ -328,6 +467,8 @@ class EnhancedREPLSession(BaseSession):
         finally:
             sys.stdout = old_stdout
             sys.stderr = old_stderr
+            stdout_capture.close()
+            stderr_capture.close()
     
     def get_variable(self, name: str) -> Any:
         """Get variable from namespace."""
@@ -343,9 +484,7 @@ class EnhancedREPLSession(BaseSession):
         """Set variable in namespace."""
         # Check if we should cache it
         if self.enable_caching and self.memory_manager.should_spill(value, name):
-            cache_key = f"var_{name}"
-            if self.cache.put(cache_key, value):
-                self.namespace[name] = LazyVariable(cache_key, self.cache)
+            if self._spill_variable(name, value):
                 return
         
         self.namespace[name] = value
@@ -354,9 +493,11 @@ class EnhancedREPLSession(BaseSession):
         """Clear session state."""
         # Keep essential items
         essential = ['__name__', '__builtins__', 'DataStream', 
+                    'scan_csv', 'scan_parquet', 'lazy', 'col',
+                    'run_distributed', 'Combiner',
                     'load_csv', 'load_json', 'load_parquet',
                     'memory_info', 'cache_info', 'clear_cache',
-                    'process_large']
+                    'process_large', 'read_output']
         
         # Clear namespace
         for key in list(self.namespace.keys()):
@@ -377,13 +518,17 @@ class EnhancedREPLSession(BaseSession):
         return self.memory_manager.get_memory_stats().rss_mb
     
     def get_memory_report(self) -> Dict[str, Any]:
-        """Get detailed memory report."""
-        return self.memory_manager.get_memory_report()
+        """Get detailed memory report, with per-cell latency and memory-delta percentiles."""
+        report = self.memory_manager.get_memory_report()
+        report['executions'] = self.execution_history.summary()
+        return report
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         if self.cache:
-            return self.cache.get_stats()
+            stats = self.cache.get_stats()
+            stats['memo'] = self.cell_memo.get_stats()
+            return stats
         return {}
     
     def clear_cache(self) -> None:
@@ -396,18 +541,30 @@ class EnhancedREPLSession(BaseSession):
 class LazyVariable:
     """
     Lazy variable that loads from cache on access.
+    
+    With a ``loader`` the value comes from calling it instead (used for
+    memory-mapped spill files, where the loader returns a mapped view).
     """
     
-    def __init__(self, cache_key: str, cache: TieredCache):
+    def __init__(
+        self,
+        cache_key: str,
+        cache: Optional[TieredCache] = None,
+        loader: Optional[Callable[[], Any]] = None
+    ):
         self.cache_key = cache_key
         self.cache = cache
+        self.loader = loader
         self._loaded = False
         self._value = None
     
     def get(self):
         """Load and return value."""
         if not self._loaded:
-            self._value = self.cache.get(self.cache_key)
+            if self.loader is not None:
+                self._value = self.loader()
+            else:
+                self._value = self.cache.get(self.cache_key)
             self._loaded = True
         return self._value
     
@@ -0,0 +1,256 @@
+"""
+Deep object size estimation.
+"""
+
+import sys
+import time
+import threading
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_SEQUENCE_TYPES = (list, tuple, set, frozenset, deque)
+
+
+class ObjectSizer:
+    """
+    Estimates the memory held by an object, including what it references.
+
+    - numpy arrays and Arrow objects report their buffer sizes
+    - pandas objects use ``memory_usage(deep=True)``; object columns of
+      large frames are measured on evenly spaced rows and extrapolated
+    - containers are walked recursively; beyond ``sample_size`` items an
+      evenly spaced sample is measured and extrapolated
+    - objects reached twice are only counted once
+    - each call stops descending after ``time_budget`` seconds and
+      extrapolates from what it has measured so far
+
+    Results for containers and pandas objects are cached by object id
+    together with a fingerprint (type and length/shape), so re-sizing an
+    unchanged large object is a dictionary lookup.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = 100,
+        frame_sample_rows: int = 10000,
+        time_budget: float = 0.05,
+        max_depth: int = 8,
+        cache_size: int = 4096
+    ):
+        self.sample_size = sample_size
+        self.frame_sample_rows = frame_sample_rows
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.cache_size = cache_size
+
+        # id -> (fingerprint, size)
+        self._cache: "OrderedDict[int, Tuple[Hashable, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'cache_hits': 0, 'sampled': 0, 'budget_exceeded': 0}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def estimate(self, obj: Any) -> int:
+        """Estimate the deep size of ``obj`` in bytes."""
+        self._stats['calls'] += 1
+        deadline = time.perf_counter() + self.time_budget
+        try:
+            return int(self._size(obj, 0, set(), deadline))
+        except Exception as e:
+            logger.debug(f"Size estimation failed for {type(obj).__name__}: {e}")
+            return self._shallow(obj)
+
+    def clear(self):
+        """Forget cached sizes."""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get estimator statistics."""
+        return {**self._stats, 'cached': len(self._cache)}
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _fingerprint(obj: Any) -> Hashable:
+        shape = getattr(obj, 'shape', None)
+        if isinstance(shape, tuple):
+            return (type(obj), shape)
+        return (type(obj), len(obj))
+
+    def _cached(self, obj: Any) -> Optional[int]:
+        with self._lock:
+            entry = self._cache.get(id(obj))
+            if entry is not None and entry[0] == self._fingerprint(obj):
+                self._cache.move_to_end(id(obj))
+                self._stats['cache_hits'] += 1
+                return entry[1]
+        return None
+
+    def _remember(self, obj: Any, size: int):
+        with self._lock:
+            self._cache[id(obj)] = (self._fingerprint(obj), size)
+            self._cache.move_to_end(id(obj))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Sizing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _shallow(obj: Any) -> int:
+        try:
+            return sys.getsizeof(obj)
+        except TypeError:
+            return 0
+
+    def _size(self, obj: Any, depth: int, seen: Set[int], deadline: float) -> int:
+        obj_id = id(obj)
+        if obj_id in seen:
+            return 0
+        seen.add(obj_id)
+
+        if isinstance(obj, _ATOMIC_TYPES):
+            return self._shallow(obj)
+
+        if isinstance(obj, memoryview):
+            return self._shallow(obj) + obj.nbytes
+
+        if NUMPY_AVAILABLE and isinstance(obj, np.ndarray):
+            if obj.dtype == object and obj.size:
+                return obj.nbytes + self._sample_items(obj.ravel(), obj.size, depth, seen, deadline)
+            return obj.nbytes
+
+        module = type(obj).__module__ or ''
+
+        if module.startswith('pandas'):
+            return self._pandas_size(obj)
+
+        if module.startswith('pyarrow'):
+            nbytes = getattr(obj, 'nbytes', None)
+            if isinstance(nbytes, int):
+                return nbytes
+
+        if isinstance(obj, (dict,) + _SEQUENCE_TYPES):
+            return self._container_size(obj, depth, seen, deadline)
+
+        # Objects exposing their buffer size (torch, xarray, ...)
+        nbytes = getattr(obj, 'nbytes', None) if not isinstance(obj, type) else None
+        if isinstance(nbytes, int):
+            return nbytes
+
+        size = self._shallow(obj)
+        attrs = getattr(obj, '__dict__', None)
+        if isinstance(attrs, dict) and depth < self.max_depth:
+            size += self._size(attrs, depth + 1, seen, deadline)
+        return size
+
+    def _container_size(self, obj: Any, depth: int, seen: Set[int], deadline: float) -> int:
+        cached = self._cached(obj)
+        if cached is not None:
+            return cached
+
+        size = self._shallow(obj)
+        if depth < self.max_depth and len(obj):
+            if isinstance(obj, dict):
+                size += self._sample_items(obj.items(), len(obj), depth, seen, deadline, pairs=True)
+            else:
+                size += self._sample_items(obj, len(obj), depth, seen, deadline)
+
+        if len(obj) >= self.sample_size:
+            self._remember(obj, size)
+        return size
+
+    def _sample_items(self, items: Any, count: int, depth: int,
+                      seen: Set[int], deadline: float, pairs: bool = False) -> int:
+        """
+        Size ``count`` items, measuring a sample and extrapolating if needed.
+        With ``pairs`` each item is a (key, value) tuple sized as both parts.
+        """
+        if count > self.sample_size:
+            self._stats['sampled'] += 1
+            step = count / self.sample_size
+            if isinstance(items, (list, tuple)) or (NUMPY_AVAILABLE and isinstance(items, np.ndarray)):
+                sample = (items[int(i * step)] for i in range(self.sample_size))
+            else:
+                # Unordered or lazy: take evenly spaced items in one pass
+                indices = {int(i * step) for i in range(self.sample_size)}
+                sample = (item for i, item in enumerate(items) if i in indices)
+        else:
+            sample = iter(items)
+
+        measured = 0
+        total = 0
+        for item in sample:
+            if pairs:
+                total += (self._size(item[0], depth + 1, seen, deadline) +
+                          self._size(item[1], depth + 1, seen, deadline))
+            else:
+                total += self._size(item, depth + 1, seen, deadline)
+            measured += 1
+            if time.perf_counter() > deadline:
+                self._stats['budget_exceeded'] += 1
+                break
+
+        if measured == 0:
+            return 0
+        return int(total * count / measured)
+
+    def _pandas_size(self, obj: Any) -> int:
+        cached = self._cached(obj) if hasattr(obj, 'shape') else None
+        if cached is not None:
+            return cached
+
+        usage = getattr(obj, 'memory_usage', None)
+        if usage is None:
+            return self._shallow(obj)
+
+        rows = len(obj)
+        if rows <= self.frame_sample_rows or not hasattr(obj, 'iloc'):
+            size = self._usage_total(usage(deep=True))
+        else:
+            # Numeric columns are exact without deep=True; object columns
+            # are measured on evenly spaced rows (frames are often sorted)
+            # and scaled up
+            shallow = self._usage_total(usage(deep=False))
+            sample = obj.iloc[::-(-rows // self.frame_sample_rows)]
+            sample_deep = self._usage_total(sample.memory_usage(deep=True))
+            sample_shallow = self._usage_total(sample.memory_usage(deep=False))
+            size = shallow + int((sample_deep - sample_shallow) * rows / len(sample))
+            self._stats['sampled'] += 1
+
+        if hasattr(obj, 'shape'):
+            self._remember(obj, size)
+        return size
+
+    @staticmethod
+    def _usage_total(usage: Any) -> int:
+        # DataFrame.memory_usage returns a Series, Series/Index return an int
+        return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+
+
+# Shared estimator
+DEFAULT_SIZER = ObjectSizer()
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimate the deep size of ``obj`` in bytes using the shared estimator."""
+    return DEFAULT_SIZER.estimate(obj)
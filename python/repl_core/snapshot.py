@@ -0,0 +1,342 @@
+"""
+Incremental namespace snapshots for warm REPL restarts.
+"""
+
+import os
+import time
+import types
+import pickle
+import hashlib
+import logging
+import importlib
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from .cache.disk_cache import DiskCache
+from .namespace import NamespaceTracker, referenced_names, used_names
+
+logger = logging.getLogger(__name__)
+
+
+# Values that are rebuilt by running code rather than restored
+_UNSNAPSHOTTABLE_TYPES = (
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.GeneratorType,
+    type,
+)
+
+# Values that cannot change without being rebound
+_IMMUTABLE_TYPES = (str, bytes, int, float, complex, bool, range, type(None))
+
+
+class NamespaceSnapshotter:
+    """
+    Periodically persists the picklable part of a namespace to disk and
+    restores it lazily after a restart.
+
+    Features:
+    - Only variables whose pickled content changed are written
+    - Only names rebound or used by a cell since the last snapshot are
+      pickled; every ``full_every``-th snapshot re-checks all of them
+    - Module bindings (``import pandas as pd``) are recorded by name
+    - Restored names are loaded on first use by a cell, not at startup
+    """
+
+    MANIFEST_KEY = "__manifest__"
+
+    def __init__(
+        self,
+        cache_dir: str = ".repl_cache",
+        every_n: int = 10,
+        interval: float = 120.0,
+        max_var_mb: float = 256.0,
+        exclude: Iterable[str] = (),
+        full_every: int = 10
+    ):
+        self.every_n = every_n
+        self.interval = interval
+        self.full_every = max(1, full_every)
+        self.max_var_bytes = max_var_mb * 1024 * 1024
+        self.exclude = set(exclude)
+
+        self.store = DiskCache(
+            cache_dir=os.path.join(cache_dir, "namespace_snapshot")
+        )
+        self.manifest = self._load_manifest()
+
+        # name -> 'variable' | 'module', waiting to be restored
+        self.pending: Dict[str, str] = {}
+
+        # name -> (id, type) of values that could not be snapshotted
+        self._skipped: Dict[str, Tuple[int, type]] = {}
+
+        # name -> (id, type) of immutable values already written
+        self._saved_immutables: Dict[str, Tuple[int, type]] = {}
+
+        # Rebound names are found by identity; names a cell used may have
+        # been mutated in place
+        self._tracker = NamespaceTracker()
+        self._touched: Set[str] = set()
+
+        self._executions_since = 0
+        self._last_snapshot = time.time()
+
+        self._stats = {
+            'snapshots': 0,
+            'full_snapshots': 0,
+            'written': 0,
+            'unchanged': 0,
+            'skipped': 0,
+            'removed': 0,
+            'restored': 0,
+            'last_duration_ms': 0.0
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        manifest = self.store.get(self.MANIFEST_KEY)
+        if not isinstance(manifest, dict):
+            manifest = {}
+        manifest.setdefault('variables', {})
+        manifest.setdefault('modules', {})
+        return manifest
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return f"var:{name}"
+
+    def _is_candidate(self, name: str, value: Any) -> bool:
+        if name.startswith('_') or name in self.exclude:
+            return False
+        return not isinstance(value, _UNSNAPSHOTTABLE_TYPES)
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def touch(self, code: types.CodeType, namespace: Dict[str, Any]):
+        """
+        Record the names a cell is about to run with, following functions
+        defined in the namespace. Call before executing each cell.
+        """
+        self._touched |= used_names(code, namespace)
+
+    def maybe_snapshot(self, namespace: Dict[str, Any],
+                       keep: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+        """Count an execution and snapshot if the period has elapsed."""
+        self._executions_since += 1
+        if (self._executions_since >= self.every_n or
+                time.time() - self._last_snapshot >= self.interval):
+            return self.snapshot(namespace, keep)
+        return None
+
+    def snapshot(self, namespace: Dict[str, Any], keep: Iterable[str] = (),
+                 full: bool = False) -> Dict[str, Any]:
+        """
+        Write changed variables and drop ones that no longer exist.
+        Names in ``keep`` are temporarily absent and keep their snapshot.
+
+        Unless ``full`` is set, a variable that was neither rebound nor used
+        by a cell since the last snapshot keeps its stored copy unpickled.
+        Objects only reachable through another variable can change without
+        either, so every ``full_every``-th snapshot checks everything.
+        """
+        start = time.perf_counter()
+        changed = self._tracker.collect(namespace) | self._touched
+        self._touched = set()
+        full = full or self._stats['snapshots'] % self.full_every == 0
+        variables = self.manifest['variables']
+        modules = {}
+        seen = set(keep)
+        result = {'written': 0, 'unchanged': 0, 'skipped': 0, 'removed': 0}
+        # name -> (payload, digest, immutable, fingerprint)
+        writes: Dict[str, Tuple[bytes, str, bool, Tuple[int, type]]] = {}
+
+        for name, value in list(namespace.items()):
+            # A rebound name no longer needs restoring
+            self.pending.pop(name, None)
+
+            if not self._is_candidate(name, value):
+                continue
+
+            if isinstance(value, types.ModuleType):
+                modules[name] = value.__name__
+                continue
+
+            if not full and name not in changed and name in variables:
+                seen.add(name)
+                result['unchanged'] += 1
+                continue
+
+            fingerprint = (id(value), type(value))
+            if self._skipped.get(name) == fingerprint:
+                result['skipped'] += 1
+                continue
+
+            # Same immutable object as last time: nothing to pickle
+            if (self._saved_immutables.get(name) == fingerprint and
+                    name in variables):
+                seen.add(name)
+                result['unchanged'] += 1
+                continue
+
+            if getattr(value, 'nbytes', 0) > self.max_var_bytes:
+                self._skipped[name] = fingerprint
+                result['skipped'] += 1
+                continue
+
+            try:
+                payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                self._skipped[name] = fingerprint
+                result['skipped'] += 1
+                continue
+
+            if len(payload) > self.max_var_bytes:
+                self._skipped[name] = fingerprint
+                result['skipped'] += 1
+                continue
+
+            self._skipped.pop(name, None)
+            seen.add(name)
+
+            digest = hashlib.blake2b(payload, digest_size=16).hexdigest()
+            if variables.get(name, {}).get('digest') == digest:
+                result['unchanged'] += 1
+                if isinstance(value, _IMMUTABLE_TYPES):
+                    self._saved_immutables[name] = fingerprint
+                else:
+                    self._saved_immutables.pop(name, None)
+            else:
+                writes[name] = (payload, digest, isinstance(value, _IMMUTABLE_TYPES), fingerprint)
+        value = None
+
+        # Changed variables are written in one batch
+        stored = set(self.store.put_many_bytes(
+            {self._key(name): write[0] for name, write in writes.items()}
+        ))
+        for name, (payload, digest, immutable, fingerprint) in writes.items():
+            if self._key(name) not in stored:
+                continue
+            # 'raw': the file holds the payload itself, not a pickle of it
+            variables[name] = {
+                'digest': digest,
+                'raw': True,
+                'size_bytes': len(payload),
+                'saved_at': time.time()
+            }
+            result['written'] += 1
+            if immutable:
+                self._saved_immutables[name] = fingerprint
+            else:
+                self._saved_immutables.pop(name, None)
+        writes = None
+
+        # Variables deleted (or no longer picklable) since the last snapshot
+        removed = [name for name in variables
+                   if name not in seen and self.pending.get(name) != 'variable']
+        self.store.delete_many(self._key(name) for name in removed)
+        for name in removed:
+            del variables[name]
+            self._saved_immutables.pop(name, None)
+        result['removed'] += len(removed)
+
+        for name, kind in self.pending.items():
+            if kind == 'module' and name in self.manifest['modules']:
+                modules[name] = self.manifest['modules'][name]
+        self.manifest['modules'] = modules
+
+        self.store.put(self.MANIFEST_KEY, self.manifest)
+
+        self._executions_since = 0
+        self._last_snapshot = time.time()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._stats['snapshots'] += 1
+        self._stats['full_snapshots'] += full
+        self._stats['last_duration_ms'] = round(elapsed_ms, 2)
+        for key, count in result.items():
+            self._stats[key] += count
+
+        logger.debug(f"Namespace snapshot: {result} in {elapsed_ms:.1f}ms")
+        result['duration_ms'] = round(elapsed_ms, 2)
+        return result
+
+    # ------------------------------------------------------------------
+    # Restore
+    # ------------------------------------------------------------------
+
+    def restore(self, namespace: Dict[str, Any]) -> int:
+        """
+        Register snapshotted names for lazy restore.
+        Returns the number of names that will be restored on first use.
+        """
+        for name in self.manifest['variables']:
+            if name not in namespace:
+                self.pending[name] = 'variable'
+        for name in self.manifest['modules']:
+            if name not in namespace:
+                self.pending[name] = 'module'
+
+        if self.pending:
+            logger.info(f"{len(self.pending)} names pending restore from snapshot")
+        return len(self.pending)
+
+    def resolve(self, code: types.CodeType, namespace: Dict[str, Any]) -> int:
+        """Load pending names that the code about to run refers to."""
+        if not self.pending:
+            return 0
+
+        wanted = {}
+        for name in referenced_names(code) & self.pending.keys():
+            kind = self.pending.pop(name)
+            if name not in namespace:
+                wanted[name] = kind
+
+        # Read the stored payloads of the cell's variables in one batch
+        raw = [self._key(name) for name, kind in wanted.items()
+               if kind == 'variable' and self.manifest['variables'].get(name, {}).get('raw')]
+        payloads = self.store.get_many_bytes(raw) if raw else {}
+
+        loaded = 0
+        for name, kind in wanted.items():
+            try:
+                namespace[name] = self._load(name, kind, payloads)
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"Failed to restore '{name}': {e}")
+
+        self._stats['restored'] += loaded
+        return loaded
+
+    def _load(self, name: str, kind: str, payloads: Dict[str, bytes]) -> Any:
+        if kind == 'module':
+            return importlib.import_module(self.manifest['modules'][name])
+
+        if self.manifest['variables'].get(name, {}).get('raw'):
+            payload = payloads.get(self._key(name))
+        else:
+            payload = self.store.get(self._key(name))
+        if payload is None:
+            raise KeyError(f"snapshot for '{name}' is missing")
+        return pickle.loads(payload)
+
+    def discard(self):
+        """Delete the stored snapshot and forget pending names."""
+        self.store.clear()
+        self.pending.clear()
+        self._skipped.clear()
+        self._saved_immutables.clear()
+        self._tracker.reset()
+        self._touched.clear()
+        self.manifest = {'variables': {}, 'modules': {}}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics."""
+        return {
+            **self._stats,
+            'variables': len(self.manifest['variables']),
+            'modules': len(self.manifest['modules']),
+            'pending': len(self.pending),
+            'size_mb': self.store.get_size() / (1024 * 1024)
+        }
@@ -50,6 +50,8 @@ class DataStream:
     - Backpressure handling
     - Progress tracking
     - Cancellation
+    - Multi-process execution of file, Parquet and sequence sources
+      (``distribute``, see ``repl_core.distributed``)
     """
     
     def __init__(
@@ -65,6 +67,8 @@ class DataStream:
         self._transforms: List[Callable] = []
         self._cancelled = False
         self._exhausted = False
+        # Re-readable description of the source, used to partition it
+        self.source_spec: Optional[Tuple] = None
         
     @classmethod
     def from_iterable(cls, iterable, chunk_size: int = 10000):
@@ -77,7 +81,10 @@ class DataStream:
             total_items=len(iterable) if hasattr(iterable, '__len__') else None,
             chunk_size=chunk_size
         )
-        return cls(generator(), metadata)
+        stream = cls(generator(), metadata)
+        if hasattr(iterable, '__len__') and hasattr(iterable, '__getitem__'):
+            stream.source_spec = ('sequence', iterable)
+        return stream
     
     @classmethod
     def from_file(cls, filepath: str, mode: str = 'r', chunk_size: int = 8192):
@@ -97,7 +104,9 @@ class DataStream:
             total_items=file_size // chunk_size if mode == 'rb' else None,
             chunk_size=chunk_size
         )
-        return cls(file_generator(), metadata)
+        stream = cls(file_generator(), metadata)
+        stream.source_spec = ('file', filepath, mode, chunk_size)
+        return stream
     
     @classmethod
     def from_csv(cls, filepath: str, chunk_size: int = 10000):
@@ -117,7 +126,9 @@ class DataStream:
                 total_items=total_rows,
                 chunk_size=chunk_size
             )
-            return cls(csv_generator(), metadata)
+            stream = cls(csv_generator(), metadata)
+            stream.source_spec = ('csv', filepath, chunk_size)
+            return stream
             
         except ImportError:
             # Fallback to basic CSV reading
@@ -137,6 +148,31 @@ class DataStream:
             
             return cls(csv_generator())
     
+    @classmethod
+    def from_parquet(cls, filepath: str, batch_size: int = 10000):
+        """Create stream of DataFrame batches from a Parquet file."""
+        import pyarrow.parquet as pq
+        
+        def parquet_generator():
+            parquet_file = pq.ParquetFile(filepath)
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                yield batch.to_pandas()
+        
+        metadata = StreamMetadata(
+            total_items=pq.ParquetFile(filepath).metadata.num_rows,
+            chunk_size=batch_size
+        )
+        stream = cls(parquet_generator(), metadata)
+        stream.source_spec = ('parquet', filepath, batch_size)
+        return stream
+    
+    def _derive(self, generator: Generator, transform: Tuple) -> 'DataStream':
+        """New stream applying ``transform`` on top of this one."""
+        new_stream = DataStream(generator, self.metadata)
+        new_stream._transforms = self._transforms + [transform]
+        new_stream.source_spec = self.source_spec
+        return new_stream
+    
     def map(self, func: Callable[[Any], Any]) -> 'DataStream':
         """Apply transformation to each element."""
         def mapped_generator():
@@ -145,9 +181,7 @@ class DataStream:
                     break
                 yield func(item)
         
-        new_stream = DataStream(mapped_generator(), self.metadata)
-        new_stream._transforms = self._transforms + [('map', func)]
-        return new_stream
+        return self._derive(mapped_generator(), ('map', func))
     
     def filter(self, predicate: Callable[[Any], bool]) -> 'DataStream':
         """Filter elements based on predicate."""
@@ -158,9 +192,7 @@ class DataStream:
                 if predicate(item):
                     yield item
         
-        new_stream = DataStream(filtered_generator(), self.metadata)
-        new_stream._transforms = self._transforms + [('filter', predicate)]
-        return new_stream
+        return self._derive(filtered_generator(), ('filter', predicate))
     
     def batch(self, batch_size: int) -> 'DataStream':
         """Group elements into batches."""
@@ -176,9 +208,7 @@ class DataStream:
             if batch and not self._cancelled:
                 yield batch
         
-        new_stream = DataStream(batched_generator(), self.metadata)
-        new_stream._transforms = self._transforms + [('batch', batch_size)]
-        return new_stream
+        return self._derive(batched_generator(), ('batch', batch_size))
     
     def take(self, n: int) -> 'DataStream':
         """Take first n elements."""
@@ -190,9 +220,7 @@ class DataStream:
                 yield item
                 count += 1
         
-        new_stream = DataStream(take_generator(), self.metadata)
-        new_stream._transforms = self._transforms + [('take', n)]
-        return new_stream
+        return self._derive(take_generator(), ('take', n))
     
     def skip(self, n: int) -> 'DataStream':
         """Skip first n elements."""
@@ -206,9 +234,7 @@ class DataStream:
                 else:
                     count += 1
         
-        new_stream = DataStream(skip_generator(), self.metadata)
-        new_stream._transforms = self._transforms + [('skip', n)]
-        return new_stream
+        return self._derive(skip_generator(), ('skip', n))
     
     def _iterate(self) -> Generator:
         """Internal iteration with metadata tracking."""
@@ -229,10 +255,8 @@ class DataStream:
             if hasattr(item, '__sizeof__'):
                 self.metadata.bytes_processed += item.__sizeof__()
             
-            # Apply backpressure if buffer is full
-            while len(self._buffer) >= self.buffer_size and not self._cancelled:
-                time.sleep(0.001)  # Small delay
-            
+            # Recent items only: the deque drops the oldest when full
+            # (waiting for it to drain would block forever, nothing consumes it)
             self._buffer.append(item)
             yield item
         
@@ -295,6 +319,14 @@ class DataStream:
             logger.error(f"Failed to save stream: {e}")
             return False
     
+    def distribute(self, combine: Any = None, max_workers: Optional[int] = None) -> Any:
+        """
+        Run this stream's transforms in worker processes and combine the results.
+        See ``repl_core.distributed.run_distributed``.
+        """
+        from ..distributed import run_distributed
+        return run_distributed(self, combine=combine, max_workers=max_workers)
+    
     def cancel(self):
         """Cancel streaming operation."""
         self._cancelled = True
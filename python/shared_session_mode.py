@@ -10,9 +10,12 @@ Purpose: Enable data sharing between agents while maintaining safety
 
 import sys
 import time
+import traceback
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from repl_core.history import ExecutionHistory
+
 class WorkflowSession:
     """단일 공유 세션으로 에이전트 간 데이터 전달"""
     
@@ -20,8 +23,8 @@ class WorkflowSession:
         # 공유 데이터 저장소
         self.shared_data = {}
         
-        # 에이전트별 실행 기록
-        self.execution_history = []
+        # 에이전트별 실행 기록 (최근 1000회만 보관하는 고정 크기 링 버퍼)
+        self.execution_history = ExecutionHistory(capacity=1000)
         
         # 워크플로우 상태
         self.workflow_state = {
@@ -113,12 +116,12 @@ class WorkflowSession:
             }
         
         # 실행 기록 저장
-        self.execution_history.append({
-            'agent_id': agent_id,
-            'timestamp': time.time(),
-            'success': result['success'],
-            'shared_snapshot': list(self.shared_data.keys())
-        })
+        self.execution_history.record(
+            (time.time() - start_time) * 1000,
+            success=result['success'],
+            label=agent_id,
+            count=self.workflow_state['step_count']
+        )
         
         return result
     
@@ -133,10 +136,12 @@ class WorkflowSession:
         """워크플로우 전체 요약"""
         return {
             'total_steps': self.workflow_state['step_count'],
-            'agents_executed': [h['agent_id'] for h in self.execution_history],
+            'agents_executed': self.execution_history.labels(),
             'shared_data_keys': list(self.shared_data.keys()),
             'current_agent': self.workflow_state['current_agent'],
-            'execution_count': len(self.execution_history)
+            'execution_count': self.execution_history.total,
+            # 실행 시간 p50/p95/p99 (전체 및 에이전트별)
+            'latency': self.execution_history.summary()
         }
     
     def clear_shared_data(self):